@@ -0,0 +1,33 @@
+"""index cylinders.current_location_id
+
+Revision ID: add_cylinder_current_location
+Revises: add_location_geohash
+Create Date: 2026-10-19 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_cylinder_current_location'
+down_revision = 'add_location_geohash'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    # initial_migration already creates the column; databases built from the
+    # older app models do not have it
+    if 'current_location_id' not in {column['name'] for column in inspector.get_columns('cylinders')}:
+        with op.batch_alter_table('cylinders') as batch_op:
+            batch_op.add_column(sa.Column('current_location_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key(
+                'fk_cylinders_current_location_id_locations',
+                'locations', ['current_location_id'], ['id'],
+            )
+    if 'ix_cylinders_current_location_id' not in {index['name'] for index in inspector.get_indexes('cylinders')}:
+        op.create_index('ix_cylinders_current_location_id', 'cylinders', ['current_location_id'])
+
+def downgrade() -> None:
+    # The column itself predates this revision on migrated databases
+    op.drop_index('ix_cylinders_current_location_id', table_name='cylinders')
@@ -0,0 +1,28 @@
+"""add locations.geohash
+
+Revision ID: add_location_geohash
+Revises: initial_migration
+Create Date: 2026-10-19 12:00:00.000000
+
+Existing rows get their geohash from ``python -m jobs.backfill_geohashes``.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_location_geohash'
+down_revision = 'initial_migration'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    # Databases built with create_all from the current models already have it
+    if 'geohash' not in {column['name'] for column in inspector.get_columns('locations')}:
+        op.add_column('locations', sa.Column('geohash', sa.String(length=12), nullable=True))
+    if 'ix_locations_geohash' not in {index['name'] for index in inspector.get_indexes('locations')}:
+        op.create_index('ix_locations_geohash', 'locations', ['geohash'])
+
+def downgrade() -> None:
+    op.drop_index('ix_locations_geohash', table_name='locations')
+    op.drop_column('locations', 'geohash')
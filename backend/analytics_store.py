@@ -0,0 +1,265 @@
+"""Columnar analytics store: Parquet snapshots of the history tables, queried with DuckDB.
+
+``snapshot`` streams each table in ``SNAPSHOT_TABLES`` that exists in the
+database into ``<directory>/<table>.parquet`` (written to a temporary file and
+swapped in, so readers never see a partial file) and records the snapshot time
+and row counts in ``_snapshot.json``. Columns are read by reflection, so the
+store also covers tables that only the v1 app models define.
+
+``AnalyticsStore`` opens an in-memory DuckDB connection per query with one view
+per Parquet file, so reports scan the snapshot in vectorized, columnar form
+instead of loading the OLTP database. Only the predefined ``REPORTS`` and
+validated ``aggregate`` queries run; identifiers never come from raw input.
+
+Usage: python analytics_store.py [--directory analytics_data]    (from cron, or set
+       ANALYTICS_SNAPSHOT_INTERVAL to let the API refresh it in the background)
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import duckdb
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, MetaData, Numeric, Table, inspect, select
+from sqlalchemy.engine import Engine
+
+ANALYTICS_DIR = os.getenv("ANALYTICS_DIR", "analytics_data")
+SNAPSHOT_TABLES = ("cylinder_movements", "maintenance_records", "fill_records", "lease_records")
+MANIFEST = "_snapshot.json"
+
+# Snapshot
+
+def _arrow_type(column) -> pa.DataType:
+    column_type = column.type
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, (Float, Numeric)):
+        return pa.float64()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column_type, Date):
+        return pa.date32()
+    # Strings, enums (stored names) and anything else
+    return pa.string()
+
+def _arrow_value(value, arrow_type: pa.DataType):
+    if value is None:
+        return None
+    if pa.types.is_timestamp(arrow_type):
+        # Naive UTC, the way SQLite stores it
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+    if pa.types.is_floating(arrow_type):
+        return float(value)
+    if pa.types.is_string(arrow_type) and not isinstance(value, str):
+        return json.dumps(value, default=str) if isinstance(value, (dict, list)) else str(value)
+    return value
+
+def snapshot_table(engine: Engine, table: Table, directory: str, chunk_size: int = 50000) -> int:
+    """Write one table to ``<directory>/<table>.parquet``; returns the row count."""
+    schema = pa.schema([(column.name, _arrow_type(column)) for column in table.columns])
+    path = os.path.join(directory, f"{table.name}.parquet")
+    temporary = f"{path}.tmp"
+    rows = 0
+    with engine.connect() as connection, pq.ParquetWriter(temporary, schema, compression="zstd") as writer:
+        result = connection.execution_options(yield_per=chunk_size).execute(select(table))
+        for chunk in result.partitions():
+            columns = [
+                pa.array([_arrow_value(row[index], field.type) for row in chunk], type=field.type)
+                for index, field in enumerate(schema)
+            ]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            rows += len(chunk)
+    os.replace(temporary, path)
+    return rows
+
+def snapshot(engine: Engine, directory: str = ANALYTICS_DIR, tables=SNAPSHOT_TABLES, chunk_size: int = 50000) -> dict:
+    """Snapshot every table in ``tables`` that exists; returns the manifest."""
+    os.makedirs(directory, exist_ok=True)
+    existing = set(inspect(engine).get_table_names())
+    metadata = MetaData()
+    manifest = {"snapshot_at": datetime.utcnow().isoformat(), "tables": {}}
+    for name in tables:
+        if name not in existing:
+            continue
+        started = time.perf_counter()
+        rows = snapshot_table(engine, Table(name, metadata, autoload_with=engine), directory, chunk_size)
+        manifest["tables"][name] = {"rows": rows, "seconds": round(time.perf_counter() - started, 3)}
+    with open(os.path.join(directory, MANIFEST), "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    return manifest
+
+# Queries
+
+REPORTS = {
+    "movements-by-month": """
+        SELECT date_trunc('month', "timestamp") AS month, movement_type,
+               count(*) AS movements, count(DISTINCT cylinder_id) AS cylinders
+        FROM cylinder_movements
+        WHERE "timestamp" >= $start AND "timestamp" < $end
+        GROUP BY ALL ORDER BY ALL
+    """,
+    "busiest-locations": """
+        SELECT to_location_id AS location_id, count(*) AS arrivals, count(DISTINCT cylinder_id) AS cylinders
+        FROM cylinder_movements
+        WHERE "timestamp" >= $start AND "timestamp" < $end
+        GROUP BY ALL ORDER BY arrivals DESC LIMIT 50
+    """,
+    "maintenance-turnaround": """
+        SELECT maintenance_type, status, count(*) AS records,
+               avg(date_diff('hour', scheduled_date, completed_date)) / 24.0 AS avg_days_to_complete,
+               sum(cost) AS total_cost
+        FROM maintenance_records
+        WHERE scheduled_date >= $start AND scheduled_date < $end
+        GROUP BY ALL ORDER BY ALL
+    """,
+    "fills-by-month": """
+        SELECT date_trunc('month', fill_date) AS month, status, count(*) AS fills,
+               sum(fill_amount) AS fill_amount, avg(gas_purity) AS avg_purity, sum(cost) AS cost
+        FROM fill_records
+        WHERE fill_date >= $start AND fill_date < $end
+        GROUP BY ALL ORDER BY ALL
+    """,
+    "lease-revenue": """
+        SELECT date_trunc('month', lease_start) AS month, status, count(*) AS leases,
+               sum(lease_rate) AS lease_rate, sum(additional_charges) AS additional_charges
+        FROM lease_records
+        WHERE lease_start >= $start AND lease_start < $end
+        GROUP BY ALL ORDER BY ALL
+    """,
+}
+
+METRICS = ("count", "count_distinct", "sum", "avg", "min", "max")
+BUCKETS = ("day", "week", "month", "year")
+# Metrics that only make sense on numeric (Arrow int, float or decimal) columns
+NUMERIC_METRICS = ("sum", "avg")
+NUMERIC_TYPES = ("int", "uint", "float", "double", "halffloat", "decimal")
+
+class SnapshotMissing(LookupError):
+    pass
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+class AnalyticsStore:
+    def __init__(self, directory: str = ANALYTICS_DIR):
+        self.directory = directory
+
+    def tables(self) -> List[str]:
+        return [name for name in SNAPSHOT_TABLES if os.path.exists(self._path(name))]
+
+    def _path(self, table: str) -> str:
+        return os.path.join(self.directory, f"{table}.parquet")
+
+    def manifest(self) -> dict:
+        try:
+            with open(os.path.join(self.directory, MANIFEST)) as manifest_file:
+                return json.load(manifest_file)
+        except FileNotFoundError:
+            return {"snapshot_at": None, "tables": {}}
+
+    def connect(self) -> duckdb.DuckDBPyConnection:
+        connection = duckdb.connect()
+        for name in self.tables():
+            path = self._path(name).replace("'", "''")
+            connection.execute(f"CREATE VIEW {_quote(name)} AS SELECT * FROM read_parquet('{path}')")
+        return connection
+
+    def columns(self, table: str) -> Dict[str, str]:
+        if table not in self.tables():
+            raise SnapshotMissing(f"No snapshot of {table}")
+        schema = pq.read_schema(self._path(table))
+        return {field.name: str(field.type) for field in schema}
+
+    def query(self, sql: str, params: Optional[dict] = None) -> List[dict]:
+        connection = self.connect()
+        try:
+            result = connection.execute(sql, params or {})
+            names = [column[0] for column in result.description]
+            return [dict(zip(names, row)) for row in result.fetchall()]
+        finally:
+            connection.close()
+
+    def report(self, name: str, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[dict]:
+        sql = REPORTS[name]
+        missing = [table for table in SNAPSHOT_TABLES if f"FROM {table}" in sql and table not in self.tables()]
+        if missing:
+            raise SnapshotMissing(f"No snapshot of {', '.join(missing)}")
+        return self.query(sql, {"start": start or datetime(1970, 1, 1), "end": end or datetime(9999, 1, 1)})
+
+    def aggregate(self, table: str, metrics: List[str], group_by: List[str] = (), time_column: Optional[str] = None,
+                  bucket: Optional[str] = None, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                  limit: int = 1000) -> List[dict]:
+        """Group ``table`` by columns (and a time bucket) computing ``metrics`` like ``count`` or ``sum:cost``."""
+        columns = self.columns(table)
+
+        def column(name: str) -> str:
+            if name not in columns:
+                raise ValueError(f"Unknown column {name!r} in {table}")
+            return _quote(name)
+
+        keys = [column(name) for name in group_by]
+        where, params = [], {}
+        if time_column is not None:
+            column(time_column)
+            if not columns[time_column].startswith("timestamp"):
+                raise ValueError(f"{time_column!r} is not a timestamp column")
+            if bucket is not None:
+                if bucket not in BUCKETS:
+                    raise ValueError(f"bucket must be one of {', '.join(BUCKETS)}")
+                keys.insert(0, f"date_trunc('{bucket}', {_quote(time_column)}) AS {bucket}")
+            if start is not None:
+                where.append(f"{_quote(time_column)} >= $start")
+                params["start"] = start
+            if end is not None:
+                where.append(f"{_quote(time_column)} < $end")
+                params["end"] = end
+        elif bucket is not None or start is not None or end is not None:
+            raise ValueError("bucket, start and end need a time_column")
+
+        selected = []
+        for metric in metrics or ["count"]:
+            function, _, argument = metric.partition(":")
+            if function not in METRICS:
+                raise ValueError(f"Unknown metric {metric!r}; use one of {', '.join(METRICS)}")
+            if function == "count" and not argument:
+                selected.append("count(*) AS count")
+            elif function == "count_distinct":
+                selected.append(f"count(DISTINCT {column(argument)}) AS {_quote(metric)}")
+            else:
+                quoted = column(argument)
+                if function in NUMERIC_METRICS and not columns[argument].startswith(NUMERIC_TYPES):
+                    raise ValueError(f"{function} needs a numeric column; {argument!r} is {columns[argument]}")
+                selected.append(f"{function}({quoted}) AS {_quote(metric)}")
+
+        sql = f"SELECT {', '.join(keys + selected)} FROM {_quote(table)}"
+        if where:
+            sql += f" WHERE {' AND '.join(where)}"
+        if keys:
+            sql += f" GROUP BY ALL ORDER BY {', '.join(str(position) for position in range(1, len(keys) + 1))}"
+        sql += f" LIMIT {int(limit)}"
+        return self.query(sql, params)
+
+def get_analytics_store() -> AnalyticsStore:
+    return AnalyticsStore()
+
+if __name__ == "__main__":
+    from database import engine, replica_set
+
+    parser = argparse.ArgumentParser(description="Snapshot history tables into Parquet for DuckDB analytics")
+    parser.add_argument("--directory", default=ANALYTICS_DIR, help="Where the Parquet files go")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Rows per Parquet row group")
+    args = parser.parse_args()
+
+    # Read from a replica when one is healthy, to keep the export off the primary
+    source = replica_set.choose() or engine
+    manifest = snapshot(source, args.directory, chunk_size=args.chunk_size)
+    for name, info in manifest["tables"].items():
+        print(f"{name:<22} {info['rows']:>10,} rows  {info['seconds']:7.1f} s")
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.core.auth import get_current_active_user
+from app.core.database import get_db
+from app.models.user import UserRole
+from app.schemas.billing import BillingRunRequest, BillingRunResponse, InvoiceLinePage
+from app.schemas.user import UserResponse
+from app.services.billing import line_table, month_period, run_billing, run_table
+
+router = APIRouter()
+
+@router.post("/billing/runs", response_model=BillingRunResponse)
+def create_billing_run(
+    request: BillingRunRequest,
+    db: Session = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_active_user)
+):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="The user doesn't have enough privileges"
+        )
+    period_start, period_end = month_period(request.year, request.month)
+    return run_billing(db, period_start, period_end, created_by=current_user.id, rebill=request.rebill)
+
+@router.get("/billing/runs/{run_id}/lines", response_model=InvoiceLinePage)
+def read_invoice_lines(
+    run_id: int,
+    customer_id: Optional[int] = None,
+    after_id: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_active_user)
+):
+    if db.execute(select(run_table.c.id).where(run_table.c.id == run_id)).first() is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Billing run not found")
+
+    stmt = select(line_table).where(line_table.c.billing_run_id == run_id, line_table.c.id > after_id)
+    if customer_id is not None:
+        stmt = stmt.where(line_table.c.customer_id == customer_id)
+    lines = db.execute(stmt.order_by(line_table.c.id).limit(limit)).mappings().all()
+    return {
+        "lines": lines,
+        "next_after_id": lines[-1]["id"] if len(lines) == limit else None
+    }
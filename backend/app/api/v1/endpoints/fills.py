@@ -0,0 +1,97 @@
+import re
+
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from typing import Optional
+
+from app.core.auth import get_current_active_user
+from app.core.database import get_db
+from app.schemas.fill import FillBatchSummary, FillIngestResult
+from app.schemas.user import UserResponse
+from app.services.fill_ingest import (
+    BINARY_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPES,
+    FillFormatError,
+    ingest_fills,
+    parse_binary,
+    parse_ndjson,
+)
+from app.services.recall import batch_summary, recall_cylinders
+
+router = APIRouter()
+
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+@router.post("/fills/ingest", response_model=FillIngestResult)
+async def ingest_fill_records(
+    request: Request,
+    content_type: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_active_user)
+):
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in NDJSON_MEDIA_TYPES:
+        parse = parse_ndjson
+    elif media_type == BINARY_MEDIA_TYPE:
+        parse = parse_binary
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Send fills as {NDJSON_MEDIA_TYPES[0]} or {BINARY_MEDIA_TYPE}"
+        )
+
+    body = await request.body()
+    if len(body) > MAX_BODY_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Send at most {MAX_BODY_BYTES} bytes per request"
+        )
+    try:
+        frame = parse(body)
+    except FillFormatError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    # Parsing is cheap; validation and the batched writes run off the event loop
+    return await run_in_threadpool(ingest_fills, db, frame, current_user.id)
+
+
+def _batch_or_404(db: Session, batch_number: str) -> dict:
+    summary = batch_summary(db, batch_number)
+    if summary is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No fills from this batch")
+    return summary
+
+@router.get("/fills/batches/{batch_number}", response_model=FillBatchSummary)
+def read_fill_batch(
+    batch_number: str,
+    db: Session = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_active_user)
+):
+    return _batch_or_404(db, batch_number)
+
+@router.get("/fills/batches/{batch_number}/recall")
+def recall_fill_batch(
+    batch_number: str,
+    db: Session = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_active_user)
+):
+    """Every cylinder filled from the batch with its current holder, as NDJSON."""
+    _batch_or_404(db, batch_number)
+    bind = db.get_bind()
+
+    def lines():
+        # The request session closes before the body is sent, so stream from one of our own
+        with Session(bind=bind) as stream_db:
+            for cylinder in recall_cylinders(stream_db, batch_number):
+                # Column labels are str subclasses, which orjson only takes as keys with this option
+                yield orjson.dumps(cylinder, option=orjson.OPT_NON_STR_KEYS) + b"\n"
+
+    filename = re.sub(r"[^A-Za-z0-9._-]", "_", batch_number)
+    return StreamingResponse(
+        lines(),
+        media_type=NDJSON_MEDIA_TYPES[0],
+        headers={"Content-Disposition": f'attachment; filename="recall-{filename}.ndjson"'}
+    )
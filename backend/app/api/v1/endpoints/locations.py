@@ -0,0 +1,145 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.core.auth import get_current_active_user
+from app.core.database import get_db
+from app.models.location import Location, LocationType
+from app.models.user import UserRole
+from app.schemas.location import (
+    CylindersNearby,
+    InventoryReconciliation,
+    LocationInventory,
+    NearbyCylinder,
+    NearbyLocation,
+)
+from app.schemas.user import UserResponse
+from app.services.inventory import location_stock, reconcile_inventory
+from app.services.spatial import (
+    cylinders_at_locations,
+    ensure_location_index,
+    location_type_tag,
+    locations_within,
+)
+
+router = APIRouter()
+
+MAX_RADIUS_KM = 500.0
+MAX_CYLINDER_LOCATIONS = 500
+
+def _location_type_tags(location_type: Optional[List[LocationType]]):
+    if not location_type:
+        return None
+    return [location_type_tag(value) for value in location_type]
+
+def _nearby_location(location: Location, distance: float) -> NearbyLocation:
+    return NearbyLocation(
+        id=location.id,
+        name=location.name,
+        location_type=getattr(location.location_type, "value", location.location_type),
+        latitude=location.latitude,
+        longitude=location.longitude,
+        distance_km=round(distance, 3)
+    )
+
+def _nearby_locations(db: Session, hits) -> List[NearbyLocation]:
+    """Load the locations for index (id, distance) hits, keeping the hit order."""
+    if not hits:
+        return []
+    locations = {
+        location.id: location
+        for location in db.query(Location).filter(Location.id.in_([location_id for location_id, _ in hits]))
+    }
+    return [
+        _nearby_location(locations[location_id], distance)
+        for location_id, distance in hits
+        if location_id in locations
+    ]
+
+@router.get("/locations/nearest", response_model=List[NearbyLocation])
+def nearest_locations(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    k: int = Query(10, ge=1, le=100),
+    max_radius_km: Optional[float] = Query(None, gt=0, le=MAX_RADIUS_KM),
+    location_type: Optional[List[LocationType]] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_active_user)
+):
+    index = ensure_location_index(db)
+    hits = index.nearest(lat, lon, k=k, max_radius_km=max_radius_km, tags=_location_type_tags(location_type))
+    return _nearby_locations(db, hits)
+
+@router.get("/locations/within", response_model=List[NearbyLocation])
+def locations_within_radius(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(..., gt=0, le=MAX_RADIUS_KM),
+    location_type: Optional[List[LocationType]] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_active_user)
+):
+    index = ensure_location_index(db)
+    hits = index.within(lat, lon, radius_km, tags=_location_type_tags(location_type))
+    return _nearby_locations(db, hits[:limit])
+
+@router.get("/locations/cylinders-within", response_model=CylindersNearby)
+def cylinders_within_radius(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(..., gt=0, le=MAX_RADIUS_KM),
+    db: Session = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_active_user)
+):
+    # Geohash + bounding box prefilter in the database, exact distance in NumPy
+    hits = locations_within(db, lat, lon, radius_km)
+    truncated = len(hits) > MAX_CYLINDER_LOCATIONS
+    hits = hits[:MAX_CYLINDER_LOCATIONS]
+    distances = {location.id: distance for location, distance in hits}
+    cylinders = cylinders_at_locations(db, list(distances))
+    return CylindersNearby(
+        locations=[_nearby_location(location, distance) for location, distance in hits],
+        cylinders=[
+            NearbyCylinder(
+                cylinder_id=cylinder_id,
+                location_id=location_id,
+                distance_km=round(distances[location_id], 3)
+            )
+            for cylinder_id, location_id in sorted(cylinders.items(), key=lambda item: distances[item[1]])
+        ],
+        truncated=truncated
+    )
+
+def _value(member) -> str:
+    return getattr(member, "value", member)
+
+@router.get("/locations/{location_id}/inventory", response_model=LocationInventory)
+def read_location_inventory(
+    location_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_active_user)
+):
+    # Reads the maintained counters, not the cylinders
+    stock = [
+        {"gas_type": _value(row["gas_type"]), "status": _value(row["status"]), "count": row["count"]}
+        for row in location_stock(db, location_id)
+    ]
+    if not stock and db.get(Location, location_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Location not found")
+    return {"location_id": location_id, "total": sum(row["count"] for row in stock), "stock": stock}
+
+@router.post("/locations/inventory/reconcile", response_model=InventoryReconciliation)
+def reconcile_location_inventory(
+    db: Session = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_active_user)
+):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="The user doesn't have enough privileges"
+        )
+    result = reconcile_inventory(db)
+    for drift in result["drift"]:
+        drift["gas_type"], drift["status"] = _value(drift["gas_type"]), _value(drift["status"])
+    return result
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.auth import get_current_active_user
+from app.core.database import get_db
+from app.schemas.movement import MovementCreate, MovementRecorded
+from app.schemas.user import UserResponse
+from app.services.inventory import UnknownCylinder, record_movement
+
+router = APIRouter()
+
+@router.post("/movements", response_model=MovementRecorded, status_code=status.HTTP_201_CREATED)
+def create_movement(
+    movement: MovementCreate,
+    db: Session = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_active_user)
+):
+    values = movement.model_dump()
+    try:
+        movement_id = record_movement(db, {**values, "driver_id": current_user.id, "created_by": current_user.id})
+    except UnknownCylinder as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return {"id": movement_id, **values}
@@ -0,0 +1,96 @@
+from datetime import datetime, time, timedelta
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.auth import get_current_active_user
+from app.core.database import get_db
+from app.models.location import Location
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.user import UserRole
+from app.schemas.route import DriverRoute, RoutePlanRequest, RoutePlanResponse
+from app.schemas.user import UserResponse
+from app.services.distance_matrix import location_distances
+from app.services.routing import solve_routes
+
+router = APIRouter()
+
+PLANNABLE_STATUSES = [OrderStatus.PENDING, OrderStatus.CONFIRMED, OrderStatus.ASSIGNED]
+
+@router.post("/routes/plan", response_model=RoutePlanResponse)
+def plan_delivery_routes(
+    request: RoutePlanRequest,
+    db: Session = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_active_user)
+):
+    if request.apply and current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="The user doesn't have enough privileges"
+        )
+
+    depot = db.query(Location).filter(Location.id == request.depot_location_id).first()
+    if depot is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Depot location not found")
+    if depot.latitude is None or depot.longitude is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Depot location has no coordinates")
+
+    # Get the day's orders with their stop (delivery location, else pickup location)
+    day_start = datetime.combine(request.date, time.min)
+    stop_id = func.coalesce(Order.delivery_location_id, Order.pickup_location_id)
+    orders = db.query(Order.id, stop_id, Location.latitude, Location.longitude).outerjoin(
+        Location, Location.id == stop_id
+    ).filter(
+        Order.scheduled_date >= day_start,
+        Order.scheduled_date < day_start + timedelta(days=1),
+        Order.status.in_(PLANNABLE_STATUSES)
+    ).order_by(Order.id).all()
+
+    stops = [order for order in orders if order[2] is not None and order[3] is not None]
+    unrouted = [order[0] for order in orders if order[2] is None or order[3] is None]
+
+    # Cylinders per order drive the truck capacity
+    quantities = dict(db.query(OrderItem.order_id, func.sum(OrderItem.quantity)).filter(
+        OrderItem.order_id.in_([order[0] for order in stops])
+    ).group_by(OrderItem.order_id).all()) if stops else {}
+
+    # Distances come from the shared matrix cache rather than being recomputed per request
+    try:
+        distances = location_distances(db, [depot.id] + [order[1] for order in stops])
+    except ValueError as exc:
+        # A stop deleted or stripped of its coordinates since the orders were read
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
+    plan = solve_routes(
+        distances,
+        vehicles=len(request.driver_ids),
+        demands=[float(quantities.get(order[0]) or 1) for order in stops],
+        capacity=request.vehicle_capacity,
+        time_budget=request.time_budget_seconds
+    )
+
+    routes = [
+        DriverRoute(
+            driver_id=driver_id,
+            order_ids=[stops[index][0] for index in route],
+            location_ids=[stops[index][1] for index in route],
+            distance_km=round(distance, 3)
+        )
+        for driver_id, route, distance in zip(request.driver_ids, plan["routes"], plan["distances_km"])
+    ]
+
+    if request.apply:
+        for route in routes:
+            if route.order_ids:
+                db.query(Order).filter(Order.id.in_(route.order_ids)).update(
+                    {Order.driver_id: route.driver_id, Order.status: OrderStatus.ASSIGNED},
+                    synchronize_session=False
+                )
+        db.commit()
+
+    return RoutePlanResponse(
+        routes=routes,
+        total_distance_km=round(plan["total_km"], 3),
+        unrouted_order_ids=unrouted,
+        converged=plan["converged"],
+        elapsed_ms=round(plan["elapsed_ms"], 1)
+    )
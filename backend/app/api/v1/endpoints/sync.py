@@ -0,0 +1,46 @@
+import gzip
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.core.auth import get_current_active_user
+from app.core.database import get_db
+from app.schemas.user import UserResponse
+from app.services.sync import SYNC_MODELS, InvalidCursor, changes_since
+
+router = APIRouter()
+
+# Change batches compress very well (repeated keys and enum values), so small
+# bodies are the only ones worth sending as-is
+GZIP_MIN_BYTES = 1024
+
+@router.get("/sync/changes")
+def sync_changes(
+    cursor: Optional[str] = Query(None, description="Cursor from the previous batch; omit for a full sync"),
+    tables: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(SYNC_MODELS)}"),
+    limit: int = Query(500, ge=1, le=5000),
+    accept_encoding: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_active_user)
+):
+    names = [name.strip() for name in tables.split(",") if name.strip()] if tables else list(SYNC_MODELS)
+    unknown = [name for name in names if name not in SYNC_MODELS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown sync tables: {', '.join(unknown)}"
+        )
+
+    try:
+        batch = changes_since(db, cursor, names, limit)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    body = orjson.dumps(batch)
+    headers = {"Cache-Control": "no-store", "Vary": "Accept-Encoding"}
+    if len(body) >= GZIP_MIN_BYTES and "gzip" in (accept_encoding or "").lower():
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type="application/json", headers=headers)
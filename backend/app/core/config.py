@@ -10,10 +10,19 @@ class Settings(BaseSettings):
     
     # CORS Configuration
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = ["http://localhost:3000"]
+    CORS_ORIGINS: List[str] = ["http://localhost:3000"]
     
     # Database Configuration
     DATABASE_URL: str = "sqlite:///gas_tracker.db"  # SQLite database in the current directory
     
+    # Shared memory-mapped distance matrix between locations (see app/core/distance_matrix.py)
+    DISTANCE_MATRIX_DIR: str = "data/distance_matrix"
+    
+    # Offline device sync: rows changed in the last few seconds are held back so
+    # slow transactions cannot commit behind a device's high-water mark
+    SYNC_SETTLE_SECONDS: int = 5
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 90
+    
     # JWT Configuration
     SECRET_KEY: str = "your-secret-key-here"  # Change this in production!
     ALGORITHM: str = "HS256"
@@ -0,0 +1,227 @@
+import json
+import os
+import threading
+import numpy as np
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from app.core.geo import distance_matrix
+
+try:
+    import fcntl
+except ImportError:  # Non-POSIX: writers are only serialized within the process
+    fcntl = None
+
+class DistanceMatrixStore:
+    """Pairwise location distances kept in a memory-mapped file shared by all workers.
+
+    Layout in ``directory``:
+
+    - ``meta.json``: generation, capacity, size and a version bumped on every write
+    - ``ids-<gen>.i8`` / ``coords-<gen>.f8``: id and (lat, lon) per slot, id -1 marks a free slot
+    - ``matrix-<gen>.f4``: capacity x capacity float32 distances in km
+
+    Writers hold an exclusive file lock and only compute the rows and columns of
+    points that were added or moved. Readers map the files read-only, so every
+    worker shares the same page cache and a row read is a zero-copy view.
+    Growing past ``capacity`` starts a new generation of files; readers remap
+    when they notice it.
+
+    The matrix is dense, so it is sized for depots and customer sites (tens of
+    thousands of points), not for arbitrary coordinates.
+    """
+
+    def __init__(self, directory: str, initial_capacity: int = 1024):
+        self.directory = directory
+        self.initial_capacity = initial_capacity
+        self._lock = threading.RLock()
+        self._version = None
+        self._generation = None
+        self._ids = None
+        self._coords = None
+        self._matrix = None
+        self._slots: Dict[int, int] = {}
+        os.makedirs(directory, exist_ok=True)
+
+    # Files
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _read_meta(self) -> Optional[dict]:
+        try:
+            with open(self._path("meta.json")) as meta_file:
+                return json.load(meta_file)
+        except FileNotFoundError:
+            return None
+
+    def _write_meta(self, meta: dict):
+        temporary = self._path("meta.json.tmp")
+        with open(temporary, "w") as meta_file:
+            json.dump(meta, meta_file)
+        os.replace(temporary, self._path("meta.json"))
+
+    def _map(self, generation: int, capacity: int, mode: str):
+        ids = np.memmap(self._path(f"ids-{generation}.i8"), dtype=np.int64, mode=mode, shape=(capacity,))
+        coords = np.memmap(self._path(f"coords-{generation}.f8"), dtype=np.float64, mode=mode, shape=(capacity, 2))
+        matrix = np.memmap(self._path(f"matrix-{generation}.f4"), dtype=np.float32, mode=mode, shape=(capacity, capacity))
+        return ids, coords, matrix
+
+    def _create_generation(self, generation: int, capacity: int):
+        ids, coords, matrix = self._map(generation, capacity, "w+")
+        ids[:] = -1
+        return ids, coords, matrix
+
+    @contextmanager
+    def _write_lock(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self._path("lock"), "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def refresh(self) -> bool:
+        """Pick up writes from other workers; True when anything changed."""
+        with self._lock:
+            while True:
+                meta = self._read_meta()
+                if meta is None or meta["version"] == self._version:
+                    return False
+                if meta["generation"] == self._generation:
+                    break
+                try:
+                    self._ids, self._coords, self._matrix = self._map(meta["generation"], meta["capacity"], "r")
+                except FileNotFoundError:
+                    continue  # Grown again while we were mapping; re-read the metadata
+                self._generation = meta["generation"]
+                break
+            ids = np.asarray(self._ids)
+            slots = np.flatnonzero(ids >= 0)
+            self._slots = dict(zip(ids[slots].tolist(), slots.tolist()))
+            self._version = meta["version"]
+            return True
+
+    # Writes
+
+    def upsert(self, points: Mapping[int, Tuple[float, float]]) -> int:
+        """Add or move points; returns how many rows were recomputed."""
+        if not points:
+            return 0
+        with self._write_lock():
+            meta = self._read_meta() or {"generation": 0, "capacity": 0, "size": 0, "version": 0}
+            if meta["capacity"]:
+                ids, coords, matrix = self._map(meta["generation"], meta["capacity"], "r+")
+            else:
+                meta["capacity"] = self.initial_capacity
+                ids, coords, matrix = self._create_generation(meta["generation"], meta["capacity"])
+
+            slot_of = {point_id: slot for slot, point_id in enumerate(ids.tolist()) if point_id >= 0}
+            changed = {
+                point_id: coordinates for point_id, coordinates in points.items()
+                if point_id not in slot_of or tuple(coords[slot_of[point_id]]) != tuple(coordinates)
+            }
+            if not changed:
+                return 0
+
+            free = np.flatnonzero(ids < 0).tolist()
+            new_ids = [point_id for point_id in changed if point_id not in slot_of]
+            if len(new_ids) > len(free):
+                ids, coords, matrix = self._grow(meta, ids, coords, matrix, len(slot_of) + len(new_ids))
+                free = np.flatnonzero(ids < 0).tolist()
+            new_slots = dict(zip(new_ids, free))
+            slot_of.update(new_slots)
+
+            changed_slots = np.array([slot_of[point_id] for point_id in changed], dtype=np.int64)
+            coords[changed_slots] = np.array(list(changed.values()), dtype=np.float64)
+
+            # Only the changed rows are recomputed; the matrix is symmetric
+            used = np.union1d(np.flatnonzero(ids >= 0), changed_slots)
+            rows = distance_matrix(
+                coords[changed_slots, 0], coords[changed_slots, 1], coords[used, 0], coords[used, 1]
+            ).astype(np.float32)
+            for row, slot in zip(rows, changed_slots):
+                matrix[slot, used] = row
+                matrix[used, slot] = row
+
+            # Publish new ids last so readers never see a slot before its distances
+            for point_id, slot in new_slots.items():
+                ids[slot] = point_id
+            for array in (ids, coords, matrix):
+                array.flush()
+            retired = meta.pop("retired_generation", None)
+            meta["size"] = len(used)
+            meta["version"] += 1
+            self._write_meta(meta)
+            if retired is not None:
+                self._retire(retired)
+            return len(changed)
+
+    def remove(self, point_ids: Iterable[int]) -> int:
+        """Free the slots of ``point_ids``; their rows are overwritten on reuse."""
+        with self._write_lock():
+            meta = self._read_meta()
+            if meta is None:
+                return 0
+            ids, _, _ = self._map(meta["generation"], meta["capacity"], "r+")
+            removed = np.isin(ids, list(point_ids)) & (ids >= 0)
+            count = int(removed.sum())
+            if count:
+                ids[removed] = -1
+                ids.flush()
+                meta["size"] -= count
+                meta["version"] += 1
+                self._write_meta(meta)
+            return count
+
+    def _grow(self, meta: dict, ids, coords, matrix, needed: int):
+        capacity = meta["capacity"]
+        while capacity < needed:
+            capacity *= 2
+        old_generation, old_capacity = meta["generation"], meta["capacity"]
+        meta["generation"] += 1
+        meta["capacity"] = capacity
+        new_ids, new_coords, new_matrix = self._create_generation(meta["generation"], capacity)
+        new_ids[:old_capacity] = ids
+        new_coords[:old_capacity] = coords
+        new_matrix[:old_capacity, :old_capacity] = matrix
+        meta["retired_generation"] = old_generation
+        return new_ids, new_coords, new_matrix
+
+    def _retire(self, generation: int):
+        # Readers still holding the old mapping keep working until they remap
+        for name in (f"ids-{generation}.i8", f"coords-{generation}.f8", f"matrix-{generation}.f4"):
+            os.remove(self._path(name))
+
+    # Reads
+
+    def __contains__(self, point_id: int) -> bool:
+        self.refresh()
+        return point_id in self._slots
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._slots)
+
+    def slots(self, point_ids: Iterable[int]) -> np.ndarray:
+        """Matrix slots of ``point_ids``; raises KeyError for unknown ids."""
+        self.refresh()
+        return np.array([self._slots[point_id] for point_id in point_ids], dtype=np.int64)
+
+    def row(self, point_id: int) -> np.ndarray:
+        """Distances from one point, indexed by slot (a read-only view, no copy)."""
+        slot = self.slots([point_id])[0]
+        return self._matrix[slot]
+
+    def distance(self, from_id: int, to_id: int) -> float:
+        from_slot, to_slot = self.slots([from_id, to_id])
+        return float(self._matrix[from_slot, to_slot])
+
+    def submatrix(self, point_ids: List[int]) -> np.ndarray:
+        """Dense distance matrix between ``point_ids`` (in that order, duplicates allowed)."""
+        slots = self.slots(point_ids)
+        return np.asarray(self._matrix[np.ix_(slots, slots)], dtype=np.float64)
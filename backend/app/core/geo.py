@@ -0,0 +1,263 @@
+import math
+import threading
+import numpy as np
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {char: index for index, char in enumerate(_BASE32)}
+
+def encode_geohash(latitude: float, longitude: float, precision: int = 9) -> str:
+    """Standard base32 geohash; precision 9 is roughly a 5 m cell."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits <<= 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+def geohash_cell_size(precision: int) -> Tuple[float, float]:
+    """(lat_degrees, lon_degrees) covered by one geohash cell of ``precision``."""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+def decode_geohash(geohash: str) -> Tuple[float, float]:
+    """Center (latitude, longitude) of a geohash cell."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            target = lon_range if even else lat_range
+            mid = (target[0] + target[1]) / 2
+            if bit:
+                target[0] = mid
+            else:
+                target[1] = mid
+            even = not even
+    return (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
+
+def geohash_precision_for_radius(radius_km: float, latitude: float = 0.0) -> int:
+    """Longest precision whose cells are still at least ``radius_km`` tall and wide.
+
+    A point's own cell plus its eight neighbours then covers the whole radius.
+    Cells get narrower (in km) away from the equator, hence ``latitude``.
+    """
+    cos_lat = math.cos(math.radians(min(abs(latitude), 89.0)))
+    for precision in range(9, 0, -1):
+        lat_deg, lon_deg = geohash_cell_size(precision)
+        if min(lat_deg, lon_deg * cos_lat) * KM_PER_DEGREE >= radius_km:
+            return precision
+    return 0
+
+def geohash_neighbourhood(latitude: float, longitude: float, precision: int) -> List[str]:
+    """The geohash cell containing the point and its (up to) eight neighbours."""
+    lat_deg, lon_deg = geohash_cell_size(precision)
+    cells = []
+    for dlat in (-lat_deg, 0.0, lat_deg):
+        lat = latitude + dlat
+        if lat < -90.0 or lat > 90.0:
+            continue
+        for dlon in (-lon_deg, 0.0, lon_deg):
+            lon = (longitude + dlon + 180.0) % 360.0 - 180.0
+            cell = encode_geohash(lat, lon, precision)
+            if cell not in cells:
+                cells.append(cell)
+    return cells
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lon, max_lon) enclosing the radius; longitudes may wrap past ±180."""
+    dlat = radius_km / KM_PER_DEGREE
+    cos_lat = math.cos(math.radians(min(abs(latitude) + dlat, 90.0)))
+    dlon = 180.0 if cos_lat < 1e-9 else min(radius_km / (KM_PER_DEGREE * cos_lat), 180.0)
+    return latitude - dlat, latitude + dlat, longitude - dlon, longitude + dlon
+
+def haversine_km(latitude: float, longitude: float, latitudes, longitudes) -> np.ndarray:
+    """Great-circle distance from one point to arrays of points, vectorized."""
+    lat1 = math.radians(latitude)
+    lat2 = np.radians(np.asarray(latitudes, dtype=np.float64))
+    dlat = lat2 - lat1
+    dlon = np.radians(np.asarray(longitudes, dtype=np.float64) - longitude)
+    a = np.sin(dlat / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def distance_matrix(latitudes, longitudes, to_latitudes=None, to_longitudes=None) -> np.ndarray:
+    """Pairwise great-circle distances in km, computed by broadcasting.
+
+    Without ``to_*`` the matrix is square over the same points.
+    """
+    lat1 = np.radians(np.asarray(latitudes, dtype=np.float64))[:, None]
+    lon1 = np.radians(np.asarray(longitudes, dtype=np.float64))[:, None]
+    if to_latitudes is None:
+        lat2, lon2 = lat1.T, lon1.T
+    else:
+        lat2 = np.radians(np.asarray(to_latitudes, dtype=np.float64))[None, :]
+        lon2 = np.radians(np.asarray(to_longitudes, dtype=np.float64))[None, :]
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+class SpatialIndex:
+    """In-memory grid index over points, updated incrementally.
+
+    Points are bucketed into fixed lat/lon cells; a radius query only looks at
+    the cells overlapping the bounding box and then runs an exact, vectorized
+    haversine over those candidates. Nearest-k widens the radius until it has k
+    hits. Coordinates live in flat NumPy arrays addressed by slot, so removals
+    just free the slot for reuse.
+    """
+
+    def __init__(self, cell_degrees: float = 0.05, capacity: int = 1024):
+        self.cell_degrees = cell_degrees
+        self._lon_cells = int(math.ceil(360.0 / cell_degrees))
+        self._lat = np.zeros(capacity, dtype=np.float64)
+        self._lon = np.zeros(capacity, dtype=np.float64)
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._tags = np.zeros(capacity, dtype=np.int64)
+        self._slots: Dict[int, int] = {}
+        self._free: List[int] = []
+        self._size = 0
+        self._cells: Dict[Tuple[int, int], Set[int]] = defaultdict(set)
+        self._slot_cell: Dict[int, Tuple[int, int]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        row = int(math.floor((latitude + 90.0) / self.cell_degrees))
+        column = int(math.floor((longitude + 180.0) / self.cell_degrees)) % self._lon_cells
+        return row, column
+
+    def _grow(self):
+        capacity = len(self._lat) * 2
+        for name in ("_lat", "_lon", "_ids", "_tags"):
+            array = getattr(self, name)
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+
+    def upsert(self, point_id: int, latitude: float, longitude: float, tag: int = 0):
+        """Insert or move a point."""
+        with self._lock:
+            if point_id in self._slots:
+                self.remove(point_id)
+            if self._free:
+                slot = self._free.pop()
+            else:
+                if self._size == len(self._lat):
+                    self._grow()
+                slot = self._size
+                self._size += 1
+            self._lat[slot] = latitude
+            self._lon[slot] = longitude
+            self._ids[slot] = point_id
+            self._tags[slot] = tag
+            cell = self._cell(latitude, longitude)
+            self._cells[cell].add(slot)
+            self._slot_cell[slot] = cell
+            self._slots[point_id] = slot
+
+    def remove(self, point_id: int):
+        with self._lock:
+            slot = self._slots.pop(point_id, None)
+            if slot is None:
+                return
+            cell = self._slot_cell.pop(slot)
+            self._cells[cell].discard(slot)
+            if not self._cells[cell]:
+                del self._cells[cell]
+            self._free.append(slot)
+
+    def clear(self):
+        with self._lock:
+            self._slots.clear()
+            self._free.clear()
+            self._cells.clear()
+            self._slot_cell.clear()
+            self._size = 0
+
+    def _candidates(self, latitude: float, longitude: float, radius_km: float) -> np.ndarray:
+        min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+        first_row, _ = self._cell(max(min_lat, -90.0), 0.0)
+        last_row, _ = self._cell(min(max_lat, 90.0 - 1e-9), 0.0)
+        if max_lon - min_lon >= 360.0:
+            columns = range(self._lon_cells)
+        else:
+            first_column = int(math.floor((min_lon + 180.0) / self.cell_degrees))
+            last_column = int(math.floor((max_lon + 180.0) / self.cell_degrees))
+            columns = [column % self._lon_cells for column in range(first_column, last_column + 1)]
+
+        # Sparse indexes are cheaper to scan by occupied cell than by bounding box
+        box_cells = (last_row - first_row + 1) * len(columns)
+        slots: List[int] = []
+        if box_cells > len(self._cells):
+            column_set = set(columns)
+            for (row, column), cell_slots in self._cells.items():
+                if first_row <= row <= last_row and column in column_set:
+                    slots.extend(cell_slots)
+        else:
+            for row in range(first_row, last_row + 1):
+                for column in columns:
+                    cell_slots = self._cells.get((row, column))
+                    if cell_slots:
+                        slots.extend(cell_slots)
+        return np.fromiter(slots, dtype=np.int64, count=len(slots))
+
+    def within(self, latitude: float, longitude: float, radius_km: float,
+               tags: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+        """(id, distance_km) for every point within ``radius_km``, nearest first."""
+        with self._lock:
+            slots = self._candidates(latitude, longitude, radius_km)
+            if tags is not None and len(slots):
+                slots = slots[np.isin(self._tags[slots], list(tags))]
+            if not len(slots):
+                return []
+            distances = haversine_km(latitude, longitude, self._lat[slots], self._lon[slots])
+            hits = distances <= radius_km
+            slots, distances = slots[hits], distances[hits]
+            order = np.argsort(distances, kind="stable")
+            return list(zip(self._ids[slots[order]].tolist(), distances[order].tolist()))
+
+    def nearest(self, latitude: float, longitude: float, k: int = 10,
+                max_radius_km: Optional[float] = None,
+                tags: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+        """The ``k`` nearest points as (id, distance_km), nearest first."""
+        tags = None if tags is None else list(tags)
+        limit = max_radius_km or math.pi * EARTH_RADIUS_KM
+        radius = min(self.cell_degrees * KM_PER_DEGREE, limit)
+        while True:
+            hits = self.within(latitude, longitude, radius, tags)
+            # Every point within ``radius`` was examined, so the first k are exact
+            if len(hits) >= k or radius >= limit:
+                return hits[:k]
+            radius = min(radius * 4, limit)
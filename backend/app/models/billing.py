@@ -0,0 +1,55 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Float, Index, UniqueConstraint
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class BillingRun(Base):
+    """One invoicing pass over all leases for a billing period [period_start, period_end)."""
+    __tablename__ = "billing_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    period_start = Column(Date, nullable=False)
+    period_end = Column(Date, nullable=False)  # Exclusive
+    status = Column(String(20), nullable=False, default="running")  # running, completed
+    line_count = Column(Integer, default=0)
+    total_amount = Column(Float, default=0.0)
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True))
+    created_by = Column(Integer, ForeignKey("users.id"))
+
+    lines = relationship("InvoiceLine", back_populates="billing_run")
+
+    __table_args__ = (
+        UniqueConstraint("period_start", "period_end", name="uq_billing_runs_period"),
+    )
+
+    def __repr__(self):
+        return f"<BillingRun {self.period_start} - {self.period_end} ({self.status})>"
+
+class InvoiceLine(Base):
+    __tablename__ = "invoice_lines"
+
+    id = Column(Integer, primary_key=True, index=True)
+    billing_run_id = Column(Integer, ForeignKey("billing_runs.id"), nullable=False)
+    lease_id = Column(Integer, ForeignKey("lease_records.id"), nullable=False)
+    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False)
+    cylinder_id = Column(Integer, ForeignKey("cylinders.id"), nullable=False)
+    period_start = Column(Date, nullable=False)
+    period_end = Column(Date, nullable=False)
+    rental_days = Column(Integer, nullable=False)
+    lease_rate = Column(Float)
+    rental_amount = Column(Float, nullable=False)
+    additional_charges = Column(Float, nullable=False, default=0.0)
+    amount = Column(Float, nullable=False)
+
+    billing_run = relationship("BillingRun", back_populates="lines")
+
+    __table_args__ = (
+        # A lease is billed at most once per period, whatever happens to the run
+        UniqueConstraint("lease_id", "period_start", name="uq_invoice_lines_lease_period"),
+        Index("ix_invoice_lines_run_lease", "billing_run_id", "lease_id"),
+        Index("ix_invoice_lines_customer_period", "customer_id", "period_start"),
+    )
+
+    def __repr__(self):
+        return f"<InvoiceLine lease {self.lease_id} {self.period_start}: {self.amount}>"
@@ -42,6 +42,7 @@ class Cylinder(Base):
     next_hydro_test_date = Column(DateTime(timezone=True))
     status = Column(Enum(CylinderStatus), default=CylinderStatus.EMPTY)
     current_location = Column(String(255))  # Can be coordinates or location name
+    current_location_id = Column(Integer, ForeignKey("locations.id"), nullable=True, index=True)  # Counted in location_inventory
     current_customer_id = Column(Integer, ForeignKey("customers.id"), nullable=True)
     owner_id = Column(Integer, ForeignKey("customers.id"), nullable=False)
     last_modified_by = Column(Integer, ForeignKey("users.id"))
@@ -60,4 +61,7 @@ class Cylinder(Base):
     audit_records = relationship("AuditRecord", back_populates="cylinder")
 
     def __repr__(self):
-        return f"<Cylinder {self.serial_number}>" 
\ No newline at end of file
+        return f"<Cylinder {self.serial_number}>"
+
+# Registers LocationInventory and the listeners that keep its counters in step with cylinder writes
+from app.models import inventory  # noqa: E402,F401
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, Enum, Float, JSON
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, Enum, Float, Index, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -13,6 +13,10 @@ class FillStatus(str, enum.Enum):
 
 class FillRecord(Base):
     __tablename__ = "fill_records"
+    __table_args__ = (
+        # Batch recall: every cylinder filled from a batch, read from the index alone
+        Index("ix_fill_records_batch_cylinder_date", "batch_number", "cylinder_id", "fill_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     cylinder_id = Column(Integer, ForeignKey("cylinders.id"), nullable=False)
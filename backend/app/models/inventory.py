@@ -0,0 +1,83 @@
+from collections import Counter
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Enum, UniqueConstraint, event, inspect
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.core.database import Base
+from app.models.cylinder import Cylinder, CylinderStatus, CylinderType
+
+class LocationInventory(Base):
+    """Running count of the cylinders at a location, per gas type and status."""
+    __tablename__ = "location_inventory"
+
+    id = Column(Integer, primary_key=True, index=True)
+    location_id = Column(Integer, ForeignKey("locations.id"), nullable=False)
+    gas_type = Column(Enum(CylinderType), nullable=False)
+    status = Column(Enum(CylinderStatus), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("location_id", "gas_type", "status", name="uq_location_inventory_key"),
+    )
+
+    location = relationship("Location", back_populates="inventory")
+
+    def __repr__(self):
+        return f"<LocationInventory {self.location_id} {self.gas_type} {self.status}: {self.count}>"
+
+INVENTORY_KEY = ("location_id", "gas_type", "status")
+
+def _insert(connection):
+    if connection.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif connection.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upserts are not supported on {connection.dialect.name}")
+    return insert(LocationInventory.__table__)
+
+def apply_inventory_changes(connection, changes: Counter):
+    """Add ``changes`` ((location_id, gas_type, status) -> delta) to the counters on ``connection``."""
+    rows = [
+        dict(zip(INVENTORY_KEY, key), count=delta)
+        for key, delta in changes.items()
+        if delta and None not in key  # Cylinders without a location (or status) are not counted
+    ]
+    if not rows:
+        return
+    stmt = _insert(connection)
+    table = LocationInventory.__table__
+    connection.execute(stmt.on_conflict_do_update(
+        index_elements=list(INVENTORY_KEY),
+        set_={"count": table.c.count + stmt.excluded.count, "updated_at": func.now()}
+    ), rows)
+
+# Cylinders written through the ORM keep the counters current in the same
+# transaction; Core bulk writers diff the keys themselves (app.services.inventory).
+
+def _inventory_key(cylinder):
+    return (cylinder.current_location_id, cylinder.gas_type, cylinder.status)
+
+def _previous(state, name):
+    added, unchanged, deleted = state.attrs[name].history
+    if deleted:
+        return deleted[0]
+    return unchanged[0] if unchanged else state.attrs[name].value
+
+@event.listens_for(Cylinder, "after_insert")
+def _count_new_cylinder(mapper, connection, target):
+    apply_inventory_changes(connection, Counter({_inventory_key(target): 1}))
+
+@event.listens_for(Cylinder, "after_update")
+def _move_cylinder_count(mapper, connection, target):
+    state = inspect(target)
+    previous = tuple(_previous(state, name) for name in ("current_location_id", "gas_type", "status"))
+    current = _inventory_key(target)
+    if previous != current:
+        apply_inventory_changes(connection, Counter({previous: -1, current: 1}))
+
+@event.listens_for(Cylinder, "after_delete")
+def _uncount_deleted_cylinder(mapper, connection, target):
+    state = inspect(target)
+    previous = tuple(_previous(state, name) for name in ("current_location_id", "gas_type", "status"))
+    apply_inventory_changes(connection, Counter({previous: -1}))
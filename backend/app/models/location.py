@@ -1,8 +1,9 @@
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, Enum, Float, JSON
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, Enum, Float, JSON, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
 from app.core.database import Base
+from app.core.geo import encode_geohash
 
 class LocationType(str, enum.Enum):
     WAREHOUSE = "warehouse"
@@ -26,6 +27,7 @@ class Location(Base):
     country = Column(String(100), nullable=False)
     latitude = Column(Float)
     longitude = Column(Float)
+    geohash = Column(String(12), index=True)  # Derived from latitude/longitude for proximity prefilters
     contact_name = Column(String(255))
     contact_phone = Column(String(50))
     contact_email = Column(String(255))
@@ -46,4 +48,12 @@ class Location(Base):
     audit_records = relationship("AuditRecord", back_populates="location")
 
     def __repr__(self):
-        return f"<Location {self.name}>" 
\ No newline at end of file
+        return f"<Location {self.name}>"
+
+@event.listens_for(Location, "before_insert")
+@event.listens_for(Location, "before_update")
+def set_location_geohash(mapper, connection, target):
+    if target.latitude is None or target.longitude is None:
+        target.geohash = None
+    else:
+        target.geohash = encode_geohash(target.latitude, target.longitude)
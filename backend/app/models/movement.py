@@ -40,7 +40,7 @@ class CylinderMovement(Base):
     proof_of_delivery = Column(String(1000))  # URL to POD document
     barcode_scan = Column(String(100))
     gps_location = Column(String(100))
-    metadata = Column(JSON)  # Additional movement-specific data
+    movement_metadata = Column("metadata", JSON)  # Additional movement-specific data
     created_by = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
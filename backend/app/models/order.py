@@ -53,7 +53,7 @@ class Order(Base):
     signature = Column(String(1000))  # Base64 encoded signature
     proof_of_delivery = Column(String(1000))  # URL to POD document
     notes = Column(String(1000))
-    metadata = Column(JSON)  # Additional order-specific data
+    order_metadata = Column("metadata", JSON)  # Additional order-specific data
     created_by = Column(Integer, ForeignKey("users.id"))
     last_modified_by = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class Tombstone(Base):
+    """Marker left behind by a deleted row so offline devices can drop their copy."""
+    __tablename__ = "sync_tombstones"
+
+    id = Column(Integer, primary_key=True, index=True)
+    table_name = Column(String(100), nullable=False)
+    row_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_sync_tombstones_table_deleted_at", "table_name", "deleted_at", "id"),
+    )
+
+    def __repr__(self):
+        return f"<Tombstone {self.table_name}:{self.row_id}>"
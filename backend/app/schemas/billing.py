@@ -0,0 +1,35 @@
+from datetime import date, datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+class BillingRunRequest(BaseModel):
+    year: int = Field(..., ge=2000, le=2100)
+    month: int = Field(..., ge=1, le=12)
+    rebill: bool = False  # Discard the period's lines and bill it again
+
+class BillingRunResponse(BaseModel):
+    id: int
+    period_start: date
+    period_end: date  # Exclusive
+    status: str
+    line_count: int
+    total_amount: float
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+class InvoiceLineResponse(BaseModel):
+    id: int
+    lease_id: int
+    customer_id: int
+    cylinder_id: int
+    period_start: date
+    period_end: date
+    rental_days: int
+    lease_rate: Optional[float] = None
+    rental_amount: float
+    additional_charges: float
+    amount: float
+
+class InvoiceLinePage(BaseModel):
+    lines: List[InvoiceLineResponse]
+    next_after_id: Optional[int] = None  # Pass as after_id for the next page
@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import List
+from pydantic import BaseModel
+
+class FillIngestError(BaseModel):
+    index: int  # Position of the fill in the request body (line or record number, from 0)
+    error: str
+
+class FillIngestResult(BaseModel):
+    accepted: int
+    rejected: int
+    errors: List[FillIngestError]  # The first MAX_ERRORS only
+
+class FillBatchSummary(BaseModel):
+    batch_number: str
+    fills: int
+    cylinders: int
+    first_filled: datetime
+    last_filled: datetime
@@ -0,0 +1,45 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+class NearbyLocation(BaseModel):
+    id: int
+    name: str
+    location_type: str
+    latitude: float
+    longitude: float
+    distance_km: float
+
+    class Config:
+        from_attributes = True
+
+class NearbyCylinder(BaseModel):
+    cylinder_id: int
+    location_id: int
+    distance_km: float
+
+class CylindersNearby(BaseModel):
+    locations: List[NearbyLocation]
+    cylinders: List[NearbyCylinder]
+    truncated: Optional[bool] = False
+
+class LocationStock(BaseModel):
+    gas_type: str
+    status: str
+    count: int
+
+class LocationInventory(BaseModel):
+    location_id: int
+    total: int
+    stock: List[LocationStock]
+
+class InventoryDrift(BaseModel):
+    location_id: int
+    gas_type: str
+    status: str
+    expected: int
+    stored: int
+
+class InventoryReconciliation(BaseModel):
+    counters: int
+    corrected: int
+    drift: List[InventoryDrift]
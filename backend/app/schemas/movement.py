@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+
+from app.models.movement import MovementStatus, MovementType
+
+class MovementCreate(BaseModel):
+    cylinder_id: int
+    movement_type: MovementType
+    # Drivers record movements as they happen; schedule ahead with "pending"
+    status: MovementStatus = MovementStatus.COMPLETED
+    from_location_id: Optional[int] = None
+    to_location_id: Optional[int] = None
+    from_customer_id: Optional[int] = None
+    to_customer_id: Optional[int] = None
+    order_id: Optional[int] = None
+    scheduled_date: Optional[datetime] = None
+    actual_date: Optional[datetime] = None
+    notes: Optional[str] = None
+    barcode_scan: Optional[str] = None
+    gps_location: Optional[str] = None
+
+class MovementRecorded(BaseModel):
+    id: int
+    cylinder_id: int
+    status: MovementStatus
+    to_location_id: Optional[int] = None
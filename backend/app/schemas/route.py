@@ -0,0 +1,24 @@
+from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+class RoutePlanRequest(BaseModel):
+    date: date
+    depot_location_id: int
+    driver_ids: List[int] = Field(..., min_length=1)
+    vehicle_capacity: Optional[int] = Field(None, gt=0)  # Cylinders per truck
+    time_budget_seconds: float = Field(2.0, gt=0, le=30)
+    apply: bool = False  # Assign the planned drivers to the orders
+
+class DriverRoute(BaseModel):
+    driver_id: int
+    order_ids: List[int]
+    location_ids: List[int]
+    distance_km: float
+
+class RoutePlanResponse(BaseModel):
+    routes: List[DriverRoute]
+    total_distance_km: float
+    unrouted_order_ids: List[int]  # Orders without a geocoded stop
+    converged: bool
+    elapsed_ms: float
@@ -0,0 +1,164 @@
+import calendar
+from datetime import date, datetime, time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import and_, delete, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.billing import BillingRun, InvoiceLine
+from app.models.lease import LeaseRecord, LeaseStatus
+
+# Lease billing runs.
+#
+# A run bills every lease that overlaps the period [period_start, period_end):
+# leases are read in id order, CHUNK_SIZE at a time, and rental days for the
+# whole chunk are computed at once with NumPy date arithmetic, then the
+# invoice lines are inserted in one statement and committed. The period's
+# BillingRun row makes the run idempotent: a completed period is returned
+# as-is, and an interrupted one resumes after the last lease it billed.
+#
+# Day counting: the start day and the return day are both billed. A lease with
+# no return date is out until lease_end, or indefinitely while still ACTIVE.
+# lease_rate is the daily rate; additional_charges are billed once, in the
+# period the cylinder comes back.
+
+CHUNK_SIZE = 10000
+BILLABLE_STATUSES = [LeaseStatus.ACTIVE, LeaseStatus.EXPIRED, LeaseStatus.TERMINATED]
+
+lease_table = LeaseRecord.__table__
+run_table = BillingRun.__table__
+line_table = InvoiceLine.__table__
+
+def month_period(year: int, month: int) -> Tuple[date, date]:
+    last_day = calendar.monthrange(year, month)[1]
+    start = date(year, month, 1)
+    return start, date.fromordinal(start.toordinal() + last_day)
+
+def _days(values: pd.Series) -> np.ndarray:
+    """Timestamps (naive UTC or aware) as datetime64[D] UTC calendar days; missing values are NaT."""
+    return pd.to_datetime(values, utc=True).dt.tz_localize(None).to_numpy().astype("datetime64[D]")
+
+def rental_days(starts: np.ndarray, ends: np.ndarray, period_start: date, period_end: date) -> np.ndarray:
+    """Billable days of each lease inside [period_start, period_end); NaT ends are still out."""
+    first = np.datetime64(period_start, "D")
+    stop = np.datetime64(period_end, "D")
+    begin = np.maximum(starts, first)
+    # The return day is billed, so a lease covers [start, end + 1 day)
+    finish = np.where(np.isnat(ends), stop, np.minimum(ends + np.timedelta64(1, "D"), stop))
+    return np.clip((finish - begin).astype(np.int64), 0, None)
+
+def compute_lines(leases: pd.DataFrame, period_start: date, period_end: date) -> pd.DataFrame:
+    """Invoice lines for a chunk of leases (columns as read by ``_lease_chunk``)."""
+    starts = _days(leases["lease_start"])
+    returned = _days(leases["actual_return_date"])
+    scheduled_end = _days(leases["lease_end"])
+    still_out = (leases["status"] == LeaseStatus.ACTIVE.name).to_numpy()
+    ends = np.where(np.isnat(returned), np.where(still_out, np.datetime64("NaT"), scheduled_end), returned)
+    # Ended leases with no end date on record bill nothing, rather than running on forever
+    unknown_end = np.isnat(ends) & ~still_out
+
+    days = np.where(unknown_end, 0, rental_days(starts, ends.astype("datetime64[D]"), period_start, period_end))
+    rates = leases["lease_rate"].fillna(0.0).to_numpy(dtype=float)
+    returned_in_period = (returned >= np.datetime64(period_start, "D")) & (returned < np.datetime64(period_end, "D"))
+    charges = np.where(returned_in_period, leases["additional_charges"].fillna(0.0).to_numpy(dtype=float), 0.0)
+
+    rental_amount = np.round(days * rates, 2)
+    lines = pd.DataFrame({
+        "lease_id": leases["id"].to_numpy(),
+        "customer_id": leases["customer_id"].to_numpy(),
+        "cylinder_id": leases["cylinder_id"].to_numpy(),
+        "rental_days": days,
+        "lease_rate": rates,
+        "rental_amount": rental_amount,
+        "additional_charges": charges,
+        "amount": np.round(rental_amount + charges, 2),
+    })
+    return lines[(days > 0) | (charges > 0)]
+
+def _lease_chunk(db: Session, period_start: date, period_end: date, after_id: int, chunk_size: int) -> pd.DataFrame:
+    start = datetime.combine(period_start, time.min)
+    end = datetime.combine(period_end, time.min)
+    stmt = select(
+        lease_table.c.id, lease_table.c.customer_id, lease_table.c.cylinder_id,
+        lease_table.c.lease_start, lease_table.c.lease_end, lease_table.c.actual_return_date,
+        lease_table.c.status, lease_table.c.lease_rate, lease_table.c.additional_charges
+    ).where(
+        lease_table.c.id > after_id,
+        lease_table.c.status.in_(BILLABLE_STATUSES),
+        lease_table.c.lease_start < end,
+        or_(
+            lease_table.c.actual_return_date >= start,
+            and_(
+                lease_table.c.actual_return_date.is_(None),
+                or_(
+                    lease_table.c.status == LeaseStatus.ACTIVE,
+                    lease_table.c.lease_end >= start
+                )
+            )
+        )
+    ).order_by(lease_table.c.id).limit(chunk_size)
+    rows = db.execute(stmt).all()
+    leases = pd.DataFrame(rows, columns=[
+        "id", "customer_id", "cylinder_id", "lease_start", "lease_end", "actual_return_date",
+        "status", "lease_rate", "additional_charges"
+    ])
+    # Enum members as stored (names), so the ACTIVE check is a plain string compare
+    leases["status"] = [status.name if isinstance(status, LeaseStatus) else status for status in leases["status"]]
+    return leases
+
+def _run_row(db: Session, run_id: int) -> Dict:
+    return dict(db.execute(select(run_table).where(run_table.c.id == run_id)).mappings().one())
+
+def run_billing(db: Session, period_start: date, period_end: date, created_by: Optional[int] = None,
+                rebill: bool = False, chunk_size: int = CHUNK_SIZE) -> Dict:
+    """Bill every lease for the period; returns the BillingRun row.
+
+    Safe to call again: a completed period is returned unchanged unless ``rebill``
+    is set, which deletes its lines and bills it from scratch.
+    """
+    if period_end <= period_start:
+        raise ValueError("period_end must be after period_start")
+
+    run = db.execute(select(run_table).where(
+        run_table.c.period_start == period_start, run_table.c.period_end == period_end
+    )).mappings().first()
+    if run is None:
+        run_id = db.execute(insert(run_table).values(
+            period_start=period_start, period_end=period_end, status="running", created_by=created_by
+        )).inserted_primary_key[0]
+        db.commit()
+    else:
+        run_id = run["id"]
+        if run["status"] == "completed" and not rebill:
+            return dict(run)
+        if rebill:
+            db.execute(delete(line_table).where(line_table.c.billing_run_id == run_id))
+            db.execute(update(run_table).where(run_table.c.id == run_id).values(status="running", completed_at=None))
+            db.commit()
+
+    # Lines are committed per chunk in lease id order, so resume after the last one
+    last_id = db.execute(
+        select(func.max(line_table.c.lease_id)).where(line_table.c.billing_run_id == run_id)
+    ).scalar() or 0
+    while True:
+        leases = _lease_chunk(db, period_start, period_end, last_id, chunk_size)
+        if leases.empty:
+            break
+        lines = compute_lines(leases, period_start, period_end)
+        if not lines.empty:
+            lines = lines.assign(billing_run_id=run_id, period_start=period_start, period_end=period_end)
+            db.execute(insert(line_table), lines.to_dict("records"))
+        db.commit()
+        last_id = int(leases["id"].iloc[-1])
+
+    line_count, total_amount = db.execute(
+        select(func.count(line_table.c.id), func.coalesce(func.sum(line_table.c.amount), 0.0))
+        .where(line_table.c.billing_run_id == run_id)
+    ).one()
+    db.execute(update(run_table).where(run_table.c.id == run_id).values(
+        status="completed", line_count=line_count, total_amount=round(total_amount, 2), completed_at=func.now()
+    ))
+    db.commit()
+    return _run_row(db, run_id)
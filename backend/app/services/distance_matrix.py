@@ -0,0 +1,68 @@
+import numpy as np
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.core.config import settings
+from app.core.distance_matrix import DistanceMatrixStore
+from app.models.location import Location
+
+_store: Optional[DistanceMatrixStore] = None
+
+def location_distance_store() -> DistanceMatrixStore:
+    global _store
+    if _store is None:
+        _store = DistanceMatrixStore(settings.DISTANCE_MATRIX_DIR)
+    return _store
+
+def location_distances(db: Session, location_ids: List[int]) -> np.ndarray:
+    """Distance matrix (km) between ``location_ids``, in order.
+
+    Locations missing from the shared store are loaded and added first, so the
+    store fills up lazily with the locations that are actually routed.
+    """
+    store = location_distance_store()
+    missing = [location_id for location_id in set(location_ids) if location_id not in store]
+    if missing:
+        rows = db.execute(
+            select(Location.id, Location.latitude, Location.longitude).where(
+                Location.id.in_(missing),
+                Location.latitude.isnot(None),
+                Location.longitude.isnot(None)
+            )
+        ).all()
+        if len(rows) != len(missing):
+            found = {row[0] for row in rows}
+            raise ValueError(f"Locations without coordinates: {sorted(set(missing) - found)}")
+        store.upsert({location_id: (latitude, longitude) for location_id, latitude, longitude in rows})
+    return store.submatrix(location_ids)
+
+@event.listens_for(Session, "after_flush")
+def _collect_location_moves(session, flush_context):
+    # Coordinates are captured now: after_commit cannot load expired attributes
+    moved = session.info.setdefault("distance_matrix_locations", {})
+    for instance in list(session.new) + list(session.dirty):
+        if isinstance(instance, Location):
+            if instance.latitude is None or instance.longitude is None:
+                moved[instance.id] = None
+            else:
+                moved[instance.id] = (instance.latitude, instance.longitude)
+    for instance in session.deleted:
+        if isinstance(instance, Location):
+            moved[instance.id] = None
+
+@event.listens_for(Session, "after_commit")
+def _apply_location_moves(session):
+    moved = session.info.pop("distance_matrix_locations", None)
+    # Nothing to keep current until the store has been populated
+    if not moved or not len(location_distance_store()):
+        return
+    store = location_distance_store()
+    store.remove([location_id for location_id, coordinates in moved.items() if coordinates is None])
+    store.upsert({
+        location_id: coordinates for location_id, coordinates in moved.items() if coordinates is not None
+    })
+
+@event.listens_for(Session, "after_rollback")
+def _discard_location_moves(session):
+    session.info.pop("distance_matrix_locations", None)
@@ -0,0 +1,211 @@
+from datetime import timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import orjson
+import pandas as pd
+from sqlalchemy import bindparam, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.cylinder import Cylinder, CylinderStatus
+from app.models.fill import FillRecord, FillStatus
+from app.models.location import Location
+from app.models.user import User
+from app.services.inventory import inventory_keys, record_inventory_changes
+
+# Fill ingestion for the plant's automated rigs.
+#
+# A request carries many fills, either as NDJSON (one object per line) or as a
+# packed array of FILL_DTYPE records. Both are parsed column-wise into a
+# DataFrame, validated in bulk (including one IN query per referenced table),
+# and written BATCH_SIZE rows at a time: the fills with one executemany INSERT
+# and the affected cylinders with one executemany UPDATE, in the same
+# transaction, so a cylinder never shows a fill that was not stored.
+#
+# A completed fill marks its cylinder FULL and sets last_fill_date, unless a
+# quality test failed, which sends it to MAINTENANCE. A fill older than the
+# cylinder's last_fill_date (a rig replaying its buffer) leaves the cylinder
+# alone. Other fill statuses are stored without touching the cylinder. Status
+# changes are carried into the location_inventory counters in the same batch.
+
+BATCH_SIZE = 5000
+MAX_ERRORS = 100
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+BINARY_MEDIA_TYPE = "application/vnd.gastracker.fills"
+
+FILL_STATUSES = list(FillStatus)
+
+# Binary layout: little-endian, packed, 72 bytes per fill. NaN floats are
+# missing values; fill_date is microseconds since the Unix epoch (UTC); status
+# indexes FILL_STATUSES; tests holds two bits per test (run, passed) for the
+# pressure, leak and purity tests, from the low bits up.
+FILL_DTYPE = np.dtype([
+    ("cylinder_id", "<u4"),
+    ("location_id", "<u4"),
+    ("operator_id", "<u4"),
+    ("fill_date", "<i8"),
+    ("status", "u1"),
+    ("tests", "u1"),
+    ("initial_pressure", "<f4"),
+    ("final_pressure", "<f4"),
+    ("fill_amount", "<f4"),
+    ("gas_purity", "<f4"),
+    ("cost", "<f4"),
+    ("batch_number", "S30"),
+])
+TESTS = ("pressure_test_passed", "leak_test_passed", "purity_test_passed")
+
+REQUIRED = ("cylinder_id", "location_id", "operator_id", "fill_date")
+FLOATS = ("initial_pressure", "final_pressure", "fill_amount", "gas_purity", "cost")
+STRINGS = {"batch_number": 100, "work_order_number": 100, "test_notes": 500, "notes": 1000}
+COLUMNS = REQUIRED + ("status",) + FLOATS + TESTS + tuple(STRINGS)
+
+fills = FillRecord.__table__
+cylinders = Cylinder.__table__
+
+class FillFormatError(ValueError):
+    pass
+
+def parse_ndjson(body: bytes) -> pd.DataFrame:
+    records = []
+    for number, line in enumerate(body.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            raise FillFormatError(f"Line {number}: {e}")
+        if not isinstance(record, dict):
+            raise FillFormatError(f"Line {number}: expected a JSON object")
+        records.append(record)
+    frame = pd.DataFrame.from_records(records, columns=COLUMNS)
+    frame["fill_date"] = pd.to_datetime(frame["fill_date"], utc=True, errors="coerce", format="ISO8601")
+    frame["status"] = frame["status"].fillna(FillStatus.COMPLETED.value)
+    return frame
+
+def parse_binary(body: bytes) -> pd.DataFrame:
+    if len(body) % FILL_DTYPE.itemsize:
+        raise FillFormatError(f"Body length is not a multiple of the {FILL_DTYPE.itemsize}-byte fill record")
+    packed = np.frombuffer(body, dtype=FILL_DTYPE)
+    frame = pd.DataFrame({name: packed[name] for name in ("cylinder_id", "location_id", "operator_id", *FLOATS)})
+    frame["fill_date"] = pd.to_datetime(packed["fill_date"], unit="us", utc=True)
+    statuses = packed["status"].astype(np.int64)
+    # Out-of-range codes become None and are rejected by validate()
+    names = np.array([status.value for status in FILL_STATUSES] + [None], dtype=object)
+    frame["status"] = names[np.minimum(statuses, len(FILL_STATUSES))]
+    for bit, name in enumerate(TESTS):
+        run = (packed["tests"] >> (2 * bit)) & 1
+        passed = (packed["tests"] >> (2 * bit + 1)) & 1
+        frame[name] = pd.Series(passed.astype(bool), dtype=object).where(run.astype(bool), None)
+    frame["batch_number"] = pd.Series(np.char.decode(packed["batch_number"], "ascii", "replace")).replace("", None)
+    for name in ("work_order_number", "test_notes", "notes"):
+        frame[name] = None
+    return frame[list(COLUMNS)]
+
+def pack_fills(records: Iterable[dict]) -> bytes:
+    """Encode fills in the binary format (what a rig sends)."""
+    records = list(records)
+    packed = np.zeros(len(records), dtype=FILL_DTYPE)
+    for index, record in enumerate(records):
+        fill_date = record["fill_date"]
+        if fill_date.tzinfo is None:
+            fill_date = fill_date.replace(tzinfo=timezone.utc)
+        tests = 0
+        for bit, name in enumerate(TESTS):
+            if record.get(name) is not None:
+                tests |= (1 | (bool(record[name]) << 1)) << (2 * bit)
+        packed[index] = (
+            record["cylinder_id"], record["location_id"], record["operator_id"],
+            int(fill_date.timestamp() * 1_000_000),
+            FILL_STATUSES.index(FillStatus(record.get("status", FillStatus.COMPLETED.value))), tests,
+            *(np.nan if record.get(name) is None else record[name] for name in FLOATS),
+            (record.get("batch_number") or "").encode("ascii"),
+        )
+    return packed.tobytes()
+
+def _existing(db: Session, column, ids: np.ndarray) -> np.ndarray:
+    ids = np.unique(ids)
+    found = []
+    for offset in range(0, len(ids), 1000):
+        chunk = [int(value) for value in ids[offset:offset + 1000]]
+        found.extend(db.execute(select(column).where(column.in_(chunk))).scalars())
+    return np.array(found, dtype=np.int64)
+
+def validate(db: Session, frame: pd.DataFrame) -> Tuple[pd.DataFrame, List[dict]]:
+    """Split ``frame`` into valid fills and per-record errors (index is the record's position)."""
+    problems = pd.Series("", index=frame.index)
+
+    def reject(mask, message):
+        problems[mask & (problems == "")] = message
+
+    for name in ("cylinder_id", "location_id", "operator_id"):
+        values = pd.to_numeric(frame[name], errors="coerce")
+        reject(values.isna() | (values <= 0) | (values % 1 != 0), f"{name} must be a positive integer")
+        frame[name] = values.fillna(0).astype(np.int64)
+    reject(frame["fill_date"].isna(), "fill_date is missing or not an ISO 8601 timestamp")
+    reject(~frame["status"].isin([status.value for status in FILL_STATUSES]), "unknown status")
+    for name in FLOATS:
+        frame[name] = pd.to_numeric(frame[name], errors="coerce")
+    for name in TESTS:
+        reject(~frame[name].map(lambda value: value is None or isinstance(value, bool) or pd.isna(value)), f"{name} must be a boolean")
+    for name, length in STRINGS.items():
+        reject(frame[name].map(lambda value: isinstance(value, str) and len(value) > length), f"{name} is longer than {length}")
+
+    for name, column in (("cylinder_id", cylinders.c.id), ("location_id", Location.__table__.c.id),
+                         ("operator_id", User.__table__.c.id)):
+        candidates = frame.loc[problems == "", name].to_numpy()
+        reject(~frame[name].isin(_existing(db, column, candidates)), f"{name} does not exist")
+
+    errors = [{"index": int(index), "error": message} for index, message in problems[problems != ""].items()]
+    return frame[problems == ""], errors
+
+def _fill_rows(batch: pd.DataFrame, created_by: Optional[int]) -> List[dict]:
+    dates = [timestamp.to_pydatetime() for timestamp in batch["fill_date"].dt.tz_convert("UTC")]
+    rows = batch.astype(object).where(batch.notna(), None).to_dict("records")
+    for row, fill_date in zip(rows, dates):
+        row["fill_date"] = fill_date
+        row["status"] = FillStatus(row["status"])
+        row["created_by"] = created_by
+        row["last_modified_by"] = created_by
+    return rows
+
+def _cylinder_updates(batch: pd.DataFrame) -> List[dict]:
+    completed = batch[batch["status"] == FillStatus.COMPLETED.value]
+    if completed.empty:
+        return []
+    failed = np.zeros(len(completed), dtype=bool)
+    for name in TESTS:
+        failed |= completed[name].map(lambda value: value is False).to_numpy()
+    latest = completed.assign(failed=failed).sort_values("fill_date").drop_duplicates("cylinder_id", keep="last")
+    return [
+        {
+            "cylinder": int(row.cylinder_id),
+            "fill_date": row.fill_date.to_pydatetime(),
+            "new_status": CylinderStatus.MAINTENANCE if row.failed else CylinderStatus.FULL,
+        }
+        for row in latest.itertuples()
+    ]
+
+def ingest_fills(db: Session, frame: pd.DataFrame, created_by: Optional[int] = None,
+                 batch_size: int = BATCH_SIZE) -> Dict:
+    """Validate and store parsed fills; returns accepted/rejected counts and the first errors."""
+    frame = frame.reset_index(drop=True)
+    valid, errors = validate(db, frame)
+    update_cylinder = update(cylinders).where(
+        cylinders.c.id == bindparam("cylinder"),
+        or_(cylinders.c.last_fill_date.is_(None), cylinders.c.last_fill_date <= bindparam("fill_date"))
+    ).values(last_fill_date=bindparam("fill_date"), status=bindparam("new_status"), updated_at=func.now())
+
+    for offset in range(0, len(valid), batch_size):
+        batch = valid.iloc[offset:offset + batch_size]
+        # Fills and the cylinders they touch commit together
+        db.execute(insert(fills), _fill_rows(batch, created_by))
+        updates = _cylinder_updates(batch)
+        if updates:
+            touched = [row["cylinder"] for row in updates]
+            before = inventory_keys(db, touched)
+            db.execute(update_cylinder, updates)
+            record_inventory_changes(db, before, inventory_keys(db, touched))
+        db.commit()
+    return {"accepted": len(valid), "rejected": len(errors), "errors": errors[:MAX_ERRORS]}
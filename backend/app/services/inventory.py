@@ -0,0 +1,155 @@
+from collections import Counter
+from typing import Dict, Iterable, List
+
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.cylinder import Cylinder
+from app.models.inventory import INVENTORY_KEY, LocationInventory, apply_inventory_changes
+from app.models.movement import CylinderMovement, MovementStatus
+
+# Per-location stock counters.
+#
+# location_inventory holds one row per (location, gas type, status) with the
+# number of cylinders whose current_location_id, gas_type and status match, so
+# a depot's stock is a handful of indexed rows rather than a GROUP BY over the
+# fleet. ORM writes to cylinders update the counters through mapper events
+# (app.models.inventory); Core bulk updates snapshot the keys of the rows they
+# touch before and after and apply the difference in the same transaction.
+# reconcile_inventory() recounts from cylinders and repairs any drift, e.g.
+# from raw SQL run against the table.
+#
+# current_location_id itself follows completed movements: record_movement()
+# moves the cylinder as the movement is written, and
+# backfill_current_locations() sets it from movement history for cylinders
+# written before the column existed.
+
+cylinders = Cylinder.__table__
+inventory = LocationInventory.__table__
+movements = CylinderMovement.__table__
+
+class UnknownCylinder(LookupError):
+    pass
+
+def inventory_keys(db: Session, cylinder_ids: Iterable[int]) -> Dict[int, tuple]:
+    """cylinder_id -> (location_id, gas_type, status) for ``cylinder_ids``."""
+    ids = sorted(set(cylinder_ids))
+    keys = {}
+    for offset in range(0, len(ids), 1000):
+        rows = db.execute(
+            select(cylinders.c.id, cylinders.c.current_location_id, cylinders.c.gas_type, cylinders.c.status)
+            .where(cylinders.c.id.in_(ids[offset:offset + 1000]))
+        )
+        keys.update((cylinder_id, tuple(key)) for cylinder_id, *key in rows)
+    return keys
+
+def record_inventory_changes(db: Session, before: Dict[int, tuple], after: Dict[int, tuple]):
+    """Apply the counter changes between two ``inventory_keys`` snapshots of the same cylinders."""
+    changes = Counter()
+    for cylinder_id in before.keys() | after.keys():
+        old, new = before.get(cylinder_id), after.get(cylinder_id)
+        if old == new:
+            continue
+        if old is not None:
+            changes[old] -= 1
+        if new is not None:
+            changes[new] += 1
+    apply_inventory_changes(db.connection(), changes)
+
+def location_stock(db: Session, location_id: int) -> List[dict]:
+    rows = db.execute(
+        select(inventory.c.gas_type, inventory.c.status, inventory.c.count)
+        .where(inventory.c.location_id == location_id, inventory.c.count != 0)
+        .order_by(inventory.c.gas_type, inventory.c.status)
+    ).mappings().all()
+    return [dict(row) for row in rows]
+
+def count_inventory(db: Session) -> Counter:
+    """The counters as they should be, grouped straight from cylinders."""
+    rows = db.execute(
+        select(cylinders.c.current_location_id, cylinders.c.gas_type, cylinders.c.status, func.count())
+        .where(cylinders.c.current_location_id.is_not(None), cylinders.c.status.is_not(None))
+        .group_by(cylinders.c.current_location_id, cylinders.c.gas_type, cylinders.c.status)
+    )
+    return Counter({tuple(key): count for *key, count in rows})
+
+def reconcile_inventory(db: Session) -> Dict:
+    """Recount every location and fix the counters that drifted; returns what was corrected."""
+    expected = count_inventory(db)
+    stored = Counter({
+        tuple(key): count
+        for *key, count in db.execute(select(*(inventory.c[name] for name in INVENTORY_KEY), inventory.c.count))
+    })
+    drift = Counter({key: expected[key] - stored[key] for key in expected.keys() | stored.keys() if expected[key] != stored[key]})
+    apply_inventory_changes(db.connection(), drift)
+    # Keys nothing is counted under any more
+    db.execute(delete(inventory).where(inventory.c.count == 0))
+    db.commit()
+    return {
+        "counters": len(expected),
+        "corrected": len(drift),
+        "drift": [
+            dict(zip(INVENTORY_KEY, key), expected=expected[key], stored=stored[key])
+            for key in sorted(drift, key=lambda key: (key[0], key[1].value, key[2].value))
+        ],
+    }
+
+def record_movement(db: Session, values: dict) -> int:
+    """Insert a movement; a completed one also moves the cylinder to ``to_location_id``.
+
+    Movements with no ``to_location_id`` (e.g. out on a truck) leave the
+    cylinder at no location. Returns the new movement's id.
+    """
+    cylinder_id = values["cylinder_id"]
+    before = inventory_keys(db, [cylinder_id])
+    if not before:
+        raise UnknownCylinder(f"Cylinder {cylinder_id} not found")
+    movement_id = db.execute(insert(movements).values(**values)).inserted_primary_key[0]
+    if values.get("status", MovementStatus.PENDING) == MovementStatus.COMPLETED:
+        db.execute(
+            update(cylinders).where(cylinders.c.id == cylinder_id).values(current_location_id=values.get("to_location_id"))
+        )
+        record_inventory_changes(db, before, inventory_keys(db, [cylinder_id]))
+    db.commit()
+    return movement_id
+
+def backfill_current_locations(db: Session, batch_size: int = 1000) -> int:
+    """Set current_location_id from each cylinder's latest completed movement; returns how many were set.
+
+    Only cylinders without a location are touched, and only when their last
+    completed movement ended at one, so re-running is safe.
+    """
+    latest = select(
+        movements.c.cylinder_id,
+        movements.c.to_location_id,
+        func.row_number().over(
+            partition_by=movements.c.cylinder_id,
+            order_by=(func.coalesce(movements.c.actual_date, movements.c.created_at).desc(), movements.c.id.desc())
+        ).label("position")
+    ).where(movements.c.status == MovementStatus.COMPLETED).subquery()
+    set_location = update(cylinders).where(cylinders.c.id == bindparam("cylinder_id")).values(
+        current_location_id=bindparam("location_id")
+    )
+    updated, after_id = 0, 0
+    while True:
+        ids = db.execute(
+            select(cylinders.c.id)
+            .where(cylinders.c.current_location_id.is_(None), cylinders.c.id > after_id)
+            .order_by(cylinders.c.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return updated
+        after_id = ids[-1]
+        rows = db.execute(
+            select(latest.c.cylinder_id, latest.c.to_location_id).where(
+                latest.c.cylinder_id.in_(ids),
+                latest.c.position == 1,
+                latest.c.to_location_id.is_not(None)
+            )
+        ).all()
+        if rows:
+            before = inventory_keys(db, [cylinder_id for cylinder_id, _ in rows])
+            db.execute(set_location, [{"cylinder_id": cylinder_id, "location_id": location_id} for cylinder_id, location_id in rows])
+            record_inventory_changes(db, before, inventory_keys(db, before))
+        db.commit()
+        updated += len(rows)
@@ -0,0 +1,78 @@
+from typing import Dict, Iterator, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.customer import Customer
+from app.models.cylinder import Cylinder
+from app.models.fill import FillRecord
+
+# Gas batch recall: which cylinders were filled from a batch, and who has them now.
+#
+# ix_fill_records_batch_cylinder_date maps batch_number to cylinder_id (with
+# fill_date), so the per-cylinder fill summary is an index range scan. Results
+# are read in keyset pages of cylinder ids, each page joined to cylinders and
+# their current customer, so a recall of any size runs in constant memory.
+
+RECALL_PAGE_SIZE = 1000
+
+fills = FillRecord.__table__
+cylinders = Cylinder.__table__
+customers = Customer.__table__
+
+def batch_summary(db: Session, batch_number: str) -> Optional[Dict]:
+    """Fill and cylinder counts for a batch, or None if no fill used it."""
+    fill_count, cylinder_count, first_filled, last_filled = db.execute(
+        select(
+            func.count(),
+            func.count(fills.c.cylinder_id.distinct()),
+            func.min(fills.c.fill_date),
+            func.max(fills.c.fill_date)
+        ).where(fills.c.batch_number == batch_number)
+    ).one()
+    if not fill_count:
+        return None
+    return {
+        "batch_number": batch_number,
+        "fills": fill_count,
+        "cylinders": cylinder_count,
+        "first_filled": first_filled,
+        "last_filled": last_filled,
+    }
+
+def recall_cylinders(db: Session, batch_number: str, page_size: int = RECALL_PAGE_SIZE) -> Iterator[Dict]:
+    """Yield every cylinder filled from ``batch_number`` with its current holder, in cylinder id order."""
+    after_id = 0
+    while True:
+        batch_fills = select(
+            fills.c.cylinder_id,
+            func.count().label("fills"),
+            func.min(fills.c.fill_date).label("first_filled"),
+            func.max(fills.c.fill_date).label("last_filled")
+        ).where(
+            fills.c.batch_number == batch_number, fills.c.cylinder_id > after_id
+        ).group_by(fills.c.cylinder_id).order_by(fills.c.cylinder_id).limit(page_size).subquery()
+
+        rows = db.execute(
+            select(
+                batch_fills.c.cylinder_id,
+                cylinders.c.serial_number,
+                cylinders.c.gas_type,
+                cylinders.c.status,
+                batch_fills.c.fills,
+                batch_fills.c.first_filled,
+                batch_fills.c.last_filled,
+                cylinders.c.current_customer_id,
+                customers.c.name.label("current_customer_name"),
+                cylinders.c.current_location,
+                cylinders.c.current_location_id
+            ).select_from(batch_fills)
+            .outerjoin(cylinders, cylinders.c.id == batch_fills.c.cylinder_id)
+            .outerjoin(customers, customers.c.id == cylinders.c.current_customer_id)
+            .order_by(batch_fills.c.cylinder_id)
+        ).mappings().all()
+        for row in rows:
+            yield dict(row)
+        if len(rows) < page_size:
+            return
+        after_id = rows[-1]["cylinder_id"]
@@ -0,0 +1,173 @@
+import math
+import time
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+
+from app.core.geo import distance_matrix
+
+# Heuristic capacitated VRP solver used by route planning.
+# Node 0 of the distance matrix is the depot, nodes 1..n are the stops.
+
+def savings_routes(matrix: np.ndarray, demands: Sequence[float], capacity: float,
+                   neighbours: Optional[int] = 40) -> List[List[int]]:
+    """Clarke-Wright parallel savings construction.
+
+    Only each stop's ``neighbours`` nearest stops are considered as merge
+    candidates, which keeps the savings list O(n·k) instead of O(n²) with
+    practically the same result.
+    """
+    n = len(matrix) - 1
+    if n == 0:
+        return []
+    if neighbours and neighbours < n - 1:
+        stops = matrix[1:, 1:].copy()
+        np.fill_diagonal(stops, np.inf)
+        nearest = np.argpartition(stops, neighbours, axis=1)[:, :neighbours] + 1
+        first = np.repeat(np.arange(1, n + 1), neighbours)
+        second = nearest.ravel()
+        pairs = np.unique(np.stack([np.minimum(first, second), np.maximum(first, second)], axis=1), axis=0)
+        first, second = pairs[:, 0], pairs[:, 1]
+    else:
+        first, second = np.triu_indices(n, k=1)
+        first, second = first + 1, second + 1
+
+    savings = matrix[0, first] + matrix[0, second] - matrix[first, second]
+    order = np.argsort(-savings, kind="stable")
+
+    routes = {node: [node] for node in range(1, n + 1)}
+    loads = {node: float(demands[node - 1]) for node in range(1, n + 1)}
+    route_of = list(range(n + 1))
+    for index in order.tolist():
+        if savings[index] <= 0:
+            break
+        a, b = int(first[index]), int(second[index])
+        route_a, route_b = route_of[a], route_of[b]
+        if route_a == route_b or loads[route_a] + loads[route_b] > capacity:
+            continue
+        nodes_a, nodes_b = routes[route_a], routes[route_b]
+        # Both stops must be route ends; orient so the link is tail(a) -> head(b)
+        if nodes_a[-1] != a:
+            if nodes_a[0] != a:
+                continue
+            nodes_a.reverse()
+        if nodes_b[0] != b:
+            if nodes_b[-1] != b:
+                continue
+            nodes_b.reverse()
+        nodes_a.extend(nodes_b)
+        loads[route_a] += loads.pop(route_b)
+        for node in routes.pop(route_b):
+            route_of[node] = route_a
+    return list(routes.values())
+
+def merge_to_fleet(routes: List[List[int]], matrix: np.ndarray, demands: Sequence[float],
+                   capacity: float, vehicles: int) -> List[List[int]]:
+    """Join routes until there is at most one per vehicle.
+
+    Picks the cheapest end-to-end join each time, preferring joins that stay
+    within ``capacity``; capacity is only exceeded when the fleet cannot carry
+    the day otherwise.
+    """
+    routes = [list(route) for route in routes]
+    loads = [sum(demands[node - 1] for node in route) for route in routes]
+    while len(routes) > vehicles:
+        heads = np.array([route[0] for route in routes])
+        tails = np.array([route[-1] for route in routes])
+        best = None
+        # (end of x, start of y, reverse x, reverse y)
+        for ends_x, ends_y, reverse_x, reverse_y in (
+            (tails, heads, False, False),
+            (tails, tails, False, True),
+            (heads, heads, True, False),
+        ):
+            cost = matrix[np.ix_(ends_x, ends_y)] - matrix[ends_x, 0][:, None] - matrix[0, ends_y][None, :]
+            np.fill_diagonal(cost, np.inf)
+            load = np.add.outer(loads, loads)
+            cost = cost + np.where(load > capacity, 1e9, 0.0)
+            x, y = np.unravel_index(int(np.argmin(cost)), cost.shape)
+            if best is None or cost[x, y] < best[0]:
+                best = (cost[x, y], int(x), int(y), reverse_x, reverse_y)
+        _, x, y, reverse_x, reverse_y = best
+        joined = (routes[x][::-1] if reverse_x else routes[x]) + (routes[y][::-1] if reverse_y else routes[y])
+        joined_load = loads[x] + loads[y]
+        for index in sorted((x, y), reverse=True):
+            del routes[index]
+            del loads[index]
+        routes.append(joined)
+        loads.append(joined_load)
+    return routes
+
+def _two_opt_pass(path: np.ndarray, matrix: np.ndarray, deadline: float) -> Tuple[bool, bool]:
+    """One first-improvement 2-opt sweep over a depot-to-depot path, in place.
+
+    For each edge the best exchange against every later edge is found in one
+    vectorized step. Returns (improved, finished_before_deadline).
+    """
+    improved = False
+    for i in range(1, len(path) - 2):
+        if time.perf_counter() > deadline:
+            return improved, False
+        a, b = path[i - 1], path[i]
+        c, d = path[i + 1:-1], path[i + 2:]
+        delta = matrix[a, c] + matrix[b, d] - matrix[a, b] - matrix[c, d]
+        j = int(np.argmin(delta))
+        if delta[j] < -1e-9:
+            path[i:i + j + 2] = path[i:i + j + 2][::-1].copy()
+            improved = True
+    return improved, True
+
+def route_length(route: Sequence[int], matrix: np.ndarray) -> float:
+    path = [0] + list(route) + [0]
+    return float(matrix[path[:-1], path[1:]].sum())
+
+def solve_routes(matrix: np.ndarray, vehicles: int, demands: Optional[Sequence[float]] = None,
+                 capacity: Optional[float] = None, time_budget: float = 2.0) -> dict:
+    """Build up to ``vehicles`` depot-to-depot routes over the stops of ``matrix``.
+
+    Savings construction always runs to completion; 2-opt improvement then runs
+    round-robin over the routes until nothing improves or ``time_budget``
+    seconds have passed since the call. Routes are returned as stop indices
+    (0-based, i.e. matrix node - 1), longest first.
+    """
+    started = time.perf_counter()
+    deadline = started + time_budget
+    n = len(matrix) - 1
+    if demands is None:
+        demands = [1.0] * n
+    if capacity is None:
+        capacity = math.ceil(sum(demands) / vehicles) if n else 0
+
+    routes = savings_routes(matrix, demands, capacity)
+    routes = merge_to_fleet(routes, matrix, demands, capacity, vehicles)
+
+    paths = [np.array([0] + route + [0]) for route in routes]
+    pending = list(range(len(paths)))
+    converged = True
+    while pending and converged:
+        still_improving = []
+        for index in pending:
+            improved, finished = _two_opt_pass(paths[index], matrix, deadline)
+            if not finished:
+                converged = False
+                break
+            if improved:
+                still_improving.append(index)
+        pending = still_improving
+
+    routes = [(path[1:-1] - 1).tolist() for path in paths]
+    distances = [route_length([node + 1 for node in route], matrix) for route in routes]
+    order = sorted(range(len(routes)), key=lambda index: -distances[index])
+    return {
+        "routes": [routes[index] for index in order],
+        "distances_km": [distances[index] for index in order],
+        "total_km": sum(distances),
+        "converged": converged,
+        "elapsed_ms": (time.perf_counter() - started) * 1000,
+    }
+
+def plan_routes(depot: Tuple[float, float], latitudes: Sequence[float], longitudes: Sequence[float],
+                vehicles: int, demands: Optional[Sequence[float]] = None,
+                capacity: Optional[float] = None, time_budget: float = 2.0) -> dict:
+    """``solve_routes`` over a depot and stop coordinates, using great-circle distances."""
+    matrix = distance_matrix([depot[0]] + list(latitudes), [depot[1]] + list(longitudes))
+    return solve_routes(matrix, vehicles, demands=demands, capacity=capacity, time_budget=time_budget)
@@ -0,0 +1,165 @@
+from sqlalchemy import and_, bindparam, event, or_, select, update
+from sqlalchemy.orm import Session
+from typing import Dict, List, Tuple
+
+from app.core.geo import (
+    SpatialIndex,
+    bounding_box,
+    geohash_neighbourhood,
+    geohash_precision_for_radius,
+    encode_geohash,
+    haversine_km,
+)
+from app.models.cylinder import Cylinder
+from app.models.location import Location
+
+# Process-wide index of active locations with coordinates, loaded lazily, kept
+# current from this process's committed Location inserts, updates and deletes,
+# and rebuilt periodically for everyone else's (refresh_location_index).
+location_index = SpatialIndex()
+_location_index_loaded = False
+_location_type_tags: Dict[str, int] = {}
+
+def location_type_tag(location_type) -> int:
+    value = getattr(location_type, "value", location_type)
+    return _location_type_tags.setdefault(value, len(_location_type_tags) + 1)
+
+def _index_location(location_id: int, latitude, longitude, is_active, location_type):
+    if latitude is None or longitude is None or not is_active:
+        location_index.remove(location_id)
+    else:
+        location_index.upsert(location_id, latitude, longitude, location_type_tag(location_type))
+
+def refresh_location_index(db: Session) -> int:
+    """Reload the location index from the database; returns how many locations it holds.
+
+    Session listeners only see this process's own commits, so with several
+    workers each one rebuilds on a timer (LOCATION_INDEX_REFRESH_INTERVAL) to
+    pick up the others' changes.
+    """
+    global _location_index_loaded
+    locations = Location.__table__
+    rows = db.execute(
+        select(locations.c.id, locations.c.latitude, locations.c.longitude, locations.c.location_type).where(
+            locations.c.latitude.isnot(None),
+            locations.c.longitude.isnot(None),
+            locations.c.is_active.is_(True)
+        )
+    ).all()
+    with location_index._lock:
+        location_index.clear()
+        for location_id, latitude, longitude, location_type in rows:
+            location_index.upsert(location_id, latitude, longitude, location_type_tag(location_type))
+        _location_index_loaded = True
+        return len(location_index)
+
+def ensure_location_index(db: Session) -> SpatialIndex:
+    """Load the location index from the database on first use."""
+    if not _location_index_loaded:
+        with location_index._lock:
+            if not _location_index_loaded:
+                refresh_location_index(db)
+    return location_index
+
+@event.listens_for(Session, "after_flush")
+def _collect_location_changes(session, flush_context):
+    # Values are captured now: after_commit cannot load expired attributes
+    changed = session.info.setdefault("spatial_changed_locations", {})
+    for instance in list(session.new) + list(session.dirty):
+        if isinstance(instance, Location):
+            changed[instance.id] = (
+                instance.latitude, instance.longitude, instance.is_active, instance.location_type
+            )
+    for instance in session.deleted:
+        if isinstance(instance, Location):
+            changed[instance.id] = None
+
+@event.listens_for(Session, "after_commit")
+def _apply_location_changes(session):
+    changed = session.info.pop("spatial_changed_locations", None)
+    if not changed or not _location_index_loaded:
+        return
+    for location_id, values in changed.items():
+        if values is None:
+            location_index.remove(location_id)
+        else:
+            _index_location(location_id, *values)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_location_changes(session):
+    session.info.pop("spatial_changed_locations", None)
+
+def backfill_location_geohashes(db: Session, batch_size: int = 1000) -> int:
+    """Set geohash on located rows that lack one; returns how many were updated.
+
+    The ORM listeners only cover rows written through them, so rows from before
+    the column existed (or from raw SQL) need this once to be found by
+    ``locations_within_query``.
+    """
+    locations = Location.__table__
+    missing = select(locations.c.id, locations.c.latitude, locations.c.longitude).where(
+        locations.c.geohash.is_(None),
+        locations.c.latitude.isnot(None),
+        locations.c.longitude.isnot(None)
+    ).order_by(locations.c.id).limit(batch_size)
+    set_geohash = update(locations).where(locations.c.id == bindparam("location_id")).values(
+        geohash=bindparam("new_geohash")
+    )
+    updated = 0
+    while True:
+        rows = db.execute(missing).all()
+        if not rows:
+            return updated
+        db.execute(set_geohash, [
+            {"location_id": location_id, "new_geohash": encode_geohash(latitude, longitude)}
+            for location_id, latitude, longitude in rows
+        ])
+        db.commit()
+        updated += len(rows)
+
+def locations_within_query(latitude: float, longitude: float, radius_km: float):
+    """SELECT of candidate locations for a radius, prefiltered by geohash cell and bounding box.
+
+    Works across workers without the in-memory index; callers still apply the
+    exact haversine distance to the candidates (see ``locations_within``).
+    """
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+    conditions = [
+        Location.latitude.between(min_lat, max_lat),
+        Location.is_active.is_(True),
+    ]
+    if min_lon >= -180.0 and max_lon <= 180.0:
+        conditions.append(Location.longitude.between(min_lon, max_lon))
+
+    precision = geohash_precision_for_radius(radius_km, latitude)
+    if precision:
+        # Prefix ranges keep the geohash b-tree index usable on every backend
+        conditions.append(or_(*[
+            and_(Location.geohash >= cell, Location.geohash < cell + "{")
+            for cell in geohash_neighbourhood(latitude, longitude, precision)
+        ]))
+    return select(Location).where(*conditions)
+
+def locations_within(db: Session, latitude: float, longitude: float, radius_km: float) -> List[Tuple[Location, float]]:
+    """Locations within ``radius_km`` from the database, nearest first."""
+    candidates = db.execute(locations_within_query(latitude, longitude, radius_km)).scalars().all()
+    if not candidates:
+        return []
+    distances = haversine_km(
+        latitude,
+        longitude,
+        [location.latitude for location in candidates],
+        [location.longitude for location in candidates]
+    )
+    hits = [(location, float(distance)) for location, distance in zip(candidates, distances) if distance <= radius_km]
+    return sorted(hits, key=lambda hit: hit[1])
+
+def cylinders_at_locations(db: Session, location_ids: List[int]) -> Dict[int, int]:
+    """cylinder_id -> location_id for cylinders currently at one of ``location_ids``."""
+    if not location_ids:
+        return {}
+    cylinders = Cylinder.__table__
+    rows = db.execute(
+        select(cylinders.c.id, cylinders.c.current_location_id).where(cylinders.c.current_location_id.in_(location_ids))
+    )
+    return {cylinder_id: location_id for cylinder_id, location_id in rows}
@@ -0,0 +1,165 @@
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import Index, String, and_, delete, event, func, insert, literal, or_, select
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.models.customer import Customer
+from app.models.cylinder import Cylinder
+from app.models.location import Location
+from app.models.sync import Tombstone
+
+# Delta sync for offline driver devices.
+#
+# Every synced table is read in (changed_at, id) order, where changed_at is
+# coalesce(updated_at, created_at) so rows that were never updated still count.
+# A device keeps an opaque cursor holding the last (changed_at, id) it has seen
+# per table, plus the last (deleted_at, id) tombstone, and asks only for what
+# came after.
+
+SYNC_MODELS = {
+    "cylinders": Cylinder,
+    "customers": Customer,
+    "locations": Location,
+}
+
+tombstones_table = Tombstone.__table__
+
+def changed_at(model):
+    table = model.__table__
+    return func.coalesce(table.c.updated_at, table.c.created_at)
+
+for _name, _model in SYNC_MODELS.items():
+    # Expression indexes (Postgres and SQLite) so a delta page is an index range scan
+    _model.__table__.append_constraint(
+        Index(f"ix_{_name}_sync_changed_at", changed_at(_model), _model.__table__.c.id)
+    )
+
+def _record_tombstone(mapper, connection, target):
+    # Same connection and transaction as the DELETE itself
+    connection.execute(insert(tombstones_table).values(
+        table_name=mapper.local_table.name,
+        row_id=target.id
+    ))
+
+for _model in SYNC_MODELS.values():
+    event.listen(_model, "after_delete", _record_tombstone)
+
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(positions: Dict[str, Tuple[datetime, int]]) -> str:
+    payload = {name: [timestamp.isoformat(), row_id] for name, (timestamp, row_id) in positions.items()}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode()
+
+def decode_cursor(cursor: Optional[str]) -> Dict[str, Tuple[datetime, int]]:
+    if not cursor:
+        return {}
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return {name: (datetime.fromisoformat(timestamp), int(row_id)) for name, (timestamp, row_id) in payload.items()}
+    except (ValueError, TypeError, AttributeError):
+        raise InvalidCursor("Malformed sync cursor")
+
+def _timestamp(db: Session, timestamp: datetime):
+    """Bind a timestamp so it compares exactly against stored values.
+
+    SQLite keeps datetimes as text: CURRENT_TIMESTAMP writes whole seconds while
+    SQLAlchemy's own formatting always adds microseconds, so an equality check on
+    a cursor position would never match. Binding the same text form avoids that.
+    """
+    if db.get_bind().dialect.name != "sqlite":
+        return timestamp
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return literal(timestamp.isoformat(sep=" "), String)
+
+def _after(db: Session, column, id_column, position: Optional[Tuple[datetime, int]]):
+    if position is None:
+        return None
+    timestamp, row_id = position
+    timestamp = _timestamp(db, timestamp)
+    return or_(column > timestamp, and_(column == timestamp, id_column > row_id))
+
+def _aware(timestamp: datetime) -> datetime:
+    # SQLite hands back naive UTC values, Postgres aware ones
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=timezone.utc)
+    return timestamp
+
+def changes_since(db: Session, cursor: Optional[str], tables: List[str], limit: int = 500) -> dict:
+    """One batch of upserts and deletes per table after ``cursor``.
+
+    Returns ``reset: True`` when the cursor is older than the tombstone
+    retention; the device must then drop its data and sync from scratch.
+    """
+    positions = decode_cursor(cursor)
+    now = datetime.now(timezone.utc)
+    settled = now - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+    retention_start = now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+    # Deletes older than the retention window may already be pruned
+    if any(
+        _aware(timestamp) < retention_start
+        for key, (timestamp, _) in positions.items() if key.endswith(":deleted")
+    ):
+        return {"reset": True, "changes": {}, "deleted": {}, "cursor": None, "has_more": False}
+
+    changes, has_more = {}, False
+    for name in tables:
+        model = SYNC_MODELS[name]
+        table = model.__table__
+        column = changed_at(model)
+        stmt = select(*table.c).where(column <= _timestamp(db, settled))
+        condition = _after(db, column, table.c.id, positions.get(name))
+        if condition is not None:
+            stmt = stmt.where(condition)
+        result = db.execute(stmt.order_by(column, table.c.id).limit(limit))
+        keys = list(result.keys())
+        rows = [dict(zip(keys, row)) for row in result]
+        if rows:
+            last = rows[-1]
+            positions[name] = (last["updated_at"] or last["created_at"], last["id"])
+        has_more = has_more or len(rows) == limit
+        changes[name] = rows
+
+    deleted: Dict[str, List[int]] = {}
+    for name in tables:
+        deleted[name] = []
+        key = f"{name}:deleted"
+        if key not in positions:
+            # Fresh device: rows deleted before its first batch were never sent to it
+            positions[key] = (settled, 0)
+            continue
+        tombstones = db.execute(
+            select(tombstones_table.c.id, tombstones_table.c.row_id, tombstones_table.c.deleted_at).where(
+                tombstones_table.c.table_name == name,
+                tombstones_table.c.deleted_at <= _timestamp(db, settled),
+                _after(db, tombstones_table.c.deleted_at, tombstones_table.c.id, positions[key])
+            ).order_by(tombstones_table.c.deleted_at, tombstones_table.c.id).limit(limit)
+        ).all()
+        for tombstone_id, row_id, deleted_at in tombstones:
+            deleted[name].append(row_id)
+            positions[key] = (deleted_at, tombstone_id)
+        if len(tombstones) == limit:
+            has_more = True
+        else:
+            # Caught up: keep the position fresh so quiet tables never hit the retention reset
+            positions[key] = (settled, 0)
+
+    return {
+        "reset": False,
+        "changes": changes,
+        "deleted": deleted,
+        "cursor": encode_cursor(positions),
+        "has_more": has_more,
+    }
+
+def prune_tombstones(db: Session) -> int:
+    """Delete tombstones past the retention window; returns how many were removed."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    count = db.execute(delete(tombstones_table).where(tombstones_table.c.deleted_at < cutoff)).rowcount
+    db.commit()
+    return count
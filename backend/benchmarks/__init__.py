@@ -0,0 +1 @@
+# Performance benchmarks for the backend (run as modules, e.g. `python -m benchmarks.serialization`)
@@ -0,0 +1,40 @@
+import os
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+pytest.importorskip("pytest_benchmark")
+
+from benchmarks.datagen import BENCHMARK_USER, generate
+from models.user import User
+
+# Micro-benchmarks run against a seeded SQLite file. Set BENCHMARK_POSTGRES_URL
+# to a scratch Postgres database (it is dropped and re-seeded) to run every
+# benchmark there as well.
+SEED_SIZES = {"cylinders": 20000, "movements": 100000, "customers": 2000}
+
+def _databases():
+    return ["sqlite", "postgresql"] if os.getenv("BENCHMARK_POSTGRES_URL") else ["sqlite"]
+
+@pytest.fixture(scope="session", params=_databases())
+def seeded_engine(request, tmp_path_factory):
+    if request.param == "sqlite":
+        url = f"sqlite:///{tmp_path_factory.mktemp('benchmark') / 'seed.db'}"
+        connect_args = {"check_same_thread": False}
+    else:
+        url = os.environ["BENCHMARK_POSTGRES_URL"]
+        connect_args = {}
+    generate(url, **SEED_SIZES)
+    engine = create_engine(url, connect_args=connect_args)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture(scope="function")
+def db(seeded_engine):
+    session = sessionmaker(autocommit=False, autoflush=False, bind=seeded_engine)()
+    yield session
+    session.close()
+
+@pytest.fixture(scope="function")
+def benchmark_user(db):
+    return db.query(User).filter(User.email == BENCHMARK_USER).one()
@@ -0,0 +1,192 @@
+"""Synthetic data set for load tests.
+
+Fills a database (a SQLite file by default) with a production-shaped data set:
+customers with two sites each, cylinders spread over those sites, a long
+movement history, transactions and maintenance records. Rows are generated
+from a fixed seed and inserted in bulk, so the same arguments always produce
+the same database.
+
+Cylinder ``n`` has serial number ``SN<n:08d>`` (barcode ``BC…``, QR ``QR…``)
+so workloads can address rows without reading them first.
+
+Usage: python -m benchmarks.datagen --url sqlite:///benchmark.db --cylinders 100000 --movements 1000000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List
+
+from sqlalchemy import create_engine, func, insert, select
+
+from database import Base
+from models.customer import Customer, Location
+from models.cylinder import Cylinder, CylinderStatus, CylinderType
+from models.maintenance import MaintenanceRecord, MaintenanceStatus, MaintenanceType
+from models.movement import CylinderMovement, MovementType, Transaction, TransactionItem, TransactionStatus
+from models.user import User, UserRole
+
+BENCHMARK_USER = "benchmark@example.com"
+HISTORY_DAYS = 730
+CHUNK_SIZE = 10000
+
+def serial_number(cylinder_id: int) -> str:
+    return f"SN{cylinder_id:08d}"
+
+def _chunks(rows: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def generate(url: str, cylinders: int = 100000, movements: int = 1000000, customers: int = 10000,
+             seed: int = 0, progress: Callable[[str, int], None] = None) -> Dict[str, int]:
+    """(Re)create the schema at ``url`` and fill it; returns row counts per table."""
+    rng = random.Random(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    start = now - timedelta(days=HISTORY_DAYS)
+    history_seconds = HISTORY_DAYS * 86400
+    locations = customers * 2
+    drivers = max(1, customers // 200)
+    transactions = customers * 5
+
+    def users():
+        yield {
+            # No password: load tests mint a token for this user directly
+            "email": BENCHMARK_USER, "hashed_password": "",
+            "full_name": "Benchmark Admin", "role": UserRole.ADMIN, "is_active": True,
+        }
+        for n in range(drivers):
+            yield {
+                "email": f"driver{n}@example.com", "hashed_password": "", "full_name": f"Driver {n}",
+                "role": UserRole.DRIVER, "is_active": True,
+            }
+
+    def customer_rows():
+        for n in range(1, customers + 1):
+            yield {
+                "name": f"Customer {n}", "email": f"customer{n}@example.com", "phone": f"555{n:07d}",
+                "address": f"{n} Main St", "city": f"City {n % 500}", "state": "TS", "zip_code": f"{n % 100000:05d}",
+                "country": "Test Country", "is_active": True, "business_type": rng.choice(("commercial", "medical", "industrial")),
+                "tax_id": f"TAX{n:08d}", "credit_limit": 10000.0, "payment_terms": "net30",
+                "created_at": start + timedelta(seconds=rng.randrange(history_seconds)),
+            }
+
+    def location_rows():
+        for n in range(1, locations + 1):
+            yield {
+                "customer_id": (n - 1) // 2 + 1, "name": f"Site {n}", "address": f"{n} Depot Rd",
+                "city": f"City {n % 500}", "state": "TS", "zip_code": f"{n % 100000:05d}",
+                "country": "Test Country", "is_primary": n % 2 == 1,
+            }
+
+    types, statuses = list(CylinderType), list(CylinderStatus)
+    status_weights = (40, 50, 6, 2, 2)
+
+    def cylinder_rows():
+        for n in range(1, cylinders + 1):
+            created = start + timedelta(seconds=rng.randrange(history_seconds))
+            last_inspection = created + timedelta(days=rng.randrange(365))
+            yield {
+                "id": n, "serial_number": serial_number(n), "barcode": f"BC{n:08d}", "qr_code": f"QR{n:08d}",
+                "type": types[n % len(types)], "capacity": rng.choice((10.0, 20.0, 50.0)),
+                "pressure_rating": 2000.0, "tare_weight": 30.0,
+                "status": rng.choices(statuses, status_weights)[0],
+                "last_inspection": last_inspection, "next_inspection": last_inspection + timedelta(days=365),
+                "current_location_id": rng.randint(1, locations), "current_customer_id": rng.randint(1, customers),
+                "created_at": created,
+            }
+
+    movement_types = list(MovementType)
+
+    def movement_rows():
+        for _ in range(movements):
+            yield {
+                "cylinder_id": rng.randint(1, cylinders), "movement_type": rng.choice(movement_types),
+                "from_location_id": rng.randint(1, locations), "to_location_id": rng.randint(1, locations),
+                "performed_by": rng.randint(2, drivers + 1),
+                "timestamp": start + timedelta(seconds=rng.randrange(history_seconds)),
+            }
+
+    def transaction_rows():
+        for n in range(1, transactions + 1):
+            created = start + timedelta(seconds=rng.randrange(history_seconds))
+            completed = rng.random() < 0.9
+            yield {
+                "id": n, "customer_id": rng.randint(1, customers), "transaction_type": MovementType.DELIVERY,
+                "status": TransactionStatus.COMPLETED if completed else TransactionStatus.PENDING,
+                "total_amount": 50.0, "created_at": created,
+                "completed_at": created + timedelta(hours=4) if completed else None,
+            }
+
+    def item_rows():
+        for n in range(1, transactions + 1):
+            yield {
+                "transaction_id": n, "cylinder_id": rng.randint(1, cylinders),
+                "quantity": 1, "unit_price": 50.0, "total_price": 50.0,
+            }
+
+    maintenance_types = list(MaintenanceType)
+
+    def maintenance_rows():
+        for _ in range(cylinders // 10):
+            scheduled = start + timedelta(seconds=rng.randrange(history_seconds + 90 * 86400))
+            done = scheduled < now
+            yield {
+                "cylinder_id": rng.randint(1, cylinders), "maintenance_type": rng.choice(maintenance_types),
+                "status": MaintenanceStatus.COMPLETED if done else MaintenanceStatus.SCHEDULED,
+                "scheduled_date": scheduled, "completed_date": scheduled + timedelta(days=1) if done else None,
+                "performed_by": 1,
+            }
+
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    counts = {}
+    # Parents before children so foreign keys hold on Postgres
+    plan = (
+        (User, users()), (Customer, customer_rows()), (Location, location_rows()),
+        (Cylinder, cylinder_rows()), (CylinderMovement, movement_rows()),
+        (Transaction, transaction_rows()), (TransactionItem, item_rows()),
+        (MaintenanceRecord, maintenance_rows()),
+    )
+    with engine.begin() as connection:
+        if engine.dialect.name == "sqlite":
+            connection.exec_driver_sql("PRAGMA synchronous = OFF")
+        for model, rows in plan:
+            for chunk in _chunks(rows, CHUNK_SIZE):
+                connection.execute(insert(model.__table__), chunk)
+            counts[model.__tablename__] = connection.execute(select(func.count()).select_from(model.__table__)).scalar()
+            if progress:
+                progress(model.__tablename__, counts[model.__tablename__])
+    if engine.dialect.name == "postgresql":
+        # Explicit ids bypass the sequences; move them past the generated rows
+        with engine.begin() as connection:
+            for model in (Cylinder, Transaction):
+                table = model.__tablename__
+                connection.exec_driver_sql(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+                )
+    with engine.begin() as connection:
+        connection.exec_driver_sql("ANALYZE")
+    engine.dispose()
+    return counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic data set for load tests")
+    parser.add_argument("--url", default="sqlite:///benchmark.db", help="Target database URL (recreated)")
+    parser.add_argument("--cylinders", type=int, default=100000, help="Cylinders")
+    parser.add_argument("--movements", type=int, default=1000000, help="Cylinder movements")
+    parser.add_argument("--customers", type=int, default=10000, help="Customers (two locations each)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    generate(
+        args.url, args.cylinders, args.movements, args.customers, args.seed,
+        progress=lambda table, count: print(f"{table:<20} {count:>10,} rows  {time.perf_counter() - started:7.1f} s")
+    )
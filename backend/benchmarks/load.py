@@ -0,0 +1,200 @@
+"""Load test of the HTTP API, driven in-process.
+
+Requests go through the full ASGI stack (routing, auth, middleware,
+serialization) via httpx's ASGI transport, so there is no network, no server
+process and no port to configure; what is measured is the application itself.
+Each workload issues ``--requests`` GETs from ``--concurrency`` concurrent
+clients against a database filled by ``benchmarks.datagen``.
+
+Runs are stored by ``benchmarks.results``; with a baseline present the run is
+compared against it and the exit status is 1 when any workload regressed.
+
+Usage:
+    python -m benchmarks.datagen --url sqlite:///benchmark.db
+    python -m benchmarks.load --url sqlite:///benchmark.db --save-baseline
+    python -m benchmarks.load --url sqlite:///benchmark.db --workloads scan,dashboard
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from datetime import timedelta
+from typing import Callable, Dict, List
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from auth import create_access_token
+from benchmarks.datagen import BENCHMARK_USER, generate, serial_number
+from benchmarks.results import ResultsStore, compare, environment, git_commit
+from database import get_db, get_read_db
+from middleware import CompressionMiddleware, ConditionalGetMiddleware
+from models.cylinder import Cylinder
+from models.movement import CylinderMovement
+from routers import analytics, customers, cylinders, maintenance, movements
+
+PAGE_SIZE = 100
+
+# Workloads: (rng, data set sizes) -> path of the next request
+
+def scan(rng: random.Random, sizes: Dict[str, int]) -> str:
+    # Driver app scanning a cylinder label
+    return f"/api/cylinders/search/{serial_number(rng.randint(1, sizes['cylinders']))}"
+
+def cylinder_pages(rng: random.Random, sizes: Dict[str, int]) -> str:
+    return f"/api/cylinders/?skip={rng.randrange(0, sizes['cylinders'], PAGE_SIZE)}&limit={PAGE_SIZE}"
+
+def movement_pages(rng: random.Random, sizes: Dict[str, int]) -> str:
+    return f"/api/movements/cylinder?skip={rng.randrange(0, sizes['movements'], PAGE_SIZE)}&limit={PAGE_SIZE}"
+
+def dashboard(rng: random.Random, sizes: Dict[str, int]) -> str:
+    return "/api/analytics/dashboard"
+
+def export(rng: random.Random, sizes: Dict[str, int]) -> str:
+    # Last 30 days of movements as CSV
+    return "/api/analytics/export/report?report_type=movements"
+
+WORKLOADS: Dict[str, Callable[[random.Random, Dict[str, int]], str]] = {
+    "scan": scan,
+    "cylinder_pages": cylinder_pages,
+    "movement_pages": movement_pages,
+    "dashboard": dashboard,
+    "export": export,
+}
+
+def create_app(url: str) -> FastAPI:
+    """The legacy API routers with the production middleware, bound to ``url``."""
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    engine = create_engine(url, connect_args=connect_args)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_benchmark_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.add_middleware(ConditionalGetMiddleware)
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    for name, module in (
+        ("cylinders", cylinders), ("customers", customers), ("movements", movements),
+        ("maintenance", maintenance), ("analytics", analytics),
+    ):
+        app.include_router(module.router, prefix=f"/api/{name}")
+    app.dependency_overrides[get_db] = get_benchmark_db
+    app.dependency_overrides[get_read_db] = get_benchmark_db
+    app.state.engine = engine
+    return app
+
+def data_set_sizes(app: FastAPI) -> Dict[str, int]:
+    with app.state.engine.connect() as connection:
+        return {
+            "cylinders": connection.execute(select(func.count(Cylinder.id))).scalar(),
+            "movements": connection.execute(select(func.count(CylinderMovement.id))).scalar(),
+        }
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def summarize(latencies: List[float], elapsed: float, errors: int) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": len(ordered) / elapsed if elapsed else 0.0,
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+        "p50_ms": _percentile(ordered, 0.50) * 1000,
+        "p95_ms": _percentile(ordered, 0.95) * 1000,
+        "p99_ms": _percentile(ordered, 0.99) * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+async def drive(app: FastAPI, paths: List[str], concurrency: int, headers: Dict[str, str], warmup: int = 10) -> dict:
+    """Issue GETs for ``paths`` from ``concurrency`` clients sharing one queue."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", headers=headers, timeout=None) as client:
+        for path in paths[:warmup]:
+            await client.get(path)
+
+        pending = iter(paths)
+        latencies: List[float] = []
+        errors = 0
+
+        async def worker():
+            nonlocal errors
+            for path in pending:
+                started = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code >= 400:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return summarize(latencies, time.perf_counter() - started, errors)
+
+def run(url: str, workloads: List[str], requests: int = 500, concurrency: int = 8, seed: int = 0) -> dict:
+    app = create_app(url)
+    sizes = data_set_sizes(app)
+    token = create_access_token({"sub": BENCHMARK_USER}, expires_delta=timedelta(hours=12))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    results = {}
+    for name in workloads:
+        rng = random.Random(seed)
+        paths = [WORKLOADS[name](rng, sizes) for _ in range(requests)]
+        results[name] = asyncio.run(drive(app, paths, concurrency, headers))
+    app.state.engine.dispose()
+    return {
+        "commit": git_commit(),
+        "environment": environment(),
+        "database": url.split(":", 1)[0],
+        "data_set": sizes,
+        "parameters": {"requests": requests, "concurrency": concurrency, "seed": seed},
+        "workloads": results,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the API in-process")
+    parser.add_argument("--url", default="sqlite:///benchmark.db", help="Database filled by benchmarks.datagen")
+    parser.add_argument("--workloads", default=",".join(WORKLOADS), help="Comma-separated workloads")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per workload")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--generate", action="store_true", help="Regenerate the data set first (default sizes)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95/throughput change (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.workloads.split(",") if name.strip()]
+    unknown = [name for name in names if name not in WORKLOADS]
+    if unknown:
+        parser.error(f"Unknown workloads: {', '.join(unknown)} (available: {', '.join(WORKLOADS)})")
+    if args.generate:
+        generate(args.url)
+
+    results = run(args.url, names, args.requests, args.concurrency)
+    store = ResultsStore()
+    print(f"Saved {store.save(results)}")
+    print(f"{'workload':<16} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, result in results["workloads"].items():
+        print(f"{name:<16} {result['rps']:8.1f} {result['p50_ms']:8.2f} {result['p95_ms']:8.2f} "
+              f"{result['p99_ms']:8.2f} {result['errors']:7d}")
+
+    if args.save_baseline:
+        print(f"Baseline updated: {store.set_baseline(results)}")
+        sys.exit(0)
+    baseline = store.baseline()
+    if baseline is None:
+        print("No baseline yet; run with --save-baseline to create one")
+        sys.exit(0)
+    regressions = [entry for entry in compare(results, baseline, args.tolerance) if entry["regressed"]]
+    for entry in regressions:
+        print(f"REGRESSION {entry['workload']}: {'; '.join(entry['reasons'])}")
+    if not regressions:
+        print(f"No regressions against baseline ({baseline.get('commit') or 'unknown commit'})")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,83 @@
+"""JSON store for load-test runs and regression checks against a baseline.
+
+Every run is written to ``test_logs/load/run_<timestamp>.json``; one run can be
+promoted to ``baseline.json``. A later run regresses when a workload's p95
+latency grows, or its throughput drops, by more than the tolerance, or when it
+starts returning errors.
+"""
+import json
+import platform
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+RESULTS_DIR = Path(__file__).resolve().parent.parent / "test_logs" / "load"
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+class ResultsStore:
+    def __init__(self, directory: Path = RESULTS_DIR):
+        self.directory = Path(directory)
+
+    def save(self, run: dict) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        with open(path, "w") as run_file:
+            json.dump(run, run_file, indent=2)
+        return path
+
+    def runs(self) -> List[Path]:
+        return sorted(self.directory.glob("run_*.json"))
+
+    def baseline(self) -> Optional[dict]:
+        path = self.directory / "baseline.json"
+        if not path.exists():
+            return None
+        with open(path) as baseline_file:
+            return json.load(baseline_file)
+
+    def set_baseline(self, run: dict) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / "baseline.json"
+        with open(path, "w") as baseline_file:
+            json.dump(run, baseline_file, indent=2)
+        return path
+
+def compare(run: dict, baseline: dict, tolerance: float = 0.2) -> List[dict]:
+    """Per-workload comparison against ``baseline``; entries with ``regressed`` set fail the check."""
+    comparisons = []
+    for name, current in run["workloads"].items():
+        previous = baseline["workloads"].get(name)
+        if previous is None:
+            continue
+        p95_change = current["p95_ms"] / previous["p95_ms"] - 1 if previous["p95_ms"] else 0.0
+        throughput_change = current["rps"] / previous["rps"] - 1 if previous["rps"] else 0.0
+        reasons = []
+        if p95_change > tolerance:
+            reasons.append(f"p95 {previous['p95_ms']:.1f} -> {current['p95_ms']:.1f} ms")
+        if throughput_change < -tolerance:
+            reasons.append(f"throughput {previous['rps']:.1f} -> {current['rps']:.1f} req/s")
+        if current["errors"] > previous["errors"]:
+            reasons.append(f"errors {previous['errors']} -> {current['errors']}")
+        comparisons.append({
+            "workload": name,
+            "p95_change": p95_change,
+            "throughput_change": throughput_change,
+            "regressed": bool(reasons),
+            "reasons": reasons,
+        })
+    return comparisons
@@ -0,0 +1,61 @@
+"""Route planning on synthetic delivery days.
+
+Each day scatters stops around a handful of towns near the depot, then plans
+them with savings construction only (zero time budget) and with 2-opt
+improvement inside the given budget.
+
+Usage: python -m benchmarks.routing --stops 1000 --drivers 12 --days 5 --budget 2
+"""
+import argparse
+import random
+import statistics
+from typing import List, Tuple
+
+from app.services.routing import plan_routes
+
+DEPOT = (51.5, -0.1)
+
+def synthetic_day(stops: int, seed: int) -> Tuple[List[float], List[float]]:
+    rng = random.Random(seed)
+    towns = [(DEPOT[0] + rng.uniform(-0.6, 0.6), DEPOT[1] + rng.uniform(-1.0, 1.0)) for _ in range(8)]
+    latitudes, longitudes = [], []
+    for _ in range(stops):
+        if rng.random() < 0.8:
+            latitude, longitude = rng.choice(towns)
+            latitudes.append(rng.gauss(latitude, 0.03))
+            longitudes.append(rng.gauss(longitude, 0.05))
+        else:
+            latitudes.append(DEPOT[0] + rng.uniform(-0.7, 0.7))
+            longitudes.append(DEPOT[1] + rng.uniform(-1.2, 1.2))
+    return latitudes, longitudes
+
+def run(stops: int = 1000, drivers: int = 12, days: int = 5, budget: float = 2.0) -> dict:
+    results = {"savings": [], "savings+2opt": []}
+    for day in range(days):
+        latitudes, longitudes = synthetic_day(stops, day)
+        for name, time_budget in (("savings", 0.0), ("savings+2opt", budget)):
+            plan = plan_routes(DEPOT, latitudes, longitudes, vehicles=drivers, time_budget=time_budget)
+            results[name].append(plan)
+    return {
+        name: {
+            "total_km": statistics.mean(plan["total_km"] for plan in plans),
+            "elapsed_ms": statistics.mean(plan["elapsed_ms"] for plan in plans),
+            "converged": sum(plan["converged"] for plan in plans),
+        }
+        for name, plans in results.items()
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark delivery route planning")
+    parser.add_argument("--stops", type=int, default=1000, help="Stops per day")
+    parser.add_argument("--drivers", type=int, default=12, help="Drivers (vehicles) per day")
+    parser.add_argument("--days", type=int, default=5, help="Synthetic days to plan")
+    parser.add_argument("--budget", type=float, default=2.0, help="Solver time budget in seconds")
+    args = parser.parse_args()
+
+    results = run(args.stops, args.drivers, args.days, args.budget)
+    for name, result in results.items():
+        print(
+            f"{name:<14} {result['total_km']:10.1f} km  {result['elapsed_ms']:8.1f} ms  "
+            f"converged {result['converged']}/{args.days}"
+        )
@@ -0,0 +1,84 @@
+"""Per-row serialization cost of list responses.
+
+Compares the default FastAPI path (``response_model`` validation of ORM objects,
+``jsonable_encoder`` and the stdlib json encoder) with the opt-in fast path of
+``listing.rows_response`` (``fast=true``: plain column dicts dumped by orjson).
+
+Usage: python -m benchmarks.serialization --rows 1000 --repeat 20
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Callable, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+
+from models.cylinder import CylinderStatus, CylinderType
+from schemas import Cylinder as CylinderSchema
+
+def make_rows(count: int) -> List[dict]:
+    created = datetime(2024, 1, 1)
+    types = list(CylinderType)
+    statuses = list(CylinderStatus)
+    return [{
+        "id": i,
+        "serial_number": f"SN{i:08d}",
+        "barcode": f"GC{i:08d}",
+        "qr_code": f"GC{i:08d}",
+        "type": types[i % len(types)],
+        "capacity": 50.0,
+        "pressure_rating": 2000.0,
+        "tare_weight": 30.0,
+        "status": statuses[i % len(statuses)],
+        "created_at": created + timedelta(minutes=i),
+        "updated_at": None,
+    } for i in range(count)]
+
+def default_path(objects) -> bytes:
+    # What FastAPI does for response_model=List[CylinderSchema]
+    adapter = TypeAdapter(List[CylinderSchema])
+    validated = adapter.validate_python(objects, from_attributes=True)
+    return json.dumps(
+        jsonable_encoder(validated), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+def fast_path(rows) -> bytes:
+    return ORJSONResponse(content=rows).body
+
+def measure(func: Callable, payload, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(payload)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run(rows: int = 1000, repeat: int = 20) -> dict:
+    dict_rows = make_rows(rows)
+    orm_like = [SimpleNamespace(**row) for row in dict_rows]
+
+    results = {}
+    for name, func, payload in (
+        ("response_model+json", default_path, orm_like),
+        ("orjson_rows", fast_path, dict_rows),
+    ):
+        seconds = measure(func, payload, repeat)
+        results[name] = {
+            "total_ms": seconds * 1000,
+            "per_row_us": seconds / rows * 1_000_000,
+        }
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark list response serialization")
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per response")
+    parser.add_argument("--repeat", type=int, default=20, help="Repetitions (best run is reported)")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat)
+    for name, result in results.items():
+        print(f"{name:<22} {result['total_ms']:8.2f} ms  {result['per_row_us']:7.2f} us/row")
@@ -0,0 +1,59 @@
+"""Latency of nearest-k and radius queries against the in-memory location index.
+
+Points are scattered over a region roughly the size of a national delivery
+network; each query is timed individually and the median and p99 are reported.
+
+Usage: python -m benchmarks.spatial --points 100000 --queries 1000
+"""
+import argparse
+import random
+import statistics
+import time
+from typing import Callable, List
+
+from app.core.geo import SpatialIndex
+
+def build_index(points: int, seed: int = 0) -> SpatialIndex:
+    rng = random.Random(seed)
+    index = SpatialIndex(capacity=points)
+    for point_id in range(1, points + 1):
+        index.upsert(point_id, rng.uniform(45.0, 55.0), rng.uniform(-5.0, 10.0))
+    return index
+
+def measure(query: Callable, queries: List[tuple]) -> dict:
+    timings = []
+    for latitude, longitude in queries:
+        start = time.perf_counter()
+        query(latitude, longitude)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        "median_ms": statistics.median(timings) * 1000,
+        "p99_ms": timings[int(len(timings) * 0.99) - 1] * 1000,
+    }
+
+def run(points: int = 100000, queries: int = 1000, k: int = 10, radius_km: float = 5.0) -> dict:
+    start = time.perf_counter()
+    index = build_index(points)
+    build_s = time.perf_counter() - start
+
+    rng = random.Random(1)
+    sample = [(rng.uniform(45.0, 55.0), rng.uniform(-5.0, 10.0)) for _ in range(queries)]
+    return {
+        "build_s": build_s,
+        f"nearest_{k}": measure(lambda lat, lon: index.nearest(lat, lon, k=k), sample),
+        f"within_{radius_km:g}km": measure(lambda lat, lon: index.within(lat, lon, radius_km), sample),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark spatial index queries")
+    parser.add_argument("--points", type=int, default=100000, help="Indexed locations")
+    parser.add_argument("--queries", type=int, default=1000, help="Queries per workload")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours for nearest-k")
+    parser.add_argument("--radius-km", type=float, default=5.0, help="Radius for radius queries")
+    args = parser.parse_args()
+
+    results = run(args.points, args.queries, args.k, args.radius_km)
+    print(f"{'build':<16} {results.pop('build_s'):8.2f} s")
+    for name, result in results.items():
+        print(f"{name:<16} {result['median_ms']:8.3f} ms median  {result['p99_ms']:8.3f} ms p99")
@@ -0,0 +1,76 @@
+"""Micro-benchmarks for ORM hot paths (pytest-benchmark).
+
+Route functions are called directly, without HTTP, so each number is the cost
+of the handler itself: its queries, ORM work and schema validation.
+
+Usage: python run_tests.py --benchmark    (records results in test_logs/test_history.json)
+       python -m pytest benchmarks/ --benchmark-only
+"""
+import asyncio
+import itertools
+import pytest
+from typing import List
+from pydantic import TypeAdapter
+from sqlalchemy.orm import selectinload
+
+from auth import create_access_token, get_current_user
+from benchmarks.datagen import BENCHMARK_USER, serial_number
+from models.cylinder import Cylinder
+from models.movement import MovementType, Transaction
+from routers.cylinders import search_cylinder
+from routers.movements import create_cylinder_movement
+from schemas import Cylinder as CylinderSchema, CylinderMovementCreate, Transaction as TransactionSchema
+
+@pytest.fixture(scope="module")
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+@pytest.mark.benchmark(group="search_cylinder")
+def test_search_cylinder(benchmark, loop, db, benchmark_user):
+    # Rotate through cylinders so every call is a real index lookup
+    serials = itertools.cycle(serial_number(n) for n in range(1, 1001))
+    cylinder = benchmark(
+        lambda: loop.run_until_complete(search_cylinder(next(serials), current_user=benchmark_user, db=db))
+    )
+    assert cylinder.serial_number.startswith("SN")
+
+@pytest.mark.benchmark(group="create_cylinder_movement")
+def test_create_cylinder_movement(benchmark, loop, db, benchmark_user):
+    cylinder_ids = itertools.cycle(range(1, 1001))
+
+    def create():
+        movement = CylinderMovementCreate(
+            cylinder_id=next(cylinder_ids),
+            movement_type=MovementType.DELIVERY,
+            from_location_id=1,
+            to_location_id=2
+        )
+        return loop.run_until_complete(create_cylinder_movement(movement, current_user=benchmark_user, db=db))
+
+    movement = benchmark(create)
+    assert movement.id is not None
+
+@pytest.mark.benchmark(group="get_current_user")
+def test_get_current_user(benchmark, loop, db):
+    token = create_access_token({"sub": BENCHMARK_USER})
+    user = benchmark(lambda: loop.run_until_complete(get_current_user(token=token, db=db)))
+    assert user.email == BENCHMARK_USER
+
+@pytest.mark.benchmark(group="serialization")
+def test_serialize_cylinder_page(benchmark, db):
+    # What response_model=List[CylinderSchema] does for a 100-row page
+    cylinders = db.query(Cylinder).order_by(Cylinder.id).limit(100).all()
+    adapter = TypeAdapter(List[CylinderSchema])
+    body = benchmark(lambda: adapter.dump_json(adapter.validate_python(cylinders, from_attributes=True)))
+    assert body.startswith(b"[")
+
+@pytest.mark.benchmark(group="serialization")
+def test_serialize_transactions_with_items(benchmark, db):
+    transactions = db.query(Transaction).options(
+        selectinload(Transaction.items)
+    ).order_by(Transaction.id).limit(100).all()
+    adapter = TypeAdapter(List[TransactionSchema])
+    body = benchmark(lambda: adapter.dump_json(adapter.validate_python(transactions, from_attributes=True)))
+    assert b'"items"' in body
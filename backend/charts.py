@@ -0,0 +1,100 @@
+from fastapi import HTTPException, status
+from fastapi.responses import Response
+from typing import Dict, List, Optional, Sequence
+from io import BytesIO
+import base64
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow IPC output is optional
+    pa = None
+
+# Chart response formats for the analytics endpoints.
+# "png" keeps the original server-rendered image, the others only ship the numbers.
+CHART_FORMATS = ("png", "series", "columnar", "arrow")
+DEFAULT_CHART_FORMAT = "png"
+
+SERIES_MEDIA_TYPE = "application/vnd.gastracker.series+json"
+COLUMNAR_MEDIA_TYPE = "application/vnd.gastracker.columnar+json"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+_ACCEPT_FORMATS = {
+    SERIES_MEDIA_TYPE: "series",
+    COLUMNAR_MEDIA_TYPE: "columnar",
+    ARROW_MEDIA_TYPE: "arrow",
+}
+
+def negotiate_chart_format(format: Optional[str] = None, accept: Optional[str] = None) -> str:
+    """Pick the chart format from the ``format`` query parameter or the Accept header.
+
+    The query parameter wins; without either the endpoints keep returning PNGs.
+    """
+    if format:
+        if format not in CHART_FORMATS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid chart format, expected one of: {', '.join(CHART_FORMATS)}"
+            )
+        chosen = format
+    else:
+        chosen = DEFAULT_CHART_FORMAT
+        for media_range in (accept or "").split(","):
+            media_type = media_range.split(";")[0].strip().lower()
+            if media_type in _ACCEPT_FORMATS:
+                chosen = _ACCEPT_FORMATS[media_type]
+                break
+
+    if chosen == "arrow" and pa is None:
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail="Arrow output requires pyarrow to be installed"
+        )
+    return chosen
+
+def _label(value):
+    # Enum keys (statuses, movement types) are sent as their plain values
+    return getattr(value, "value", value)
+
+def series_payload(labels: Sequence, series: Dict[str, Sequence]) -> dict:
+    """Row-oriented chart data: one label axis plus one array per named series."""
+    return {
+        "labels": [_label(label) for label in labels],
+        "series": [{"name": name, "data": list(values)} for name, values in series.items()]
+    }
+
+def columnar_payload(columns: Dict[str, Sequence]) -> dict:
+    """Column-oriented chart data: column names once, then one array per column."""
+    return {
+        "columns": list(columns),
+        "data": [[_label(value) for value in values] for values in columns.values()]
+    }
+
+def arrow_response(columns: Dict[str, Sequence]) -> Response:
+    """Serialize the columns as a single-batch Arrow IPC stream."""
+    table = pa.table({
+        name: [_label(value) for value in values] for name, values in columns.items()
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return Response(content=sink.getvalue().to_pybytes(), media_type=ARROW_MEDIA_TYPE)
+
+def chart_response(chart_format: str, labels: List, series: Dict[str, Sequence], label_name: str = "label"):
+    """Build the data-only response for ``series``, ``columnar`` and ``arrow`` formats."""
+    if chart_format == "series":
+        return series_payload(labels, series)
+
+    columns = {label_name: labels}
+    columns.update(series)
+    if chart_format == "arrow":
+        return arrow_response(columns)
+    return columnar_payload(columns)
+
+def figure_to_base64(plt) -> str:
+    """Save the current matplotlib figure as a base64 PNG and close it."""
+    buffer = BytesIO()
+    plt.savefig(buffer, format='png')
+    buffer.seek(0)
+    plot_data = base64.b64encode(buffer.getvalue()).decode()
+    plt.close()
+    return plot_data
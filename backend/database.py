@@ -1,9 +1,12 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from fastapi import Request, Response
 import os
 from dotenv import load_dotenv
 
+from replicas import ReplicaSet, reads_own_writes, track_writes
+
 load_dotenv()
 
 # Get environment
@@ -32,10 +35,41 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create base class for models
 Base = declarative_base()
 
+# Read replicas (comma-separated URLs); without any, reads use the primary
+REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+replica_set = ReplicaSet(
+    [
+        create_engine(url, connect_args={"check_same_thread": False} if url.startswith("sqlite") else {})
+        for url in REPLICA_URLS
+    ],
+    max_lag_seconds=REPLICA_MAX_LAG_SECONDS,
+    check_interval=float(os.getenv("REPLICA_CHECK_INTERVAL", "10"))
+)
+# Writers read from the primary for as long as a replica may lag behind them
+track_writes(SessionLocal, REPLICA_MAX_LAG_SECONDS)
+
 # Dependency to get DB session
-def get_db():
-    db = SessionLocal()
+def get_db(response: Response = None):
+    db = SessionLocal(info={"response": response})
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+# Dependency for read-only endpoints: a healthy replica unless the client just wrote
+def get_read_db(request: Request = None):
+    engine = None
+    if replica_set.engines and not (request is not None and reads_own_writes(request.cookies)):
+        engine = replica_set.choose()
+    db = replica_set.session_factories[engine]() if engine is not None else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Online migration: mirror committed writes to a second database (see dual_write.py)
+DUAL_WRITE_DATABASE_URL = os.getenv("DUAL_WRITE_DATABASE_URL")
+if DUAL_WRITE_DATABASE_URL:
+    from dual_write import enable_dual_write
+    dual_writer = enable_dual_write(SessionLocal, create_engine(DUAL_WRITE_DATABASE_URL))
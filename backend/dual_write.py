@@ -0,0 +1,304 @@
+"""Online migration to a second database: dual writes, backfill and consistency checks.
+
+With ``DUAL_WRITE_DATABASE_URL`` set, every session from ``database.get_db``
+mirrors its committed changes to that engine. Rows are read back from the
+primary inside the flushing transaction, so server defaults and onupdate values
+are copied exactly, then upserted (or deleted) on the secondary after the
+primary commits. The primary stays authoritative: a failed mirror write is
+logged, never raised, and the consistency checker repairs it later.
+
+Historical rows are copied by a throttled ``Backfill`` that only inserts rows
+the secondary does not have yet, so it never overwrites a newer dual write.
+``check_consistency`` compares both sides in primary-key ranges by hash and
+``repair`` re-copies the ranges that differ.
+
+Usage:
+    DATABASE_URL=sqlite:///./gas_tracker.db DUAL_WRITE_DATABASE_URL=postgresql://... python dual_write.py backfill
+    ... python dual_write.py check [--repair]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, event, func, select
+from sqlalchemy.engine import Engine
+
+from migrate_to_postgres import integer_key, normalize_value, stored_columns
+
+logger = logging.getLogger("dual_write")
+
+# Dual writes
+
+def _insert(connection, table):
+    if connection.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif connection.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upserts are not supported on {connection.dialect.name}")
+    return insert(table)
+
+def upsert_rows(connection, table, rows: List[dict], overwrite: bool = True):
+    """Insert ``rows``; existing keys are overwritten, or left alone with ``overwrite=False``."""
+    if not rows:
+        return
+    stmt = _insert(connection, table)
+    keys = [column.name for column in table.primary_key.columns]
+    values = {column.name: stmt.excluded[column.name] for column in table.columns if not column.primary_key}
+    if overwrite and values:
+        stmt = stmt.on_conflict_do_update(index_elements=keys, set_=values)
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=keys)
+    connection.execute(stmt, rows)
+
+def _dependency_order(item) -> int:
+    table = item[0]
+    return table.metadata.sorted_tables.index(table)
+
+class DualWriter:
+    """Session listeners that mirror committed changes to ``secondary``."""
+
+    def __init__(self, secondary: Engine):
+        self.secondary = secondary
+        self.mirrored = 0
+        self.failures = 0
+
+    def _pending(self, session) -> dict:
+        return session.info.setdefault("dual_write", {"upsert": {}, "delete": {}, "rows": {}})
+
+    def after_flush(self, session, flush_context):
+        pending = self._pending(session)
+        for instance in list(session.new) + list(session.dirty):
+            table = instance.__table__
+            key = integer_key(table)
+            if key is not None:
+                pending["upsert"].setdefault(table, set()).add(getattr(instance, key.key))
+        for instance in session.deleted:
+            table = instance.__table__
+            key = integer_key(table)
+            if key is not None:
+                ids = pending["delete"].setdefault(table, set())
+                ids.add(getattr(instance, key.key))
+                pending["upsert"].get(table, set()).discard(getattr(instance, key.key))
+
+    def after_flush_postexec(self, session, flush_context):
+        # Read the rows as stored, in the same transaction, while ids are fresh
+        pending = self._pending(session)
+        connection = session.connection()
+        for table, ids in pending["upsert"].items():
+            if not ids:
+                continue
+            key = integer_key(table)
+            rows = connection.execute(select(*stored_columns(table)).where(key.in_(ids))).mappings()
+            pending["rows"].setdefault(table, {}).update({row[key.name]: dict(row) for row in rows})
+            ids.clear()
+
+    def after_commit(self, session):
+        pending = session.info.pop("dual_write", None)
+        if not pending or not (pending["rows"] or pending["delete"]):
+            return
+        try:
+            with self.secondary.begin() as connection:
+                # Children first for deletes, parents first for upserts, so foreign keys hold
+                for table, ids in sorted(pending["delete"].items(), key=_dependency_order, reverse=True):
+                    connection.execute(delete(table).where(integer_key(table).in_(ids)))
+                for table, rows in sorted(pending["rows"].items(), key=_dependency_order):
+                    deleted = pending["delete"].get(table, set())
+                    upsert_rows(connection, table, [row for row_id, row in rows.items() if row_id not in deleted])
+            self.mirrored += 1
+        except Exception:
+            self.failures += 1
+            logger.exception("Dual write failed; run the consistency checker to repair the secondary")
+
+    def after_rollback(self, session):
+        session.info.pop("dual_write", None)
+
+    def do_orm_execute(self, orm_execute_state):
+        if orm_execute_state.is_update or orm_execute_state.is_delete:
+            # Bulk UPDATE/DELETE statements carry no per-row state to mirror
+            logger.warning("Bulk %s is not mirrored; run the consistency checker afterwards",
+                           "update" if orm_execute_state.is_update else "delete")
+
+def enable_dual_write(session_factory, secondary: Engine) -> DualWriter:
+    writer = DualWriter(secondary)
+    for name in ("after_flush", "after_flush_postexec", "after_commit", "after_rollback", "do_orm_execute"):
+        event.listen(session_factory, name, getattr(writer, name))
+    return writer
+
+# Backfill
+
+class Backfill:
+    """Copy historical rows to the secondary in key order, at most ``rows_per_second``.
+
+    Rows the secondary already has (dual-written or copied earlier) are left as
+    they are. Progress is kept per table in ``progress`` and, when given, in a
+    JSON ``checkpoint_file`` so a restarted backfill carries on where it stopped.
+    """
+
+    def __init__(self, primary: Engine, secondary: Engine, tables, chunk_size: int = 1000,
+                 rows_per_second: float = 5000, checkpoint_file: Optional[str] = None):
+        self.primary = primary
+        self.secondary = secondary
+        self.tables = [table for table in tables if integer_key(table) is not None]
+        self.chunk_size = chunk_size
+        self.rows_per_second = rows_per_second
+        self.checkpoint_file = checkpoint_file
+        self.progress: Dict[str, dict] = {}
+        if checkpoint_file and os.path.exists(checkpoint_file):
+            with open(checkpoint_file) as checkpoint:
+                self.progress = json.load(checkpoint)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _save(self):
+        if self.checkpoint_file:
+            temporary = f"{self.checkpoint_file}.tmp"
+            with open(temporary, "w") as checkpoint:
+                json.dump(self.progress, checkpoint, indent=2)
+            os.replace(temporary, self.checkpoint_file)
+
+    def run_table(self, table):
+        key = integer_key(table)
+        with self.primary.connect() as connection:
+            # Rows inserted after this point are dual-written
+            max_id = connection.execute(select(func.max(key))).scalar() or 0
+        progress = self.progress.setdefault(table.name, {"last_id": 0, "copied": 0})
+        progress["max_id"] = max_id
+        columns = stored_columns(table)
+        while progress["last_id"] < max_id and not self._stop.is_set():
+            started = time.perf_counter()
+            with self.primary.connect() as connection:
+                rows = connection.execute(
+                    select(*columns).where(key > progress["last_id"], key <= max_id)
+                    .order_by(key).limit(self.chunk_size)
+                ).mappings().all()
+            if not rows:
+                break
+            with self.secondary.begin() as connection:
+                upsert_rows(connection, table, [dict(row) for row in rows], overwrite=False)
+            progress["last_id"] = rows[-1][key.name]
+            progress["copied"] += len(rows)
+            self._save()
+            # Throttle: a chunk may take no less than its share of the rate budget
+            budget = len(rows) / self.rows_per_second if self.rows_per_second else 0
+            self._stop.wait(max(0.0, budget - (time.perf_counter() - started)))
+        progress["done"] = progress["last_id"] >= max_id
+        self._save()
+
+    def run(self):
+        for table in self.tables:
+            if self._stop.is_set():
+                break
+            if not self.progress.get(table.name, {}).get("done"):
+                self.run_table(table)
+
+    def start(self) -> "Backfill":
+        self._thread = threading.Thread(target=self.run, name="dual-write-backfill", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def join(self, timeout: Optional[float] = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+# Consistency checks
+
+def _range_digests(engine: Engine, table, chunk_size: int) -> Dict[int, str]:
+    """Digest of every ``chunk_size`` key range (keyed by range start) that holds rows."""
+    key = integer_key(table)
+    key_index = list(table.columns).index(key)
+    digests = {}
+    with engine.connect() as connection:
+        result = connection.execution_options(yield_per=10000).execute(
+            select(*stored_columns(table)).order_by(key)
+        )
+        for row in result:
+            start = row[key_index] // chunk_size * chunk_size
+            digest = digests.get(start)
+            if digest is None:
+                digest = digests[start] = hashlib.blake2b(digest_size=16)
+            digest.update(repr(tuple(normalize_value(value) for value in row)).encode())
+    return {start: digest.hexdigest() for start, digest in digests.items()}
+
+def compare_table(primary: Engine, secondary: Engine, table, chunk_size: int = 10000) -> List[Tuple[int, int]]:
+    """Key ranges ``[start, end)`` whose content differs between the two databases."""
+    primary_digests = _range_digests(primary, table, chunk_size)
+    secondary_digests = _range_digests(secondary, table, chunk_size)
+    return sorted(
+        (start, start + chunk_size)
+        for start in set(primary_digests) | set(secondary_digests)
+        if primary_digests.get(start) != secondary_digests.get(start)
+    )
+
+def check_consistency(primary: Engine, secondary: Engine, tables, chunk_size: int = 10000) -> Dict[str, List[Tuple[int, int]]]:
+    """Differing key ranges per table; empty when both sides match."""
+    differences = {}
+    for table in tables:
+        if integer_key(table) is None:
+            continue
+        ranges = compare_table(primary, secondary, table, chunk_size)
+        if ranges:
+            differences[table.name] = ranges
+    return differences
+
+def repair(primary: Engine, secondary: Engine, table, ranges: List[Tuple[int, int]]) -> int:
+    """Make the secondary match the primary in ``ranges``; returns rows copied."""
+    key = integer_key(table)
+    copied = 0
+    for start, end in ranges:
+        with primary.connect() as connection:
+            rows = connection.execute(
+                select(*stored_columns(table)).where(key >= start, key < end)
+            ).mappings().all()
+        with secondary.begin() as connection:
+            ids = [row[key.name] for row in rows]
+            connection.execute(delete(table).where(key >= start, key < end, key.not_in(ids)))
+            upsert_rows(connection, table, [dict(row) for row in rows])
+        copied += len(rows)
+    return copied
+
+if __name__ == "__main__":
+    from sqlalchemy import create_engine
+
+    from database import Base, engine as primary_engine
+
+    parser = argparse.ArgumentParser(description="Backfill and check the dual-write secondary database")
+    parser.add_argument("command", choices=["backfill", "check"])
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per backfill chunk / keys per checked range")
+    parser.add_argument("--rows-per-second", type=float, default=5000, help="Backfill throttle")
+    parser.add_argument("--checkpoint", default="backfill_checkpoint.json", help="Backfill progress file")
+    parser.add_argument("--repair", action="store_true", help="Re-copy ranges that differ")
+    args = parser.parse_args()
+
+    secondary_url = os.getenv("DUAL_WRITE_DATABASE_URL")
+    if not secondary_url:
+        raise SystemExit("DUAL_WRITE_DATABASE_URL environment variable is required")
+    secondary_engine = create_engine(secondary_url)
+    Base.metadata.create_all(secondary_engine)
+    tables = Base.metadata.sorted_tables
+
+    if args.command == "backfill":
+        backfill = Backfill(primary_engine, secondary_engine, tables, args.chunk_size, args.rows_per_second, args.checkpoint)
+        backfill.run()
+        for name, progress in backfill.progress.items():
+            print(f"{name}: {progress['copied']} rows copied, up to id {progress['last_id']}/{progress['max_id']}")
+    else:
+        differences = check_consistency(primary_engine, secondary_engine, tables, args.chunk_size)
+        for name, ranges in differences.items():
+            print(f"{name}: {len(ranges)} ranges differ")
+            if args.repair:
+                print(f"  repaired, {repair(primary_engine, secondary_engine, Base.metadata.tables[name], ranges)} rows copied")
+        if not differences:
+            print("Databases are consistent")
+        elif not args.repair:
+            raise SystemExit(1)
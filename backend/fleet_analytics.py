@@ -0,0 +1,209 @@
+import sqlite3
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session
+
+from models.customer import Location
+from models.cylinder import Cylinder
+from models.movement import CylinderMovement, MovementType
+
+# Fleet turn metrics from the movement log.
+#
+# Dwell time is the time from a DELIVERY to the cylinder's next movement, found
+# with LEAD(timestamp) OVER (PARTITION BY cylinder_id ORDER BY timestamp) and
+# aggregated in the database. Where window functions are unavailable (SQLite
+# before 3.25, other dialects) the same numbers come from one sorted read and a
+# grouped shift in pandas. Windows end at midnight UTC, so results only change
+# once a day and DailyCache keeps them until then.
+
+WINDOW_DIALECTS = ("postgresql", "sqlite")
+
+def supports_window_functions(db: Session) -> bool:
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        return sqlite3.sqlite_version_info >= (3, 25, 0)
+    return dialect in WINDOW_DIALECTS
+
+def day_window(days: int, today: Optional[date] = None):
+    """[start, end) of the ``days`` whole days before today (UTC)."""
+    end = datetime.combine(today or datetime.utcnow().date(), time.min)
+    return end - timedelta(days=days), end
+
+def _days_between(db: Session, later, earlier):
+    if db.get_bind().dialect.name == "sqlite":
+        return func.julianday(later) - func.julianday(earlier)
+    return func.extract("epoch", later - earlier) / 86400.0
+
+def _dwell_summary(count, open_count, average, longest) -> Dict:
+    return {
+        "deliveries": int(count or 0),
+        "still_at_customer": int(open_count or 0),
+        "avg_days_at_customer": round(float(average), 2) if average is not None else None,
+        "max_days_at_customer": round(float(longest), 2) if longest is not None else None,
+    }
+
+def _dwell_sql(db: Session, start: datetime, end: datetime, top: int) -> Dict:
+    # Movements from the window start onwards, so the LEAD of the last delivery can fall after the end
+    moves = select(
+        CylinderMovement.cylinder_id,
+        CylinderMovement.movement_type,
+        CylinderMovement.to_location_id,
+        CylinderMovement.timestamp,
+        func.lead(CylinderMovement.timestamp).over(
+            partition_by=CylinderMovement.cylinder_id,
+            order_by=(CylinderMovement.timestamp, CylinderMovement.id)
+        ).label("next_timestamp")
+    ).where(CylinderMovement.timestamp >= start).subquery()
+    deliveries = and_(moves.c.movement_type == MovementType.DELIVERY, moves.c.timestamp < end)
+    dwell = _days_between(db, moves.c.next_timestamp, moves.c.timestamp)
+
+    count, open_count, average, longest = db.execute(
+        select(
+            func.count(),
+            func.count() - func.count(moves.c.next_timestamp),
+            func.avg(dwell),
+            func.max(dwell)
+        ).where(deliveries)
+    ).one()
+    by_customer = db.execute(
+        select(
+            Location.customer_id,
+            func.count().label("deliveries"),
+            func.avg(dwell).label("avg_days")
+        ).select_from(moves).join(Location, Location.id == moves.c.to_location_id)
+        .where(deliveries, moves.c.next_timestamp.is_not(None))
+        .group_by(Location.customer_id)
+        .order_by(func.avg(dwell).desc(), Location.customer_id)
+        .limit(top)
+    ).all()
+    summary = _dwell_summary(count, open_count, average, longest)
+    summary["slowest_customers"] = [
+        {"customer_id": customer_id, "deliveries": deliveries, "avg_days_at_customer": round(float(days), 2)}
+        for customer_id, deliveries, days in by_customer
+    ]
+    return summary
+
+def _dwell_pandas(db: Session, start: datetime, end: datetime, top: int) -> Dict:
+    frame = pd.DataFrame(
+        db.execute(
+            select(
+                CylinderMovement.cylinder_id,
+                CylinderMovement.movement_type,
+                CylinderMovement.to_location_id,
+                CylinderMovement.timestamp
+            ).where(CylinderMovement.timestamp >= start)
+            .order_by(CylinderMovement.cylinder_id, CylinderMovement.timestamp, CylinderMovement.id)
+        ).all(),
+        columns=["cylinder_id", "movement_type", "to_location_id", "timestamp"]
+    )
+    if frame.empty:
+        summary = _dwell_summary(0, 0, None, None)
+        summary["slowest_customers"] = []
+        return summary
+    frame["timestamp"] = pd.to_datetime(frame["timestamp"], utc=True)
+    frame["next_timestamp"] = frame.groupby("cylinder_id", sort=False)["timestamp"].shift(-1)
+    end = pd.Timestamp(end, tz="UTC") if end.tzinfo is None else pd.Timestamp(end)
+    deliveries = frame[(frame["movement_type"] == MovementType.DELIVERY) & (frame["timestamp"] < end)]
+    dwell = (deliveries["next_timestamp"] - deliveries["timestamp"]).dt.total_seconds() / 86400.0
+
+    summary = _dwell_summary(len(deliveries), dwell.isna().sum(), dwell.mean(), dwell.max())
+    closed = deliveries.assign(days=dwell).dropna(subset=["days"])
+    customers = dict(db.execute(
+        select(Location.id, Location.customer_id).where(Location.id.in_(closed["to_location_id"].dropna().unique().tolist()))
+    ).all())
+    closed = closed.assign(customer_id=closed["to_location_id"].map(customers)).dropna(subset=["customer_id"])
+    per_customer = closed.groupby("customer_id")["days"].agg(["count", "mean"]).reset_index()
+    per_customer = per_customer.sort_values(["mean", "customer_id"], ascending=[False, True]).head(top)
+    summary["slowest_customers"] = [
+        {"customer_id": int(row.customer_id), "deliveries": int(row.count), "avg_days_at_customer": round(float(row.mean), 2)}
+        for row in per_customer.itertuples()
+    ]
+    return summary
+
+def dwell_times(db: Session, start: datetime, end: datetime, top: int = 10, method: Optional[str] = None) -> Dict:
+    """Days cylinders delivered in [start, end) stayed out, overall and for the slowest customers."""
+    method = method or ("sql" if supports_window_functions(db) else "pandas")
+    summary = (_dwell_sql if method == "sql" else _dwell_pandas)(db, start, end, top)
+    summary.update({"start": start, "end": end, "method": method})
+    return summary
+
+def turn_rate(db: Session, start: datetime, end: datetime) -> Dict:
+    """Deliveries per cylinder in [start, end), annualized; turn days is its inverse."""
+    fleet = db.query(func.count(Cylinder.id)).scalar() or 0
+    deliveries, cylinders_turned = db.query(
+        func.count(CylinderMovement.id),
+        func.count(CylinderMovement.cylinder_id.distinct())
+    ).filter(
+        CylinderMovement.movement_type == MovementType.DELIVERY,
+        CylinderMovement.timestamp >= start,
+        CylinderMovement.timestamp < end
+    ).one()
+    years = (end - start).total_seconds() / (365 * 86400)
+    rate = deliveries / fleet / years if fleet and years else 0.0
+    return {
+        "start": start,
+        "end": end,
+        "fleet_size": fleet,
+        "deliveries": deliveries,
+        "cylinders_turned": cylinders_turned,
+        "turns_per_cylinder_per_year": round(rate, 3),
+        "avg_turn_days": round(365 / rate, 1) if rate else None,
+    }
+
+def idle_cylinders(db: Session, days: int, limit: int = 100, today: Optional[date] = None) -> Dict:
+    """Cylinders whose last movement is more than ``days`` days old (or that never moved)."""
+    cutoff, _ = day_window(days, today)
+    last_moved = select(
+        CylinderMovement.cylinder_id,
+        func.max(CylinderMovement.timestamp).label("last_moved")
+    ).group_by(CylinderMovement.cylinder_id).subquery()
+    idle = db.query(
+        Cylinder.id, Cylinder.serial_number, Cylinder.status, Cylinder.current_location_id, last_moved.c.last_moved
+    ).outerjoin(last_moved, last_moved.c.cylinder_id == Cylinder.id).filter(
+        (last_moved.c.last_moved < cutoff) | last_moved.c.last_moved.is_(None)
+    )
+    total = idle.count()
+    rows = idle.order_by(last_moved.c.last_moved.is_not(None), last_moved.c.last_moved, Cylinder.id).limit(limit).all()
+    return {
+        "days": days,
+        "cutoff": cutoff,
+        "total": total,
+        "cylinders": [
+            {
+                "id": cylinder_id, "serial_number": serial, "status": cylinder_status,
+                "current_location_id": location_id, "last_moved": moved
+            }
+            for cylinder_id, serial, cylinder_status, location_id, moved in rows
+        ],
+    }
+
+class DailyCache:
+    """Results keyed by arguments and the current UTC day; earlier days are dropped."""
+
+    def __init__(self):
+        self._day = None
+        self._values: Dict[tuple, Dict] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, compute: Callable[[], Dict]) -> Dict:
+        today = datetime.utcnow().date()
+        with self._lock:
+            if self._day != today:
+                self._day, self._values = today, {}
+            if key in self._values:
+                return self._values[key]
+        value = compute()
+        with self._lock:
+            if self._day == today:
+                self._values[key] = value
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._values = {}
+
+fleet_cache = DailyCache()
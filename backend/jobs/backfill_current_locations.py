@@ -0,0 +1,27 @@
+"""Fill in cylinders.current_location_id from movement history.
+
+Cylinders written before the column existed have no location, so the
+per-location counters never see them. Each gets the destination of its
+latest completed movement; cylinders that already have a location are
+skipped, so it is safe to re-run. The counters move in the same
+transactions, so no reconciliation run is needed afterwards.
+
+Usage: python -m jobs.backfill_current_locations [--batch-size 1000]
+"""
+import argparse
+
+def run_backfill(batch_size: int = 1000) -> int:
+    from app.core.database import SessionLocal
+    from app.services.inventory import backfill_current_locations
+
+    db = SessionLocal()
+    try:
+        return backfill_current_locations(db, batch_size)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Set missing cylinder locations from their movements")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Cylinders checked per transaction")
+    args = parser.parse_args()
+    print(f"{run_backfill(args.batch_size)} cylinders located")
@@ -0,0 +1,24 @@
+"""Fill in locations.geohash for rows written before the column existed.
+
+Run once after deploying the geohash column; rows that already have one are
+skipped, so it is safe to re-run (e.g. after importing locations with raw SQL).
+
+Usage: python -m jobs.backfill_geohashes [--batch-size 1000]
+"""
+import argparse
+
+def run_backfill(batch_size: int = 1000) -> int:
+    from app.core.database import SessionLocal
+    from app.services.spatial import backfill_location_geohashes
+
+    db = SessionLocal()
+    try:
+        return backfill_location_geohashes(db, batch_size)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute missing location geohashes")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Locations updated per transaction")
+    args = parser.parse_args()
+    print(f"{run_backfill(args.batch_size)} locations updated")
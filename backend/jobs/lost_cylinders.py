@@ -0,0 +1,204 @@
+"""Flag cylinders that have stayed at a customer site for too long.
+
+One pass over the fleet: the last movement of every cylinder comes from a
+single GROUP BY over the (cylinder_id, timestamp) index, only cylinders idle
+for longer than the lowest threshold are read, and dwell times and thresholds
+are compared for all of them at once in pandas. Thresholds are
+per customer and/or gas type (``dwell_thresholds``), the most specific one
+winning, with ``default_days`` for everything else.
+
+Re-evaluation is incremental: the result is diffed against the unresolved
+alerts, so a run only inserts newly lost cylinders, resolves alerts for
+cylinders that moved (or whose threshold went up) and updates alerts whose
+details changed. Acknowledged alerts stay acknowledged while the cylinder is
+still lost.
+
+Usage: python -m jobs.lost_cylinders [--default-days 90] [--interval 3600]
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+import pandas as pd
+from sqlalchemy import String, bindparam, func, insert, select, type_coerce, update
+from sqlalchemy.orm import Session
+
+from models.alert import AlertStatus, CylinderAlert, DwellThreshold
+from models.customer import Location
+from models.cylinder import Cylinder, CylinderStatus
+from models.movement import CylinderMovement
+
+DEFAULT_MAX_DWELL_DAYS = int(os.getenv("LOST_CYLINDER_DAYS", "90"))
+ALERT_TYPE = "lost"
+# Cylinders in the workshop or written off are not at a customer
+EXCLUDED_STATUSES = [CylinderStatus.MAINTENANCE, CylinderStatus.SCRAPPED]
+ACTIVE_ALERTS = [AlertStatus.OPEN, AlertStatus.ACKNOWLEDGED]
+
+cylinders = Cylinder.__table__
+movements = CylinderMovement.__table__
+locations = Location.__table__
+thresholds_table = DwellThreshold.__table__
+alerts = CylinderAlert.__table__
+
+def _utc(values: pd.Series) -> pd.Series:
+    # Naive values are UTC (SQLite); compared and stored as naive UTC
+    return pd.to_datetime(values, utc=True).dt.tz_localize(None)
+
+def _raw_timestamp(db: Session, column):
+    # SQLite stores text: let pandas parse the whole column instead of one datetime per row
+    return type_coerce(column, String) if db.get_bind().dialect.name == "sqlite" else column
+
+def fleet_positions(db: Session, moved_before: datetime) -> pd.DataFrame:
+    """Cylinders at a customer site, not moved since ``moved_before``, with gas type and last movement time."""
+    last_moved = select(
+        movements.c.cylinder_id,
+        func.max(movements.c.timestamp).label("last_moved_at")
+    ).group_by(movements.c.cylinder_id).subquery()
+    # Never moved: the clock starts when the cylinder was registered
+    last_moved_at = func.coalesce(last_moved.c.last_moved_at, cylinders.c.created_at)
+    customer_id = func.coalesce(locations.c.customer_id, cylinders.c.current_customer_id)
+    stmt = select(
+        cylinders.c.id,
+        type_coerce(cylinders.c.type, String),
+        cylinders.c.current_location_id,
+        customer_id,
+        _raw_timestamp(db, last_moved_at)
+    ).outerjoin(
+        last_moved, last_moved.c.cylinder_id == cylinders.c.id
+    ).outerjoin(
+        locations, locations.c.id == cylinders.c.current_location_id
+    ).where(
+        cylinders.c.status.not_in(EXCLUDED_STATUSES),
+        customer_id.is_not(None),
+        last_moved_at < moved_before
+    )
+    positions = pd.DataFrame(
+        db.execute(stmt).all(), columns=["cylinder_id", "gas_type", "location_id", "customer_id", "last_moved_at"]
+    )
+    positions["customer_id"] = positions["customer_id"].astype("int64")
+    positions["last_moved_at"] = _utc(positions["last_moved_at"])
+    return positions
+
+def resolve_thresholds(positions: pd.DataFrame, thresholds: pd.DataFrame, default_days: int) -> pd.Series:
+    """Max dwell days per position: customer and gas type, then customer, then gas type, then the default."""
+    result = pd.Series(float(default_days), index=positions.index)
+    # Least specific first, so each more specific rule overwrites it
+    for keys in (["gas_type"], ["customer_id"], ["customer_id", "gas_type"]):
+        others = [key for key in ("customer_id", "gas_type") if key not in keys]
+        rules = thresholds[thresholds[keys].notna().all(axis=1) & thresholds[others].isna().all(axis=1)]
+        if rules.empty:
+            continue
+        rules = rules[keys + ["max_days"]].drop_duplicates(keys, keep="last")
+        if "customer_id" in keys:
+            rules = rules.astype({"customer_id": "int64"})
+        matched = positions[keys].merge(rules, how="left", on=keys)["max_days"].to_numpy()
+        result = result.where(pd.isna(matched), matched)
+    return result.astype("int64")
+
+def detect_lost_cylinders(db: Session, default_days: int = DEFAULT_MAX_DWELL_DAYS,
+                          now: Optional[datetime] = None) -> Dict[str, float]:
+    """Scan the fleet and bring the lost-cylinder alerts up to date; returns counts."""
+    started = time.perf_counter()
+    now = (now or datetime.now(timezone.utc)).astimezone(timezone.utc).replace(tzinfo=None)
+
+    thresholds = pd.DataFrame(
+        db.execute(select(
+            thresholds_table.c.customer_id, type_coerce(thresholds_table.c.gas_type, String), thresholds_table.c.max_days
+        )).all(),
+        columns=["customer_id", "gas_type", "max_days"]
+    )
+    # Only cylinders idle for longer than the lowest threshold can be lost
+    shortest = min([default_days] + thresholds["max_days"].tolist())
+    positions = fleet_positions(db, now - timedelta(days=shortest))
+    positions["threshold_days"] = resolve_thresholds(positions, thresholds, default_days)
+    dwell_days = (pd.Timestamp(now) - positions["last_moved_at"]).dt.total_seconds() / 86400
+    lost = positions[dwell_days > positions["threshold_days"]]
+
+    active = pd.DataFrame(
+        db.execute(select(
+            alerts.c.id, alerts.c.cylinder_id, alerts.c.customer_id, alerts.c.location_id,
+            _raw_timestamp(db, alerts.c.last_moved_at), alerts.c.threshold_days
+        ).where(alerts.c.alert_type == ALERT_TYPE, alerts.c.status.in_(ACTIVE_ALERTS))).all(),
+        columns=["id", "cylinder_id", "customer_id", "location_id", "last_moved_at", "threshold_days"]
+    )
+    active["last_moved_at"] = _utc(active["last_moved_at"])
+    merged = lost.merge(active, on="cylinder_id", how="outer", suffixes=("", "_alert"), indicator=True)
+
+    def records(frame: pd.DataFrame, **extra):
+        return [
+            {
+                "customer_id": int(row.customer_id),
+                "location_id": None if pd.isna(row.location_id) else int(row.location_id),
+                "last_moved_at": row.last_moved_at.to_pydatetime(),
+                "threshold_days": int(row.threshold_days),
+                **{key: value(row) for key, value in extra.items()},
+            }
+            for row in frame.itertuples()
+        ]
+
+    new = merged[merged["_merge"] == "left_only"]
+    if not new.empty:
+        db.execute(insert(alerts), records(
+            new, cylinder_id=lambda row: int(row.cylinder_id),
+            alert_type=lambda row: ALERT_TYPE, status=lambda row: AlertStatus.OPEN, detected_at=lambda row: now
+        ))
+
+    resolved = merged.loc[merged["_merge"] == "right_only", "id"].astype("int64").tolist()
+    for offset in range(0, len(resolved), 1000):
+        db.execute(update(alerts).where(alerts.c.id.in_(resolved[offset:offset + 1000])).values(
+            status=AlertStatus.RESOLVED, resolved_at=now
+        ))
+
+    both = merged[merged["_merge"] == "both"]
+    changed = both[
+        (both["customer_id"] != both["customer_id_alert"])
+        | (both["location_id"].fillna(-1) != both["location_id_alert"].fillna(-1))
+        | (both["last_moved_at"] != both["last_moved_at_alert"])
+        | (both["threshold_days"] != both["threshold_days_alert"])
+    ]
+    if not changed.empty:
+        # Bind names may not match the column names in an executemany UPDATE
+        db.execute(
+            update(alerts).where(alerts.c.id == bindparam("alert_id")).values(
+                {name: bindparam(f"new_{name}") for name in ("customer_id", "location_id", "last_moved_at", "threshold_days")}
+            ),
+            [
+                {f"new_{key}" if key != "alert_id" else key: value for key, value in record.items()}
+                for record in records(changed, alert_id=lambda row: int(row.id))
+            ]
+        )
+    db.commit()
+    return {
+        "scanned": len(positions),
+        "lost": len(lost),
+        "new": len(new),
+        "resolved": len(resolved),
+        "updated": len(changed),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+def run_scan(default_days: int = DEFAULT_MAX_DWELL_DAYS) -> Dict[str, float]:
+    # Writes alerts, so it runs on the primary
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return detect_lost_cylinders(db, default_days)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    from jobs.scheduler import PeriodicJob
+
+    parser = argparse.ArgumentParser(description="Flag cylinders that stayed at a customer site too long")
+    parser.add_argument("--default-days", type=int, default=DEFAULT_MAX_DWELL_DAYS, help="Threshold without a specific rule")
+    parser.add_argument("--interval", type=float, default=0, help="Keep running, scanning every N seconds")
+    args = parser.parse_args()
+
+    if args.interval > 0:
+        job = PeriodicJob("lost-cylinder-scan", lambda: run_scan(args.default_days), args.interval)
+        job.run()
+    else:
+        print(run_scan(args.default_days))
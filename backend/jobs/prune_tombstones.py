@@ -0,0 +1,31 @@
+"""Delete sync tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS.
+
+Devices whose cursor is older than the retention window are told to resync
+from scratch (see app/services/sync.py), so older tombstones are never read.
+Run it daily, from cron or with SYNC_TOMBSTONE_PRUNE_INTERVAL=86400.
+
+Usage: python -m jobs.prune_tombstones [--interval 86400]
+"""
+import argparse
+
+def run_prune() -> int:
+    from app.core.database import SessionLocal
+    from app.services.sync import prune_tombstones
+
+    db = SessionLocal()
+    try:
+        return prune_tombstones(db)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    from jobs.scheduler import PeriodicJob
+
+    parser = argparse.ArgumentParser(description="Delete expired sync tombstones")
+    parser.add_argument("--interval", type=float, default=0, help="Keep running, pruning every N seconds")
+    args = parser.parse_args()
+
+    if args.interval > 0:
+        PeriodicJob("tombstone-prune", run_prune, args.interval).run()
+    else:
+        print(f"{run_prune()} tombstones deleted")
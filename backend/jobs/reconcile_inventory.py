@@ -0,0 +1,33 @@
+"""Recount location_inventory from the cylinders table and repair drifted counters.
+
+The counters are maintained on every cylinder write (app/models/inventory.py),
+so a run normally corrects nothing; it catches rows changed outside the app.
+Run it nightly, from cron or with INVENTORY_RECONCILE_INTERVAL=86400.
+
+Usage: python -m jobs.reconcile_inventory [--interval 86400]
+"""
+import argparse
+from typing import Dict
+
+def run_reconciliation() -> Dict:
+    from app.core.database import SessionLocal
+    from app.services.inventory import reconcile_inventory
+
+    db = SessionLocal()
+    try:
+        result = reconcile_inventory(db)
+        return {"counters": result["counters"], "corrected": result["corrected"]}
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    from jobs.scheduler import PeriodicJob
+
+    parser = argparse.ArgumentParser(description="Recount per-location cylinder inventory")
+    parser.add_argument("--interval", type=float, default=0, help="Keep running, reconciling every N seconds")
+    args = parser.parse_args()
+
+    if args.interval > 0:
+        PeriodicJob("inventory-reconcile", run_reconciliation, args.interval).run()
+    else:
+        print(run_reconciliation())
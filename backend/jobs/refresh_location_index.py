@@ -0,0 +1,17 @@
+"""Rebuild this process's in-memory location index from the database.
+
+Each API worker keeps its own index (app/services/spatial.py) and only sees
+its own commits, so with more than one worker every process runs this on a
+timer; see LOCATION_INDEX_REFRESH_INTERVAL in main.py. It has no CLI: the
+index lives in the API process.
+"""
+
+def run_refresh() -> int:
+    from app.core.database import SessionLocal
+    from app.services.spatial import refresh_location_index
+
+    db = SessionLocal()
+    try:
+        return refresh_location_index(db)
+    finally:
+        db.close()
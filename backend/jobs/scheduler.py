@@ -0,0 +1,35 @@
+import logging
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger("jobs")
+
+class PeriodicJob:
+    """Run ``func`` every ``interval`` seconds in a daemon thread; failures are logged and retried next time."""
+
+    def __init__(self, name: str, func: Callable[[], object], interval: float):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.last_result = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run(self):
+        while not self._stop.is_set():
+            try:
+                self.last_result = self.func()
+                logger.info("%s: %s", self.name, self.last_result)
+            except Exception:
+                logger.exception("%s failed", self.name)
+            self._stop.wait(self.interval)
+
+    def start(self) -> "PeriodicJob":
+        self._thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
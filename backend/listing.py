@@ -0,0 +1,130 @@
+import hashlib
+from fastapi import HTTPException, Request, status
+from fastapi.responses import ORJSONResponse, Response
+from functools import lru_cache
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import Iterable, List, Optional, Tuple, Type
+
+from middleware import etag_matches
+
+def schema_columns(model, schema: Type[BaseModel], fields: Optional[Iterable[str]] = None) -> list:
+    """Mapped columns of ``model`` that back the fields of ``schema``.
+
+    Schema fields without a column (relationships, computed values) are skipped.
+    """
+    names = fields if fields is not None else schema.model_fields
+    return [getattr(model, name) for name in names if name in model.__table__.c]
+
+def projection(model, schema: Type[BaseModel], fields: Optional[Iterable[str]] = None):
+    """Column-only SELECT for the fields ``schema`` exposes."""
+    return select(*schema_columns(model, schema, fields))
+
+def fetch_rows(db: Session, stmt) -> List[dict]:
+    """Run a column-only statement and return plain dicts, skipping ORM identity-map work."""
+    result = db.execute(stmt)
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
+
+def weak_etag(versions: Iterable[tuple], *salt: str) -> str:
+    """Weak ETag from per-row ``(id, updated_at)`` pairs instead of a hash of the body.
+
+    ``salt`` distinguishes different representations of the same rows (e.g.
+    sparse fieldsets).
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in salt:
+        digest.update(part.encode())
+        digest.update(b"\0")
+    for row_id, version in versions:
+        digest.update(f"{row_id}:{version}\n".encode())
+    return f'W/"{digest.hexdigest()}"'
+
+def not_modified(request: Optional[Request], etag: str) -> bool:
+    return request is not None and etag_matches(request.headers.get("if-none-match", ""), etag)
+
+def rows_response(db: Session, stmt, request: Optional[Request] = None, version=None,
+                  model: Optional[Type[BaseModel]] = None) -> Response:
+    """Column-projection path for list endpoints.
+
+    Rows come straight from the database as plain dicts. With ``model`` they are
+    validated against it and serialized in one pydantic-core pass, exactly as
+    ``response_model`` would; without, they are trusted and orjson serializes
+    them as stored (datetimes and enums natively). Endpoints only skip
+    validation when the client opts in, see ``row_model``.
+
+    With a ``version`` column (e.g. the row's ``updated_at``) the response gets a
+    weak ETag, and a matching If-None-Match is answered with 304 before anything
+    is serialized.
+    """
+    if version is None:
+        return _render_rows(fetch_rows(db, stmt), model)
+
+    rows = fetch_rows(db, stmt.add_columns(version.label("_version")))
+    versions = [(row["id"], row.pop("_version")) for row in rows]
+    etag = weak_etag(versions, ",".join(rows[0]) if rows else "")
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return _render_rows(rows, model, headers)
+
+def _render_rows(rows: List[dict], model: Optional[Type[BaseModel]], headers: Optional[dict] = None) -> Response:
+    if model is None:
+        return ORJSONResponse(content=rows, headers=headers)
+    adapter = _list_adapter(model)
+    return Response(
+        content=adapter.dump_json(adapter.validate_python(rows)),
+        media_type="application/json",
+        headers=headers
+    )
+
+def row_model(schema: Type[BaseModel], fields: Optional[Tuple[str, ...]] = None, fast: bool = False) -> Optional[Type[BaseModel]]:
+    """The model ``rows_response`` validates against: ``schema`` (or its sparse
+    copy for ``fields``), or None when the client asked for the unvalidated
+    fast path with ``fast=true``.
+    """
+    if fast:
+        return None
+    return sparse_model(schema, fields) if fields else schema
+
+def parse_fields(fields: Optional[str], model, schema: Type[BaseModel]) -> Optional[Tuple[str, ...]]:
+    """Parse a ``fields=a,b,c`` sparse fieldset into schema field names.
+
+    Only fields that map to a column of ``model`` can be requested, so the
+    projection never needs a join or a lazy load. ``id`` is always included
+    and comes first; the rest are sorted, so every spelling of a fieldset
+    maps to one cached model. Returns None when no fieldset was requested.
+    """
+    if not fields:
+        return None
+
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [
+        name for name in requested
+        if name not in schema.model_fields or name not in model.__table__.c
+    ]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+
+    return ("id",) + tuple(sorted(set(requested) - {"id"}))
+
+@lru_cache(maxsize=256)
+def sparse_model(schema: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Slimmed copy of ``schema`` restricted to ``fields`` (cached per fieldset)."""
+    return create_model(
+        f"{schema.__name__}Sparse",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in fields}
+    )
+
+@lru_cache(maxsize=256)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+def model_rows_response(rows: List[dict], model: Type[BaseModel]) -> Response:
+    """Validate rows against ``model`` and serialize them in one pydantic-core pass."""
+    return _render_rows(rows, model)
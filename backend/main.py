@@ -1,11 +1,30 @@
+import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException
 
 from app.core.config import settings
-from app.api.v1.endpoints import users, auth
+from app.api.v1.endpoints import users, auth, locations, routes, sync, billing, fills, movements
+from middleware import CompressionMiddleware, ConditionalGetMiddleware
+from metrics import MetricsMiddleware, instrument_engine, registry
+import query_inspector
+from database import engine, replica_set
+from analytics_store import snapshot
+from jobs.lost_cylinders import run_scan
+from jobs.prune_tombstones import run_prune
+from jobs.reconcile_inventory import run_reconciliation
+from jobs.refresh_location_index import run_refresh
+from jobs.scheduler import PeriodicJob
+from app.core.database import engine as app_engine
+import routers.alerts
+import routers.analytics
+import routers.customers
+import routers.cylinders
+import routers.maintenance
+import routers.movements
+import routers.search
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -22,6 +41,66 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Conditional GET runs inside compression so 304s are never compressed
+app.add_middleware(ConditionalGetMiddleware)
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+# Outermost, so latency includes every other middleware
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+instrument_engine(app_engine)
+
+# Slow-query log and N+1 detection (QUERY_INSPECTOR=warn|strict, dev and staging only)
+if query_inspector.MODE != "off":
+    app.add_middleware(query_inspector.QueryInspectorMiddleware)
+    query_inspector.instrument_engine(engine)
+    query_inspector.instrument_engine(app_engine)
+
+# Replica lag probes every REPLICA_CHECK_INTERVAL seconds, off the request path
+if replica_set.engines:
+    replica_check_job = PeriodicJob("replica-check", replica_set.check, replica_set.check_interval)
+    app.add_event_handler("startup", replica_check_job.start)
+    app.add_event_handler("shutdown", replica_check_job.stop)
+
+# Columnar analytics: refresh the Parquet snapshot every ANALYTICS_SNAPSHOT_INTERVAL seconds
+ANALYTICS_SNAPSHOT_INTERVAL = float(os.getenv("ANALYTICS_SNAPSHOT_INTERVAL", "0"))
+if ANALYTICS_SNAPSHOT_INTERVAL > 0:
+    # Engine picked per run, so each snapshot goes to whichever replica is healthy then
+    snapshot_job = PeriodicJob("analytics-snapshot", lambda: snapshot(replica_set.choose() or engine), ANALYTICS_SNAPSHOT_INTERVAL)
+    app.add_event_handler("startup", snapshot_job.start)
+    app.add_event_handler("shutdown", snapshot_job.stop)
+
+# Lost-cylinder detection every LOST_CYLINDER_SCAN_INTERVAL seconds (see jobs/lost_cylinders.py)
+LOST_CYLINDER_SCAN_INTERVAL = float(os.getenv("LOST_CYLINDER_SCAN_INTERVAL", "0"))
+if LOST_CYLINDER_SCAN_INTERVAL > 0:
+    lost_cylinder_job = PeriodicJob("lost-cylinder-scan", run_scan, LOST_CYLINDER_SCAN_INTERVAL)
+    app.add_event_handler("startup", lost_cylinder_job.start)
+    app.add_event_handler("shutdown", lost_cylinder_job.stop)
+
+# Inventory counter reconciliation every INVENTORY_RECONCILE_INTERVAL seconds (86400 for nightly)
+INVENTORY_RECONCILE_INTERVAL = float(os.getenv("INVENTORY_RECONCILE_INTERVAL", "0"))
+if INVENTORY_RECONCILE_INTERVAL > 0:
+    inventory_job = PeriodicJob("inventory-reconcile", run_reconciliation, INVENTORY_RECONCILE_INTERVAL)
+    app.add_event_handler("startup", inventory_job.start)
+    app.add_event_handler("shutdown", inventory_job.stop)
+
+# Sync tombstone pruning every SYNC_TOMBSTONE_PRUNE_INTERVAL seconds (86400 for daily)
+SYNC_TOMBSTONE_PRUNE_INTERVAL = float(os.getenv("SYNC_TOMBSTONE_PRUNE_INTERVAL", "0"))
+if SYNC_TOMBSTONE_PRUNE_INTERVAL > 0:
+    tombstone_job = PeriodicJob("tombstone-prune", run_prune, SYNC_TOMBSTONE_PRUNE_INTERVAL)
+    app.add_event_handler("startup", tombstone_job.start)
+    app.add_event_handler("shutdown", tombstone_job.stop)
+
+# Location index rebuild every LOCATION_INDEX_REFRESH_INTERVAL seconds, so each worker
+# sees the others' location changes; on by default when uvicorn runs several workers
+LOCATION_INDEX_REFRESH_INTERVAL = float(os.getenv(
+    "LOCATION_INDEX_REFRESH_INTERVAL", "60" if int(os.getenv("WEB_CONCURRENCY", "1")) > 1 else "0"
+))
+if LOCATION_INDEX_REFRESH_INTERVAL > 0:
+    location_index_job = PeriodicJob("location-index-refresh", run_refresh, LOCATION_INDEX_REFRESH_INTERVAL)
+    app.add_event_handler("startup", location_index_job.start)
+    app.add_event_handler("shutdown", location_index_job.stop)
+
 # Exception handlers
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request, exc):
@@ -40,6 +119,25 @@ async def http_exception_handler(request, exc):
 # Include routers
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
+app.include_router(locations.router, prefix="/api/v1", tags=["locations"])
+app.include_router(routes.router, prefix="/api/v1", tags=["routes"])
+app.include_router(sync.router, prefix="/api/v1", tags=["sync"])
+app.include_router(billing.router, prefix="/api/v1", tags=["billing"])
+app.include_router(fills.router, prefix="/api/v1", tags=["fills"])
+app.include_router(movements.router, prefix="/api/v1", tags=["movements"])
+
+# Original API
+app.include_router(routers.customers.router, prefix="/api/customers", tags=["customers"])
+app.include_router(routers.cylinders.router, prefix="/api/cylinders", tags=["cylinders"])
+app.include_router(routers.movements.router, prefix="/api/movements", tags=["movements"])
+app.include_router(routers.maintenance.router, prefix="/api/maintenance", tags=["maintenance"])
+app.include_router(routers.analytics.router, prefix="/api/analytics", tags=["analytics"])
+app.include_router(routers.alerts.router, prefix="/api/alerts", tags=["alerts"])
+app.include_router(routers.search.router, prefix="/api/search", tags=["search"])
+
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,220 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# In-process Prometheus metrics: per-route latency histograms, in-flight gauge
+# and SQL statement counts/time per request. Each worker exposes its own numbers
+# at /metrics; Prometheus sums them across workers.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+class Histogram:
+    """Cumulative-bucket histogram with Prometheus semantics (``le`` upper bounds)."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class RequestStats:
+    """SQL statements run on behalf of the current request."""
+
+    __slots__ = ("queries", "query_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+
+# Set per request; worker threads running sync endpoints inherit a copy of the
+# context that points at the same RequestStats object
+_request_stats = ContextVar("request_stats", default=None)
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency: Dict[Tuple[str, str, str], Histogram] = {}
+        self.queries: Dict[Tuple[str, str], Histogram] = {}
+        self.query_seconds: Dict[Tuple[str, str], float] = {}
+        self.in_flight: Dict[str, int] = {}
+        self.background_queries = 0
+        self.background_query_seconds = 0.0
+
+    def request_started(self, method: str):
+        with self._lock:
+            self.in_flight[method] = self.in_flight.get(method, 0) + 1
+
+    def request_finished(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        with self._lock:
+            self.in_flight[method] -= 1
+            key = (method, route, str(status))
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(seconds)
+
+            route_key = (method, route)
+            histogram = self.queries.get(route_key)
+            if histogram is None:
+                histogram = self.queries[route_key] = Histogram(QUERY_COUNT_BUCKETS)
+            histogram.observe(stats.queries)
+            self.query_seconds[route_key] = self.query_seconds.get(route_key, 0.0) + stats.query_seconds
+
+    def query_outside_request(self, seconds: float):
+        with self._lock:
+            self.background_queries += 1
+            self.background_query_seconds += seconds
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        with self._lock:
+            lines += [
+                "# HELP http_request_duration_seconds Request latency by route.",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for (method, route, status), histogram in sorted(self.latency.items()):
+                _histogram_lines(lines, "http_request_duration_seconds", histogram,
+                                 {"method": method, "route": route, "status": status})
+
+            lines += [
+                "# HELP http_requests_in_progress Requests currently being handled.",
+                "# TYPE http_requests_in_progress gauge",
+            ]
+            for method, value in sorted(self.in_flight.items()):
+                lines.append(f"http_requests_in_progress{_labels({'method': method})} {value}")
+
+            lines += [
+                "# HELP db_queries_per_request SQL statements executed per request.",
+                "# TYPE db_queries_per_request histogram",
+            ]
+            for (method, route), histogram in sorted(self.queries.items()):
+                _histogram_lines(lines, "db_queries_per_request", histogram, {"method": method, "route": route})
+
+            lines += [
+                "# HELP db_query_duration_seconds_total Time spent in SQL statements by route.",
+                "# TYPE db_query_duration_seconds_total counter",
+            ]
+            for (method, route), seconds in sorted(self.query_seconds.items()):
+                lines.append(
+                    f"db_query_duration_seconds_total{_labels({'method': method, 'route': route})} {seconds!r}"
+                )
+
+            lines += [
+                "# HELP db_background_queries_total SQL statements executed outside a request.",
+                "# TYPE db_background_queries_total counter",
+                f"db_background_queries_total {self.background_queries}",
+                "# HELP db_background_query_duration_seconds_total Time spent in SQL statements outside a request.",
+                "# TYPE db_background_query_duration_seconds_total counter",
+                f"db_background_query_duration_seconds_total {self.background_query_seconds!r}",
+            ]
+        return "\n".join(lines) + "\n"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(labels: Dict[str, str]) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+def _histogram_lines(lines: List[str], name: str, histogram: Histogram, labels: Dict[str, str]):
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        lines.append(f"{name}_bucket{_labels({**labels, 'le': repr(float(bound))})} {cumulative}")
+    lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {histogram.count}")
+    lines.append(f"{name}_sum{_labels(labels)} {histogram.sum!r}")
+    lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+registry = MetricsRegistry()
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+class MetricsMiddleware:
+    """Time every HTTP request and attribute SQL statements to its route.
+
+    Routes are labelled with their path template (``/api/cylinders/{cylinder_id}``),
+    never the raw path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry = registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+        self.registry.request_started(method)
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            self.registry.request_finished(
+                method,
+                getattr(route, "path", None) or UNMATCHED_ROUTE,
+                status_code,
+                time.perf_counter() - started,
+                stats
+            )
+            _request_stats.reset(token)
+
+def _stamp_start(conn, cursor, statement, parameters, context, executemany):
+    # On the execution context rather than conn.info: a statement that raises never
+    # reaches after_cursor_execute, and its context goes away with it
+    if context is not None:
+        context._statement_started = time.perf_counter()
+
+def time_statements(engine):
+    """Record when each of ``engine``'s statements starts, for ``statement_seconds`` (idempotent)."""
+    if not event.contains(engine, "before_cursor_execute", _stamp_start):
+        event.listen(engine, "before_cursor_execute", _stamp_start)
+
+def statement_seconds(context) -> Optional[float]:
+    """Time since the statement of ``context`` started, from an ``after_cursor_execute`` listener."""
+    started = getattr(context, "_statement_started", None)
+    return None if started is None else time.perf_counter() - started
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = statement_seconds(context)
+    if seconds is None:
+        return
+    stats = _request_stats.get()
+    if stats is None:
+        registry.query_outside_request(seconds)
+    else:
+        stats.queries += 1
+        stats.query_seconds += seconds
+
+def instrument_engine(engine):
+    """Count and time every statement ``engine`` runs (idempotent)."""
+    time_statements(engine)
+    if not event.contains(engine, "after_cursor_execute", _after_cursor_execute):
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -1,61 +1,290 @@
+"""Stream the SQLite database into PostgreSQL.
+
+Tables are copied in foreign-key order: tables on the same dependency level
+run in parallel, each read in primary-key order in chunks (``yield_per``) and
+written with COPY (executemany batches when the target is not Postgres).
+Every chunk commits on its own, so an interrupted run picks each table up after
+the highest id already in the target; the checkpoint file records progress and
+finished tables. At the end row counts and content checksums of both sides are
+compared.
+
+Both model trees are copied: the legacy tables (``models``) and the tables only
+the v1 API maps (``app.models``: fills, leases, billing, inventory counters,
+sync tombstones, ...). A table both trees map uses the legacy definition, so
+columns only the v1 models declare on it are not copied. Tables the SQLite
+file does not have are skipped.
+
+Usage: DATABASE_URL=postgresql://... python migrate_to_postgres.py [--workers 4] [--chunk-size 10000]
+"""
+import argparse
+import hashlib
+import io
+import json
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
 from dotenv import load_dotenv
-from models import Base  # Import your models
-import json
-from datetime import datetime
+from sqlalchemy import Enum, Integer, String, create_engine, delete, func, inspect, select, type_coerce
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import sort_tables
+
+from database import Base
+# Register every table on Base.metadata, and the search indexes' DDL with them
+from models import customer, cylinder, maintenance, movement, user  # noqa: F401
+import search_index  # noqa: F401
+# ...and the v1 tables on the app's Base
+from app.core.database import Base as AppBase
+from app.models import (  # noqa: F401
+    audit as app_audit, billing as app_billing, customer as app_customer, cylinder as app_cylinder,
+    fill as app_fill, inventory as app_inventory, lease as app_lease, location as app_location,
+    maintenance as app_maintenance, movement as app_movement, sync as app_sync, user as app_user,
+)
+
+_checkpoint_lock = threading.Lock()
+
+def dependency_levels(tables) -> List[list]:
+    """Group tables so every table comes after the tables it references."""
+    level: Dict[str, int] = {}
+    for table in tables:  # sorted_tables order: parents first
+        parents = {fk.column.table.name for fk in table.foreign_keys} - {table.name}
+        level[table.name] = 1 + max((level[name] for name in parents if name in level), default=-1)
+    levels: List[list] = [[] for _ in range(max(level.values(), default=-1) + 1)]
+    for table in tables:
+        levels[level[table.name]].append(table)
+    return levels
+
+# order_items references a products table no model defines, so no database built
+# from the models has orders
+UNMIGRATED_V1_TABLES = {"orders", "order_items"}
+
+def v1_only_tables() -> list:
+    """The app.models tables the legacy models do not map, parents first."""
+    return sort_tables([
+        table for name, table in AppBase.metadata.tables.items()
+        if name not in Base.metadata.tables and name not in UNMIGRATED_V1_TABLES
+    ])
+
+def migration_tables(source: Engine) -> list:
+    """Legacy tables, then the v1-only ones, limited to those the source database has."""
+    existing = set(inspect(source).get_table_names())
+    return [table for table in Base.metadata.sorted_tables + v1_only_tables() if table.name in existing]
+
+def integer_key(table):
+    key = list(table.primary_key.columns)
+    if len(key) == 1 and isinstance(key[0].type, Integer):
+        return key[0]
+    return None
+
+def load_checkpoint(path: str) -> dict:
+    if path and os.path.exists(path):
+        with open(path) as checkpoint_file:
+            return json.load(checkpoint_file)
+    return {}
+
+def _save_checkpoint(path: str, checkpoint: dict, table: str, **progress):
+    if not path:
+        return
+    with _checkpoint_lock:
+        checkpoint.setdefault(table, {}).update(progress)
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file, indent=2)
+        os.replace(temporary, path)
+
+# COPY text format
+
+def _copy_value(value) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (datetime, date)):
+        text = value.isoformat(sep=" ") if isinstance(value, datetime) else value.isoformat()
+    else:
+        text = str(value)
+    return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+def _copy_rows(connection, table, rows):
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_value(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    columns = ", ".join(f'"{column.name}"' for column in table.columns)
+    cursor = connection.connection.driver_connection.cursor()
+    try:
+        cursor.copy_expert(f'COPY "{table.name}" ({columns}) FROM STDIN', buffer)
+    finally:
+        cursor.close()
 
-def migrate_data():
+def _insert_rows(connection, table, rows):
+    names = [column.name for column in table.columns]
+    connection.execute(table.insert(), [dict(zip(names, row)) for row in rows])
+
+def stored_columns(table):
+    # Enum columns are read as stored (member names), so values outside the enum still migrate
+    return [
+        type_coerce(column, String).label(column.name) if isinstance(column.type, Enum) else column
+        for column in table.columns
+    ]
+
+def migrate_table(table, source: Engine, target: Engine, chunk_size: int = 10000,
+                  checkpoint: Optional[dict] = None, checkpoint_file: Optional[str] = None) -> int:
+    """Copy one table in committed chunks; returns the number of rows copied by this call."""
+    checkpoint = checkpoint if checkpoint is not None else {}
+    if checkpoint.get(table.name, {}).get("done"):
+        return 0
+    key = integer_key(table)
+    copy = target.dialect.name == "postgresql"
+    write = _copy_rows if copy else _insert_rows
+    copied = 0
+
+    stmt = select(*stored_columns(table))
+    with target.connect() as connection:
+        if key is None:
+            # No integer key to resume from: start the table over
+            connection.execute(delete(table))
+        else:
+            # Committed chunks are the source of truth, not the checkpoint file
+            last_id = connection.execute(select(func.max(key))).scalar()
+            if last_id is not None:
+                stmt = stmt.where(table.c[key.name] > last_id)
+            stmt = stmt.order_by(table.c[key.name])
+        if copy:
+            # Naive SQLite datetimes are UTC
+            connection.exec_driver_sql("SET TIME ZONE 'UTC'")
+        connection.commit()
+
+        with source.connect() as reader:
+            result = reader.execution_options(yield_per=chunk_size).execute(stmt)
+            key_index = list(table.columns).index(key) if key is not None else None
+            for rows in result.partitions():
+                # Explicit transaction: COPY goes through the raw DBAPI cursor
+                with connection.begin():
+                    write(connection, table, rows)
+                copied += len(rows)
+                progress = {"rows": checkpoint.get(table.name, {}).get("rows", 0) + len(rows)}
+                if key_index is not None:
+                    progress["last_id"] = rows[-1][key_index]
+                _save_checkpoint(checkpoint_file, checkpoint, table.name, **progress)
+    _save_checkpoint(checkpoint_file, checkpoint, table.name, done=True)
+    return copied
+
+def reset_sequences(target: Engine, tables):
+    """Move Postgres id sequences past the copied ids."""
+    if target.dialect.name != "postgresql":
+        return
+    with target.begin() as connection:
+        for table in tables:
+            key = integer_key(table)
+            if key is None or not key.autoincrement:
+                continue
+            connection.exec_driver_sql(
+                f"SELECT setval(pg_get_serial_sequence('\"{table.name}\"', '{key.name}'), "
+                f"COALESCE((SELECT MAX(\"{key.name}\") FROM \"{table.name}\"), 0) + 1, false)"
+            )
+
+# Verification
+
+def normalize_value(value):
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def table_checksum(engine: Engine, table, chunk_size: int = 10000) -> Tuple[int, str]:
+    """Row count and a digest of the table's content in key order, comparable across databases."""
+    stmt = select(*stored_columns(table)).order_by(*table.primary_key.columns)
+    digest = hashlib.blake2b(digest_size=16)
+    count = 0
+    with engine.connect() as connection:
+        result = connection.execution_options(yield_per=chunk_size).execute(stmt)
+        for rows in result.partitions():
+            for row in rows:
+                digest.update(repr(tuple(normalize_value(value) for value in row)).encode())
+            count += len(rows)
+    return count, digest.hexdigest()
+
+def verify(tables, source: Engine, target: Engine, workers: int = 4, chunk_size: int = 10000) -> List[dict]:
+    """Compare counts and checksums per table; returns the tables that differ."""
+    def compare(table):
+        source_count, source_digest = table_checksum(source, table, chunk_size)
+        target_count, target_digest = table_checksum(target, table, chunk_size)
+        return {
+            "table": table.name,
+            "source_rows": source_count,
+            "target_rows": target_count,
+            "checksum_match": source_digest == target_digest,
+        }
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(compare, tables))
+    return [
+        result for result in results
+        if result["source_rows"] != result["target_rows"] or not result["checksum_match"]
+    ]
+
+def migrate_data(sqlite_url: str = "sqlite:///./gas_tracker.db", postgres_url: Optional[str] = None,
+                 chunk_size: int = 10000, workers: int = 4,
+                 checkpoint_file: Optional[str] = "migration_checkpoint.json", verify_data: bool = True) -> List[dict]:
+    """Migrate every table; returns the verification mismatches (empty on success)."""
     # Load environment variables
     load_dotenv()
-    
-    # Source SQLite database
-    sqlite_url = "sqlite:///./gas_tracker.db"
-    sqlite_engine = create_engine(sqlite_url)
-    SQLiteSession = sessionmaker(bind=sqlite_engine)
-    
-    # Destination PostgreSQL database
-    postgres_url = os.getenv("DATABASE_URL")
+
+    postgres_url = postgres_url or os.getenv("DATABASE_URL")
     if not postgres_url:
         raise ValueError("DATABASE_URL environment variable is required")
-    
-    postgres_engine = create_engine(postgres_url)
-    PostgresSession = sessionmaker(bind=postgres_engine)
-    
-    # Create tables in PostgreSQL
-    Base.metadata.create_all(postgres_engine)
-    
-    # Get all tables
-    tables = Base.metadata.tables.keys()
-    
-    # Migrate data
-    with SQLiteSession() as sqlite_session, PostgresSession() as postgres_session:
-        for table_name in tables:
-            print(f"Migrating {table_name}...")
-            
-            # Get all records from SQLite
-            table = Base.metadata.tables[table_name]
-            records = sqlite_session.query(table).all()
-            
-            # Insert into PostgreSQL
-            for record in records:
-                # Convert record to dictionary
-                record_dict = {c.name: getattr(record, c.name) for c in record.__table__.columns}
-                
-                # Handle datetime objects
-                for key, value in record_dict.items():
-                    if isinstance(value, datetime):
-                        record_dict[key] = value.isoformat()
-                
-                # Create new record in PostgreSQL
-                postgres_session.execute(
-                    table.insert().values(**record_dict)
-                )
-            
-            postgres_session.commit()
-            print(f"Migrated {len(records)} records from {table_name}")
+
+    source = create_engine(sqlite_url, connect_args={"check_same_thread": False})
+    target = create_engine(postgres_url, pool_size=workers)
+
+    # Create tables in PostgreSQL; the v1-only ones reference the legacy tables
+    Base.metadata.create_all(target)
+    AppBase.metadata.create_all(target, tables=v1_only_tables())
+
+    tables = migration_tables(source)
+    checkpoint = load_checkpoint(checkpoint_file)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for level in dependency_levels(tables):
+            started = time.perf_counter()
+            futures = {
+                table.name: executor.submit(migrate_table, table, source, target, chunk_size, checkpoint, checkpoint_file)
+                for table in level
+            }
+            for name, future in futures.items():
+                print(f"Migrated {future.result()} records from {name}")
+            print(f"  level done in {time.perf_counter() - started:.1f}s")
+    reset_sequences(target, tables)
+
+    mismatches = []
+    if verify_data:
+        print("Verifying row counts and checksums...")
+        mismatches = verify(tables, source, target, workers, chunk_size)
+        for mismatch in mismatches:
+            print(
+                f"MISMATCH {mismatch['table']}: {mismatch['source_rows']} source rows, "
+                f"{mismatch['target_rows']} target rows, checksum match: {mismatch['checksum_match']}"
+            )
+    source.dispose()
+    target.dispose()
+    return mismatches
 
 if __name__ == "__main__":
-    migrate_data()
-    print("Migration completed successfully!") 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Migrate the SQLite database to PostgreSQL")
+    parser.add_argument("--sqlite-url", default="sqlite:///./gas_tracker.db", help="Source SQLite database")
+    parser.add_argument("--postgres-url", help="Target database (defaults to DATABASE_URL)")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Rows per chunk and commit")
+    parser.add_argument("--workers", type=int, default=4, help="Tables migrated in parallel")
+    parser.add_argument("--checkpoint", default="migration_checkpoint.json", help="Checkpoint file")
+    parser.add_argument("--skip-verify", action="store_true", help="Skip count and checksum verification")
+    args = parser.parse_args()
+
+    mismatches = migrate_data(
+        args.sqlite_url, args.postgres_url, args.chunk_size, args.workers, args.checkpoint, not args.skip_verify
+    )
+    if mismatches:
+        raise SystemExit("Migration finished with mismatches")
+    print("Migration completed successfully!")
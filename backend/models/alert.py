@@ -0,0 +1,60 @@
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from database import Base
+from models.cylinder import CylinderType
+import enum
+
+class AlertStatus(str, enum.Enum):
+    OPEN = "open"
+    ACKNOWLEDGED = "acknowledged"
+    RESOLVED = "resolved"
+
+class DwellThreshold(Base):
+    """Days a cylinder may stay at a customer site before it counts as lost.
+
+    Either field may be empty: the most specific match wins (customer and gas
+    type, then customer, then gas type, then the job's default).
+    """
+    __tablename__ = "dwell_thresholds"
+
+    id = Column(Integer, primary_key=True, index=True)
+    customer_id = Column(Integer, ForeignKey("customers.id"))
+    gas_type = Column(Enum(CylinderType))
+    max_days = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("customer_id", "gas_type", name="uq_dwell_thresholds_customer_gas_type"),
+    )
+
+    def __repr__(self):
+        return f"<DwellThreshold {self.customer_id}/{self.gas_type}: {self.max_days}d>"
+
+class CylinderAlert(Base):
+    __tablename__ = "cylinder_alerts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cylinder_id = Column(Integer, ForeignKey("cylinders.id"), nullable=False, index=True)
+    alert_type = Column(String, nullable=False, default="lost")
+    status = Column(Enum(AlertStatus), nullable=False, default=AlertStatus.OPEN)
+    customer_id = Column(Integer, ForeignKey("customers.id"), index=True)
+    location_id = Column(Integer, ForeignKey("locations.id"))
+    last_moved_at = Column(DateTime(timezone=True), index=True)
+    threshold_days = Column(Integer, nullable=False)
+    detected_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    acknowledged_by = Column(Integer, ForeignKey("users.id"))
+    resolved_at = Column(DateTime(timezone=True))
+
+    # Relationships
+    cylinder = relationship("Cylinder")
+
+    # The job only ever loads a type's unresolved alerts; the alert list is
+    # usually one status, longest-lost first
+    __table_args__ = (
+        Index("ix_cylinder_alerts_type_status_cylinder_id", "alert_type", "status", "cylinder_id"),
+        Index("ix_cylinder_alerts_status_last_moved_at", "status", "last_moved_at"),
+    )
+
+    def __repr__(self):
+        return f"<CylinderAlert {self.alert_type} cylinder {self.cylinder_id}>"
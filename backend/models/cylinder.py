@@ -26,19 +26,22 @@ class Cylinder(Base):
     serial_number = Column(String, unique=True, index=True)
     barcode = Column(String, unique=True, index=True)
     qr_code = Column(String, unique=True, index=True)
-    type = Column(Enum(CylinderType))
+    type = Column(Enum(CylinderType), index=True)
     capacity = Column(Float)  # in liters
     pressure_rating = Column(Float)  # in PSI
     tare_weight = Column(Float)  # in kg
-    status = Column(Enum(CylinderStatus), default=CylinderStatus.AVAILABLE)
+    status = Column(Enum(CylinderStatus), default=CylinderStatus.AVAILABLE, index=True)
     last_inspection = Column(DateTime(timezone=True))
-    next_inspection = Column(DateTime(timezone=True))
+    next_inspection = Column(DateTime(timezone=True), index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
-    current_location_id = Column(Integer, ForeignKey("locations.id"))
-    current_customer_id = Column(Integer, ForeignKey("customers.id"))
+    current_location_id = Column(Integer, ForeignKey("locations.id"), index=True)
+    current_customer_id = Column(Integer, ForeignKey("customers.id"), index=True)
+    
+    location = relationship("Location", back_populates="cylinders")
+    customer = relationship("Customer", back_populates="cylinders")
     
     # Track history
     movements = relationship("CylinderMovement", back_populates="cylinder")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Float, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Float, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database import Base
@@ -22,10 +22,10 @@ class MaintenanceRecord(Base):
     __tablename__ = "maintenance_records"
 
     id = Column(Integer, primary_key=True, index=True)
-    cylinder_id = Column(Integer, ForeignKey("cylinders.id"))
-    maintenance_type = Column(Enum(MaintenanceType))
+    cylinder_id = Column(Integer, ForeignKey("cylinders.id"), index=True)
+    maintenance_type = Column(Enum(MaintenanceType), index=True)
     status = Column(Enum(MaintenanceStatus), default=MaintenanceStatus.SCHEDULED)
-    scheduled_date = Column(DateTime(timezone=True))
+    scheduled_date = Column(DateTime(timezone=True), index=True)
     completed_date = Column(DateTime(timezone=True))
     performed_by = Column(Integer, ForeignKey("users.id"))
     notes = Column(String)
@@ -40,6 +40,11 @@ class MaintenanceRecord(Base):
     cylinder = relationship("Cylinder", back_populates="maintenance_records")
     technician = relationship("User")
     
+    # Status filters are almost always combined with a scheduled_date range
+    __table_args__ = (
+        Index("ix_maintenance_records_status_scheduled_date", "status", "scheduled_date"),
+    )
+    
     def __repr__(self):
         return f"<MaintenanceRecord {self.id}>"
 
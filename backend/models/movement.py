@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Float, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database import Base
@@ -39,6 +39,11 @@ class CylinderMovement(Base):
     to_location = relationship("Location", foreign_keys=[to_location_id])
     user = relationship("User")
     
+    # A cylinder's history in time order, and its last movement as one index probe
+    __table_args__ = (
+        Index("ix_cylinder_movements_cylinder_id_timestamp", "cylinder_id", "timestamp"),
+    )
+    
     def __repr__(self):
         return f"<CylinderMovement {self.id}>"
 
@@ -46,11 +51,11 @@ class Transaction(Base):
     __tablename__ = "transactions"
 
     id = Column(Integer, primary_key=True, index=True)
-    customer_id = Column(Integer, ForeignKey("customers.id"))
-    transaction_type = Column(Enum(MovementType))
-    status = Column(Enum(TransactionStatus), default=TransactionStatus.PENDING)
+    customer_id = Column(Integer, ForeignKey("customers.id"), index=True)
+    transaction_type = Column(Enum(MovementType), index=True)
+    status = Column(Enum(TransactionStatus), default=TransactionStatus.PENDING, index=True)
     total_amount = Column(Float)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     completed_at = Column(DateTime(timezone=True))
     notes = Column(String)
     
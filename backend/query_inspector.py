@@ -0,0 +1,175 @@
+import json
+import logging
+import os
+import re
+import threading
+import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+from starlette.types import ASGIApp, Receive, Scope, Send
+from typing import Dict, List, Optional
+
+from metrics import statement_seconds, time_statements
+
+# Development/staging aid: slow-query log and N+1 detection.
+#
+# QUERY_INSPECTOR=off|warn|strict  warn logs, strict raises NPlusOneError
+# QUERY_INSPECTOR_REPEAT=5         same statement shape this many times in one request is an N+1
+# SLOW_QUERY_MS=100                statements slower than this are logged
+# QUERY_REPORT_FILE=path.jsonl     append one JSON report per request
+
+MODE = os.getenv("QUERY_INSPECTOR", "off").lower()
+REPEAT_THRESHOLD = int(os.getenv("QUERY_INSPECTOR_REPEAT", "5"))
+SLOW_QUERY_SECONDS = float(os.getenv("SLOW_QUERY_MS", "100")) / 1000
+REPORT_FILE = os.getenv("QUERY_REPORT_FILE")
+
+logger = logging.getLogger("query_inspector")
+
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"%\(\w+\)s|(?<!:):\w+|\$\d+|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+def normalize_statement(statement: str) -> str:
+    """Statement shape: literals and bind parameters become ``?``, IN lists collapse."""
+    shape = _STRING.sub("?", statement)
+    shape = _NUMBER.sub("?", shape)
+    shape = _PARAM.sub("?", shape)
+    shape = _IN_LIST.sub("(?...)", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+def _caller() -> Optional[str]:
+    """First application frame (outside site-packages) that led to the statement."""
+    for frame in reversed(traceback.extract_stack()[:-3]):
+        filename = os.path.abspath(frame.filename)
+        if (
+            filename.startswith(_BACKEND_DIR)
+            and "site-packages" not in filename
+            and filename != os.path.abspath(__file__)
+        ):
+            return f"{os.path.relpath(filename, _BACKEND_DIR)}:{frame.lineno} in {frame.name}"
+    return None
+
+class NPlusOneError(AssertionError):
+    pass
+
+class QueryCollector:
+    """Statements executed within one request (or ``inspect_queries`` block), grouped by shape."""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.shapes: Dict[str, dict] = {}
+        self.slow: List[dict] = []
+        self.total = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, seconds: float):
+        shape = normalize_statement(statement)
+        with self._lock:
+            self.total += 1
+            self.seconds += seconds
+            entry = self.shapes.get(shape)
+            if entry is None:
+                entry = self.shapes[shape] = {"count": 0, "seconds": 0.0, "caller": _caller()}
+            entry["count"] += 1
+            entry["seconds"] += seconds
+        if seconds >= SLOW_QUERY_SECONDS:
+            self.slow.append({"statement": shape, "ms": round(seconds * 1000, 2)})
+            logger.warning("Slow query (%.1f ms) in %s: %s", seconds * 1000, self.label, shape)
+
+    def repeated(self, threshold: Optional[int] = None) -> List[dict]:
+        """Shapes executed at least ``threshold`` times, most frequent first."""
+        threshold = REPEAT_THRESHOLD if threshold is None else threshold
+        return sorted(
+            (
+                {"statement": shape, **entry}
+                for shape, entry in self.shapes.items() if entry["count"] >= threshold
+            ),
+            key=lambda entry: -entry["count"]
+        )
+
+    def report(self) -> dict:
+        return {
+            "label": self.label,
+            "queries": self.total,
+            "query_ms": round(self.seconds * 1000, 2),
+            "distinct_statements": len(self.shapes),
+            "repeated": self.repeated(),
+            "slow": self.slow,
+        }
+
+_collector: ContextVar = ContextVar("query_collector", default=None)
+
+def _write_report(report: dict):
+    if REPORT_FILE:
+        with open(REPORT_FILE, "a") as report_file:
+            report_file.write(json.dumps(report) + "\n")
+
+def check(collector: QueryCollector, mode: Optional[str] = None):
+    """Warn about (or, in strict mode, fail on) repeated statement shapes."""
+    mode = mode or MODE
+    repeated = collector.repeated()
+    if not repeated:
+        return
+    message = "; ".join(
+        f"{entry['count']}x {entry['statement'][:200]} (from {entry['caller']})" for entry in repeated
+    )
+    if mode == "strict":
+        raise NPlusOneError(f"Possible N+1 in {collector.label}: {message}")
+    logger.warning("Possible N+1 in %s: %s", collector.label, message)
+
+@contextmanager
+def inspect_queries(label: str = "block", mode: Optional[str] = None):
+    """Collect and check the statements run inside the block (jobs, tests)."""
+    collector = QueryCollector(label)
+    token = _collector.set(collector)
+    try:
+        yield collector
+    finally:
+        _collector.reset(token)
+    _write_report(collector.report())
+    check(collector, mode)
+
+class QueryInspectorMiddleware:
+    """One QueryCollector per HTTP request; reports and checks it when the response is done."""
+
+    def __init__(self, app: ASGIApp, mode: Optional[str] = None):
+        self.app = app
+        self.mode = mode or MODE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        collector = QueryCollector(f"{scope['method']} {scope['path']}")
+        token = _collector.set(collector)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _collector.reset(token)
+        route = scope.get("route")
+        if route is not None:
+            collector.label = f"{scope['method']} {route.path}"
+        _write_report(collector.report())
+        check(collector, self.mode)
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = statement_seconds(context)
+    if seconds is None:
+        return
+    collector = _collector.get()
+    if collector is not None:
+        collector.record(statement, seconds)
+    elif seconds >= SLOW_QUERY_SECONDS:
+        logger.warning("Slow query (%.1f ms): %s", seconds * 1000, normalize_statement(statement))
+
+def instrument_engine(engine):
+    """Feed every statement ``engine`` runs to the active collector (idempotent)."""
+    time_statements(engine)
+    if not event.contains(engine, "after_cursor_execute", _after_cursor_execute):
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,116 @@
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+# Read replica routing.
+#
+# Read-only endpoints take their session from get_read_db, which picks a
+# healthy replica round-robin. A replica is healthy when its replication lag,
+# probed by check() every check_interval seconds from a background job in
+# main.py, is within max_lag_seconds; requests never wait on a probe.
+# After a client commits a write, a cookie sends its reads to the primary for
+# max_lag_seconds, so a client always reads its own writes even from a replica
+# lagging at the limit.
+
+logger = logging.getLogger("replicas")
+
+READ_PRIMARY_COOKIE = "db_read_primary_until"
+
+_POSTGRES_LAG = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+END
+"""
+
+def replication_lag(engine: Engine) -> float:
+    """Seconds the replica is behind its primary (0 when caught up or not a Postgres standby)."""
+    with engine.connect() as connection:
+        if engine.dialect.name == "postgresql":
+            return float(connection.exec_driver_sql(_POSTGRES_LAG).scalar() or 0)
+        connection.exec_driver_sql("SELECT 1")
+        return 0.0
+
+def _reject_writes(session, flush_context, instances):
+    if session.new or session.dirty or session.deleted:
+        raise RuntimeError("Replica sessions are read-only; use get_db for writes")
+
+class ReplicaSet:
+    def __init__(self, engines: List[Engine], max_lag_seconds: float = 5.0, check_interval: float = 10.0,
+                 lag_probe: Callable[[Engine], float] = replication_lag):
+        self.engines = list(engines)
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self.lag_probe = lag_probe
+        self.lag = {engine: None for engine in self.engines}
+        self.session_factories = {
+            engine: sessionmaker(autocommit=False, autoflush=False, bind=engine) for engine in self.engines
+        }
+        for session_factory in self.session_factories.values():
+            event.listen(session_factory, "before_flush", _reject_writes)
+        # Empty until the first check(), so reads start on the primary
+        self._healthy: List[Engine] = []
+        self._round_robin = itertools.count()
+        self._lock = threading.Lock()
+
+    def check(self) -> List[Engine]:
+        """Probe every replica now; returns the healthy ones."""
+        healthy = []
+        for engine in self.engines:
+            try:
+                lag = self.lag_probe(engine)
+            except Exception:
+                logger.warning("Replica %s is unreachable", engine.url, exc_info=True)
+                lag = None
+            self.lag[engine] = lag
+            if lag is not None and lag <= self.max_lag_seconds:
+                healthy.append(engine)
+            elif lag is not None:
+                logger.warning("Replica %s is %.1fs behind, routing reads elsewhere", engine.url, lag)
+        with self._lock:
+            self._healthy = healthy
+        return healthy
+
+    def healthy(self) -> List[Engine]:
+        """The replicas the last check() found healthy."""
+        return self._healthy
+
+    def choose(self) -> Optional[Engine]:
+        healthy = self.healthy()
+        if not healthy:
+            return None
+        return healthy[next(self._round_robin) % len(healthy)]
+
+def track_writes(session_factory: sessionmaker, stickiness_seconds: float):
+    """Set the read-your-writes cookie on the response of any request that commits a write."""
+
+    def after_flush(session, flush_context):
+        session.info["wrote"] = True
+
+    def after_commit(session):
+        response = session.info.get("response")
+        if session.info.pop("wrote", False) and response is not None:
+            response.set_cookie(
+                READ_PRIMARY_COOKIE, f"{time.time() + stickiness_seconds:.3f}",
+                max_age=int(stickiness_seconds) + 1, httponly=True, samesite="lax"
+            )
+
+    def after_rollback(session):
+        session.info.pop("wrote", None)
+
+    event.listen(session_factory, "after_flush", after_flush)
+    event.listen(session_factory, "after_commit", after_commit)
+    event.listen(session_factory, "after_rollback", after_rollback)
+
+def reads_own_writes(cookies) -> bool:
+    """True while the client's last write may not have reached the replicas."""
+    try:
+        return float(cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
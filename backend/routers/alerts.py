@@ -0,0 +1,139 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import List
+
+from database import get_db, get_read_db
+from models.alert import AlertStatus, CylinderAlert, DwellThreshold
+from models.user import User
+from schemas import (
+    CylinderAlert as CylinderAlertSchema,
+    DwellThreshold as DwellThresholdSchema,
+    DwellThresholdCreate
+)
+from auth import get_current_active_user
+from listing import projection, row_model, rows_response
+from filters import ListFilter, Eq, DateRange
+from jobs.lost_cylinders import detect_lost_cylinders
+
+router = APIRouter()
+
+ALERT_FILTERS = ListFilter(
+    filters={
+        "status": Eq(CylinderAlert.status),
+        "alert_type": Eq(CylinderAlert.alert_type),
+        "customer_id": Eq(CylinderAlert.customer_id),
+        "cylinder_id": Eq(CylinderAlert.cylinder_id),
+        "detected": DateRange(CylinderAlert.detected_at),
+    },
+    sort_keys={
+        "id": CylinderAlert.id,
+        "last_moved_at": CylinderAlert.last_moved_at,
+        "detected_at": CylinderAlert.detected_at,
+    },
+    default_sort="last_moved_at",
+    tiebreaker=CylinderAlert.id,
+)
+
+def require_manager(current_user: User):
+    if current_user.role not in ["admin", "manager"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+
+@router.get("/", response_model=List[CylinderAlertSchema], response_class=ORJSONResponse)
+async def read_alerts(
+    skip: int = 0,
+    limit: int = 100,
+    fast: bool = False,
+    list_params: dict = Depends(ALERT_FILTERS.dependency()),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    # Longest-lost first unless sorted otherwise
+    stmt = ALERT_FILTERS.apply(projection(CylinderAlert, CylinderAlertSchema), list_params)
+    stmt = stmt.offset(skip).limit(limit)
+    return rows_response(db, stmt, model=row_model(CylinderAlertSchema, fast=fast))
+
+@router.put("/{alert_id}/acknowledge", response_model=CylinderAlertSchema)
+async def acknowledge_alert(
+    alert_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    alert = db.query(CylinderAlert).filter(CylinderAlert.id == alert_id).first()
+    if alert is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Alert not found"
+        )
+    if alert.status == AlertStatus.RESOLVED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Alert is already resolved"
+        )
+    alert.status = AlertStatus.ACKNOWLEDGED
+    alert.acknowledged_by = current_user.id
+    db.commit()
+    db.refresh(alert)
+    return alert
+
+@router.post("/scan")
+async def scan_for_lost_cylinders(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    require_manager(current_user)
+    return detect_lost_cylinders(db)
+
+# Dwell thresholds
+
+@router.get("/thresholds", response_model=List[DwellThresholdSchema])
+async def read_thresholds(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    return db.query(DwellThreshold).order_by(DwellThreshold.id).all()
+
+@router.post("/thresholds", response_model=DwellThresholdSchema)
+async def create_threshold(
+    threshold: DwellThresholdCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    require_manager(current_user)
+    if threshold.customer_id is None and threshold.gas_type is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Set customer_id, gas_type or both; the default comes from LOST_CYLINDER_DAYS"
+        )
+    db_threshold = DwellThreshold(**threshold.model_dump())
+    db.add(db_threshold)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A threshold for this customer and gas type already exists"
+        )
+    db.refresh(db_threshold)
+    return db_threshold
+
+@router.delete("/thresholds/{threshold_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_threshold(
+    threshold_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    require_manager(current_user)
+    threshold = db.query(DwellThreshold).filter(DwellThreshold.id == threshold_id).first()
+    if threshold is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Threshold not found"
+        )
+    db.delete(threshold)
+    db.commit()
@@ -1,28 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, status
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import func, and_, or_
-from typing import List, Dict
+from typing import List, Dict, Optional
 from datetime import datetime, timedelta
+import duckdb
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-from io import BytesIO
-import base64
 
-from database import get_db
+from database import get_read_db
 from models.cylinder import Cylinder, CylinderStatus
 from models.movement import CylinderMovement, Transaction
 from models.maintenance import MaintenanceRecord
 from models.customer import Customer
 from models.user import User
 from auth import get_current_active_user
+from schemas import AnalyticsAggregation, DashboardMetrics
+from fleet_analytics import day_window, dwell_times, fleet_cache, idle_cylinders, turn_rate
+from analytics_store import REPORTS, AnalyticsStore, SnapshotMissing, get_analytics_store
+from charts import negotiate_chart_format, chart_response, figure_to_base64
 
 router = APIRouter()
 
-@router.get("/dashboard")
+@router.get("/dashboard", response_model=DashboardMetrics)
 async def get_dashboard_metrics(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     if current_user.role not in ["admin", "manager"]:
         raise HTTPException(
@@ -42,8 +45,10 @@ async def get_dashboard_metrics(
     # Get total customers
     total_customers = db.query(func.count(Customer.id)).scalar()
     
-    # Get recent transactions
-    recent_transactions = db.query(Transaction).order_by(
+    # Get recent transactions, with their items in one query rather than one per transaction
+    recent_transactions = db.query(Transaction).options(
+        selectinload(Transaction.items)
+    ).order_by(
         Transaction.created_at.desc()
     ).limit(5).all()
     
@@ -64,8 +69,10 @@ async def get_dashboard_metrics(
 
 @router.get("/cylinder-status")
 async def get_cylinder_status_analytics(
+    format: Optional[str] = None,
+    accept: Optional[str] = Header(None),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     if current_user.role not in ["admin", "manager"]:
         raise HTTPException(
@@ -73,12 +80,23 @@ async def get_cylinder_status_analytics(
             detail="Not enough permissions"
         )
     
+    chart_format = negotiate_chart_format(format, accept)
+    
     # Get cylinders by status
     status_counts = db.query(
         Cylinder.status,
         func.count(Cylinder.id)
     ).group_by(Cylinder.status).all()
     
+    # Data-only formats skip server-side rendering entirely
+    if chart_format != "png":
+        return chart_response(
+            chart_format,
+            [cylinder_status for cylinder_status, _ in status_counts],
+            {"count": [count for _, count in status_counts]},
+            label_name="status"
+        )
+    
     # Create pie chart
     plt.figure(figsize=(10, 6))
     plt.pie(
@@ -88,12 +106,8 @@ async def get_cylinder_status_analytics(
     )
     plt.title('Cylinder Status Distribution')
     
-    # Save plot to bytes
-    buffer = BytesIO()
-    plt.savefig(buffer, format='png')
-    buffer.seek(0)
-    plot_data = base64.b64encode(buffer.getvalue()).decode()
-    plt.close()
+    # Save plot to base64 PNG
+    plot_data = figure_to_base64(plt)
     
     return {
         "status_counts": dict(status_counts),
@@ -103,8 +117,10 @@ async def get_cylinder_status_analytics(
 @router.get("/movement-trends")
 async def get_movement_trends(
     days: int = 30,  # Default to last 30 days
+    format: Optional[str] = None,
+    accept: Optional[str] = Header(None),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     if current_user.role not in ["admin", "manager"]:
         raise HTTPException(
@@ -112,6 +128,8 @@ async def get_movement_trends(
             detail="Not enough permissions"
         )
     
+    chart_format = negotiate_chart_format(format, accept)
+    
     # Get movement counts by type for the specified period
     start_date = datetime.utcnow() - timedelta(days=days)
     
@@ -122,6 +140,14 @@ async def get_movement_trends(
         CylinderMovement.timestamp >= start_date
     ).group_by(CylinderMovement.movement_type).all()
     
+    if chart_format != "png":
+        return chart_response(
+            chart_format,
+            [movement_type for movement_type, _ in movement_counts],
+            {"count": [count for _, count in movement_counts]},
+            label_name="movement_type"
+        )
+    
     # Create bar chart
     plt.figure(figsize=(12, 6))
     sns.barplot(
@@ -133,12 +159,8 @@ async def get_movement_trends(
     plt.ylabel('Count')
     plt.xticks(rotation=45)
     
-    # Save plot to bytes
-    buffer = BytesIO()
-    plt.savefig(buffer, format='png')
-    buffer.seek(0)
-    plot_data = base64.b64encode(buffer.getvalue()).decode()
-    plt.close()
+    # Save plot to base64 PNG
+    plot_data = figure_to_base64(plt)
     
     return {
         "movement_counts": dict(movement_counts),
@@ -148,7 +170,7 @@ async def get_movement_trends(
 @router.get("/maintenance-analytics")
 async def get_maintenance_analytics(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     if current_user.role not in ["admin", "manager", "technician"]:
         raise HTTPException(
@@ -188,7 +210,7 @@ async def get_maintenance_analytics(
 @router.get("/customer-analytics")
 async def get_customer_analytics(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     if current_user.role not in ["admin", "manager"]:
         raise HTTPException(
@@ -226,7 +248,7 @@ async def export_analytics_report(
     start_date: datetime = None,
     end_date: datetime = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     if current_user.role not in ["admin", "manager"]:
         raise HTTPException(
@@ -307,4 +329,107 @@ async def export_analytics_report(
         "start_date": start_date,
         "end_date": end_date,
         "data": csv_data
-    } 
\ No newline at end of file
+    } 
+
+# Fleet turn metrics from the movement log, cached until midnight UTC (see fleet_analytics.py)
+
+@router.get("/dwell-times")
+def get_dwell_times(
+    days: int = Query(90, ge=1, le=3650),
+    top: int = Query(10, ge=1, le=100),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    if current_user.role not in ["admin", "manager"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    start, end = day_window(days)
+    return fleet_cache.get(("dwell-times", days, top), lambda: dwell_times(db, start, end, top))
+
+@router.get("/turn-rate")
+def get_turn_rate(
+    days: int = Query(365, ge=1, le=3650),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    if current_user.role not in ["admin", "manager"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    start, end = day_window(days)
+    return fleet_cache.get(("turn-rate", days), lambda: turn_rate(db, start, end))
+
+@router.get("/idle-cylinders")
+def get_idle_cylinders(
+    days: int = Query(30, ge=1, le=3650),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    if current_user.role not in ["admin", "manager"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return fleet_cache.get(("idle-cylinders", days, limit), lambda: idle_cylinders(db, days, limit))
+
+# Columnar store: DuckDB over the Parquet snapshot (see analytics_store.py).
+# Plain def, so the scans run in the threadpool instead of blocking the event loop.
+
+def require_analytics_role(current_user: User = Depends(get_current_active_user)) -> User:
+    if current_user.role not in ["admin", "manager"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return current_user
+
+@router.get("/warehouse")
+def get_warehouse_status(
+    current_user: User = Depends(require_analytics_role),
+    store: AnalyticsStore = Depends(get_analytics_store)
+):
+    manifest = store.manifest()
+    return {
+        "snapshot_at": manifest["snapshot_at"],
+        "tables": {name: store.columns(name) for name in store.tables()},
+        "rows": {name: info["rows"] for name, info in manifest["tables"].items()},
+        "reports": sorted(REPORTS)
+    }
+
+@router.get("/warehouse/reports/{report_name}")
+def run_warehouse_report(
+    report_name: str,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    current_user: User = Depends(require_analytics_role),
+    store: AnalyticsStore = Depends(get_analytics_store)
+):
+    if report_name not in REPORTS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown report; available: {', '.join(sorted(REPORTS))}"
+        )
+    try:
+        rows = store.report(report_name, start_date, end_date)
+    except SnapshotMissing as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc))
+    return {"report": report_name, "snapshot_at": store.manifest()["snapshot_at"], "rows": rows}
+
+@router.post("/warehouse/aggregate")
+def run_warehouse_aggregation(
+    aggregation: AnalyticsAggregation,
+    current_user: User = Depends(require_analytics_role),
+    store: AnalyticsStore = Depends(get_analytics_store)
+):
+    try:
+        rows = store.aggregate(**aggregation.model_dump())
+    except SnapshotMissing as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc))
+    except (ValueError, duckdb.Error) as exc:
+        # Identifiers are checked up front; DuckDB still rejects e.g. min over mixed types
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return {"snapshot_at": store.manifest()["snapshot_at"], "rows": rows}
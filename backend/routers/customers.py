@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional
 
-from database import get_db
+from database import get_db, get_read_db
 from models.customer import Customer, Location
 from models.user import User
 from schemas import (
@@ -13,6 +13,7 @@ from schemas import (
     Location as LocationSchema
 )
 from auth import get_current_active_user
+from listing import fetch_rows, model_rows_response, parse_fields, projection, sparse_model
 
 router = APIRouter()
 
@@ -47,10 +48,20 @@ async def create_customer(
 async def read_customers(
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    customers = db.query(Customer).offset(skip).limit(limit).all()
+    # Sparse fieldsets select only the requested columns and skip locations
+    field_names = parse_fields(fields, Customer, CustomerSchema)
+    if field_names:
+        stmt = projection(Customer, CustomerSchema, field_names).offset(skip).limit(limit)
+        return model_rows_response(fetch_rows(db, stmt), sparse_model(CustomerSchema, field_names))
+    
+    # CustomerSchema nests locations: one query for the page's locations, not one per customer
+    customers = db.query(Customer).options(
+        selectinload(Customer.locations)
+    ).offset(skip).limit(limit).all()
     return customers
 
 @router.get("/{customer_id}", response_model=CustomerSchema)
@@ -151,7 +162,7 @@ async def create_location(
 async def read_customer_locations(
     customer_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     # Check if customer exists
     customer = db.query(Customer).filter(Customer.id == customer_id).first()
@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import qrcode
 import os
 from io import BytesIO
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, ORJSONResponse
 
-from database import get_db
+from database import get_db, get_read_db
 from models.cylinder import Cylinder
 from models.user import User
 from schemas import (
@@ -15,9 +16,29 @@ from schemas import (
     CylinderUpdate
 )
 from auth import get_current_active_user
+from listing import parse_fields, projection, row_model, rows_response
+from filters import ListFilter, Eq, DateRange
 
 router = APIRouter()
 
+CYLINDER_FILTERS = ListFilter(
+    filters={
+        "status": Eq(Cylinder.status),
+        "gas_type": Eq(Cylinder.type),
+        "owner": Eq(Cylinder.current_customer_id),
+        "location": Eq(Cylinder.current_location_id),
+        "next_inspection": DateRange(Cylinder.next_inspection),
+    },
+    sort_keys={
+        "id": Cylinder.id,
+        "serial_number": Cylinder.serial_number,
+        "status": Cylinder.status,
+        "next_inspection": Cylinder.next_inspection,
+    },
+    default_sort="id",
+    tiebreaker=Cylinder.id,
+)
+
 @router.post("/", response_model=CylinderSchema)
 async def create_cylinder(
     cylinder: CylinderCreate,
@@ -66,15 +87,29 @@ async def create_cylinder(
     db.refresh(db_cylinder)
     return db_cylinder
 
-@router.get("/", response_model=List[CylinderSchema])
+@router.get("/", response_model=List[CylinderSchema], response_class=ORJSONResponse)
 async def read_cylinders(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = None,
+    fast: bool = False,
+    list_params: dict = Depends(CYLINDER_FILTERS.dependency()),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    cylinders = db.query(Cylinder).offset(skip).limit(limit).all()
-    return cylinders
+    # Sparse fieldsets (fields=serial_number,status) narrow the SELECT itself
+    field_names = parse_fields(fields, Cylinder, CylinderSchema)
+    
+    stmt = CYLINDER_FILTERS.apply(projection(Cylinder, CylinderSchema, field_names), list_params)
+    stmt = stmt.offset(skip).limit(limit)
+    # Weak ETag from (id, updated_at) so unchanged polls get a 304 without serializing;
+    # fast=true skips validation and returns the rows as stored
+    return rows_response(
+        db, stmt, request,
+        version=func.coalesce(Cylinder.updated_at, Cylinder.created_at),
+        model=row_model(CylinderSchema, field_names, fast)
+    )
 
 @router.get("/{cylinder_id}", response_model=CylinderSchema)
 async def read_cylinder(
@@ -176,7 +211,7 @@ async def get_cylinder_qr_code(
 async def search_cylinder(
     identifier: str,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     # Search by serial number, barcode, or QR code
     cylinder = db.query(Cylinder).filter(
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime, timedelta
 
-from database import get_db
+from database import get_db, get_read_db
 from models.maintenance import MaintenanceRecord, MaintenanceSchedule
 from models.cylinder import Cylinder
 from models.user import User
@@ -13,9 +14,26 @@ from schemas import (
     MaintenanceRecordUpdate
 )
 from auth import get_current_active_user
+from listing import projection, row_model, rows_response
+from filters import ListFilter, Eq, DateRange
 
 router = APIRouter()
 
+MAINTENANCE_FILTERS = ListFilter(
+    filters={
+        "status": Eq(MaintenanceRecord.status),
+        "maintenance_type": Eq(MaintenanceRecord.maintenance_type),
+        "cylinder_id": Eq(MaintenanceRecord.cylinder_id),
+        "scheduled": DateRange(MaintenanceRecord.scheduled_date),
+    },
+    sort_keys={
+        "id": MaintenanceRecord.id,
+        "scheduled_date": MaintenanceRecord.scheduled_date,
+    },
+    default_sort="id",
+    tiebreaker=MaintenanceRecord.id,
+)
+
 @router.post("/", response_model=MaintenanceRecordSchema)
 async def create_maintenance_record(
     maintenance: MaintenanceRecordCreate,
@@ -47,21 +65,25 @@ async def create_maintenance_record(
     db.refresh(db_maintenance)
     return db_maintenance
 
-@router.get("/", response_model=List[MaintenanceRecordSchema])
+@router.get("/", response_model=List[MaintenanceRecordSchema], response_class=ORJSONResponse)
 async def read_maintenance_records(
     skip: int = 0,
     limit: int = 100,
+    fast: bool = False,
+    list_params: dict = Depends(MAINTENANCE_FILTERS.dependency()),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    records = db.query(MaintenanceRecord).offset(skip).limit(limit).all()
-    return records
+    # Column-only rows; fast=true skips validation and returns them as stored
+    stmt = MAINTENANCE_FILTERS.apply(projection(MaintenanceRecord, MaintenanceRecordSchema), list_params)
+    stmt = stmt.offset(skip).limit(limit)
+    return rows_response(db, stmt, model=row_model(MaintenanceRecordSchema, fast=fast))
 
 @router.get("/cylinder/{cylinder_id}", response_model=List[MaintenanceRecordSchema])
 async def read_cylinder_maintenance_history(
     cylinder_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     # Check if cylinder exists
     cylinder = db.query(Cylinder).filter(Cylinder.id == cylinder_id).first()
@@ -122,7 +144,7 @@ async def update_maintenance_record(
 async def get_upcoming_maintenance(
     days: int = 30,  # Default to next 30 days
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     today = datetime.utcnow()
     end_date = today + timedelta(days=days)
@@ -138,7 +160,7 @@ async def get_upcoming_maintenance(
 @router.get("/overdue", response_model=List[MaintenanceRecordSchema])
 async def get_overdue_maintenance(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     today = datetime.utcnow()
     
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, selectinload
 from typing import List
 from datetime import datetime
 
-from database import get_db
+from database import get_db, get_read_db
 from models.movement import CylinderMovement, Transaction, TransactionItem
 from models.cylinder import Cylinder
 from models.customer import Customer, Location
@@ -16,9 +17,26 @@ from schemas import (
     TransactionItem as TransactionItemSchema
 )
 from auth import get_current_active_user
+from listing import projection, row_model, rows_response
+from filters import ListFilter, Eq, DateRange
 
 router = APIRouter()
 
+TRANSACTION_FILTERS = ListFilter(
+    filters={
+        "status": Eq(Transaction.status),
+        "transaction_type": Eq(Transaction.transaction_type),
+        "customer_id": Eq(Transaction.customer_id),
+        "created": DateRange(Transaction.created_at),
+    },
+    sort_keys={
+        "id": Transaction.id,
+        "created_at": Transaction.created_at,
+    },
+    default_sort="id",
+    tiebreaker=Transaction.id,
+)
+
 @router.post("/cylinder", response_model=CylinderMovementSchema)
 async def create_cylinder_movement(
     movement: CylinderMovementCreate,
@@ -63,21 +81,23 @@ async def create_cylinder_movement(
     db.refresh(db_movement)
     return db_movement
 
-@router.get("/cylinder", response_model=List[CylinderMovementSchema])
+@router.get("/cylinder", response_model=List[CylinderMovementSchema], response_class=ORJSONResponse)
 async def read_cylinder_movements(
     skip: int = 0,
     limit: int = 100,
+    fast: bool = False,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    movements = db.query(CylinderMovement).offset(skip).limit(limit).all()
-    return movements
+    # Column-only rows; fast=true skips validation and returns them as stored
+    stmt = projection(CylinderMovement, CylinderMovementSchema).offset(skip).limit(limit)
+    return rows_response(db, stmt, model=row_model(CylinderMovementSchema, fast=fast))
 
 @router.get("/cylinder/{cylinder_id}", response_model=List[CylinderMovementSchema])
 async def read_cylinder_movement_history(
     cylinder_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     # Check if cylinder exists
     cylinder = db.query(Cylinder).filter(Cylinder.id == cylinder_id).first()
@@ -94,6 +114,15 @@ async def read_cylinder_movement_history(
     return movements
 
 # Transaction endpoints
+
+def transactions_with_items(db: Session):
+    # schemas.Transaction nests the items; load them in one extra query for the
+    # whole page instead of a lazy load per transaction
+    return db.query(Transaction).options(selectinload(Transaction.items))
+
+def transaction_with_items(db: Session, transaction_id: int):
+    return transactions_with_items(db).filter(Transaction.id == transaction_id).first()
+
 @router.post("/transaction", response_model=TransactionSchema)
 async def create_transaction(
     transaction: TransactionCreate,
@@ -118,10 +147,16 @@ async def create_transaction(
     total_amount = 0
     transaction_items = []
     
+    # One lookup for all items instead of one per item
+    cylinder_ids = {item.cylinder_id for item in transaction.items}
+    existing_ids = {
+        cylinder_id for (cylinder_id,) in
+        db.query(Cylinder.id).filter(Cylinder.id.in_(cylinder_ids))
+    } if cylinder_ids else set()
+    
     for item in transaction.items:
         # Check if cylinder exists
-        cylinder = db.query(Cylinder).filter(Cylinder.id == item.cylinder_id).first()
-        if cylinder is None:
+        if item.cylinder_id not in existing_ids:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Cylinder {item.cylinder_id} not found"
@@ -154,17 +189,18 @@ async def create_transaction(
         db.add(item)
     
     db.commit()
-    db.refresh(db_transaction)
-    return db_transaction
+    return transaction_with_items(db, db_transaction.id)
 
 @router.get("/transaction", response_model=List[TransactionSchema])
 async def read_transactions(
     skip: int = 0,
     limit: int = 100,
+    list_params: dict = Depends(TRANSACTION_FILTERS.dependency()),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    transactions = db.query(Transaction).offset(skip).limit(limit).all()
+    query = TRANSACTION_FILTERS.apply(transactions_with_items(db), list_params)
+    transactions = query.offset(skip).limit(limit).all()
     return transactions
 
 @router.get("/transaction/{transaction_id}", response_model=TransactionSchema)
@@ -173,7 +209,7 @@ async def read_transaction(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    transaction = db.query(Transaction).filter(Transaction.id == transaction_id).first()
+    transaction = transaction_with_items(db, transaction_id)
     if transaction is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -193,7 +229,7 @@ async def complete_transaction(
             detail="Not enough permissions"
         )
     
-    transaction = db.query(Transaction).filter(Transaction.id == transaction_id).first()
+    transaction = transaction_with_items(db, transaction_id)
     if transaction is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -210,5 +246,4 @@ async def complete_transaction(
     transaction.completed_at = datetime.utcnow()
     
     db.commit()
-    db.refresh(transaction)
-    return transaction 
\ No newline at end of file
+    return transaction_with_items(db, transaction.id) 
\ No newline at end of file
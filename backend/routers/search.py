@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from database import get_read_db
+from models.user import User
+from auth import get_current_active_user
+from search_index import customer_search, location_search
+
+router = APIRouter()
+
+@router.get("/customers")
+async def search_customers(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    # Ranked full-text match over name, email, phone and address
+    return customer_search.search(db, q, limit)
+
+@router.get("/locations")
+async def search_locations(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    # Ranked full-text match over location name and address
+    return location_search.search(db, q, limit)
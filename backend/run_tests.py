@@ -112,6 +112,75 @@ def generate_html_report(history, output_dir="test_reports"):
     
     return report_file
 
+def summarize_query_report(report_file, top=10):
+    """Summarize the per-request query report written by query_inspector."""
+    if not report_file.exists():
+        return "No query report written (no requests hit the database)"
+    
+    requests = 0
+    total_queries = 0
+    repeated = defaultdict(lambda: {"count": 0, "requests": 0, "caller": None})
+    slow = 0
+    with open(report_file, "r") as f:
+        for line in f:
+            report = json.loads(line)
+            requests += 1
+            total_queries += report["queries"]
+            slow += len(report["slow"])
+            for entry in report["repeated"]:
+                summary = repeated[(report["label"], entry["statement"])]
+                summary["count"] = max(summary["count"], entry["count"])
+                summary["requests"] += 1
+                summary["caller"] = entry["caller"]
+    
+    lines = ["\nQuery Report:"]
+    lines.append("-" * 50)
+    lines.append(f"Requests: {requests}, Queries: {total_queries}, Slow queries: {slow}")
+    if repeated:
+        lines.append(f"\nRepeated statements (possible N+1), top {top}:")
+        ranked = sorted(repeated.items(), key=lambda item: -item[1]["count"])[:top]
+        for (label, statement), summary in ranked:
+            lines.append(
+                f"  {summary['count']}x in {label} ({summary['requests']} requests) from {summary['caller']}"
+            )
+            lines.append(f"      {statement[:160]}")
+    lines.append(f"Full report: {report_file}")
+    return "\n".join(lines)
+
+def load_benchmark_results(benchmark_file):
+    """Per-benchmark timings in ms from a pytest-benchmark --benchmark-json file."""
+    with open(benchmark_file, "r") as f:
+        data = json.load(f)
+    results = {}
+    for bench in data["benchmarks"]:
+        stats = bench["stats"]
+        results[bench["fullname"]] = {
+            "mean_ms": stats["mean"] * 1000,
+            "median_ms": stats["median"] * 1000,
+            "stddev_ms": stats["stddev"] * 1000,
+            "min_ms": stats["min"] * 1000,
+            "rounds": stats["rounds"]
+        }
+    return results, data.get("commit_info", {}).get("id")
+
+def summarize_benchmarks(history, benchmarks):
+    """Benchmark medians with the change since the previous benchmark run in the history."""
+    previous = {}
+    for run in reversed(history["runs"][:-1]):
+        if run.get("benchmarks"):
+            previous = run["benchmarks"]
+            break
+    
+    lines = ["\nBenchmark Results (median):"]
+    lines.append("-" * 50)
+    for name, stats in sorted(benchmarks.items()):
+        line = f"{name}: {stats['median_ms']:.3f} ms"
+        if name in previous and previous[name]["median_ms"]:
+            change = stats["median_ms"] / previous[name]["median_ms"] - 1
+            line += f" ({change:+.1%} vs previous run)"
+        lines.append(line)
+    return "\n".join(lines)
+
 def load_test_config():
     """Load test configuration from YAML file."""
     config_file = Path(__file__).parent / "test_config.yaml"
@@ -174,7 +243,7 @@ def setup_test_environment(config):
 def run_tests(test_path=None, coverage=False, html_report=False, parallel=False, 
              failfast=False, markers=None, verbose=1, timeout=None, retries=0,
              cache_results=False, profile=False, slow_threshold=None, generate_report=False,
-             config_file=None, skip_deps=False):
+             config_file=None, skip_deps=False, query_report=False, benchmark=False):
     """
     Run tests with optional coverage reporting and additional features.
     
@@ -194,6 +263,8 @@ def run_tests(test_path=None, coverage=False, html_report=False, parallel=False,
         generate_report (bool): Whether to generate HTML report
         config_file (str): Path to test configuration file
         skip_deps (bool): Skip dependency checking
+        query_report (bool): Collect per-request SQL statements and report repeated (N+1) and slow ones
+        benchmark (bool): Run the micro-benchmarks in benchmarks/ and record their timings in the history
     """
     # Load test configuration
     config = load_test_config()
@@ -211,6 +282,10 @@ def run_tests(test_path=None, coverage=False, html_report=False, parallel=False,
     # Get the backend directory path
     backend_dir = Path(__file__).parent
     
+    # Benchmark timings are always recorded, so trends can be followed across commits
+    if benchmark:
+        cache_results = True
+    
     # Load test history if caching
     history = load_test_history() if cache_results else {"runs": [], "stats": defaultdict(int)}
     
@@ -264,6 +339,8 @@ def run_tests(test_path=None, coverage=False, html_report=False, parallel=False,
     # Add test path
     if test_path:
         cmd.append(str(test_path))
+    elif benchmark:
+        cmd.append("benchmarks/")
     else:
         cmd.append("tests/")
     
@@ -272,6 +349,19 @@ def run_tests(test_path=None, coverage=False, html_report=False, parallel=False,
     log_file = backend_dir / "test_logs" / f"test_results_{timestamp}.log"
     log_file.parent.mkdir(exist_ok=True)
     
+    # Per-request query report from the N+1 detector (query_inspector.py)
+    query_report_file = None
+    if query_report:
+        query_report_file = backend_dir / "test_logs" / f"query_report_{timestamp}.jsonl"
+        os.environ.setdefault("QUERY_INSPECTOR", "warn")
+        os.environ["QUERY_REPORT_FILE"] = str(query_report_file)
+    
+    # pytest-benchmark results, folded into the history run entry below
+    benchmark_file = None
+    if benchmark:
+        benchmark_file = backend_dir / "test_logs" / f"benchmark_{timestamp}.json"
+        cmd.extend(["--benchmark-only", f"--benchmark-json={benchmark_file}"])
+    
     # Run the tests
     start_time = time.time()
     try:
@@ -293,6 +383,8 @@ def run_tests(test_path=None, coverage=False, html_report=False, parallel=False,
         tests_failed = output.count("FAILED")
         total_tests = tests_passed + tests_failed
         
+        benchmarks, commit = load_benchmark_results(benchmark_file) if benchmark_file else (None, None)
+        
         # Update history
         if cache_results:
             history["runs"].append({
@@ -301,7 +393,10 @@ def run_tests(test_path=None, coverage=False, html_report=False, parallel=False,
                 "status": "success" if tests_failed == 0 else "failure",
                 "tests_passed": tests_passed,
                 "total_tests": total_tests,
-                "log_file": str(log_file)
+                "log_file": str(log_file),
+                "query_report": str(query_report_file) if query_report_file else None,
+                "benchmarks": benchmarks,
+                "commit": commit
             })
             history["stats"]["total_tests"] += total_tests
             history["stats"]["failed_tests"] += tests_failed
@@ -311,6 +406,12 @@ def run_tests(test_path=None, coverage=False, html_report=False, parallel=False,
         print(f"Passed: {tests_passed}, Failed: {tests_failed}, Total: {total_tests}")
         print(f"Log file: {log_file}")
         
+        if query_report_file:
+            print(summarize_query_report(query_report_file))
+        
+        if benchmarks:
+            print(summarize_benchmarks(history, benchmarks))
+        
         if cache_results:
             print(generate_summary(history))
         
@@ -331,7 +432,8 @@ def run_tests(test_path=None, coverage=False, html_report=False, parallel=False,
                 "status": "failure",
                 "tests_passed": output.count("PASSED"),
                 "total_tests": output.count("PASSED") + output.count("FAILED"),
-                "log_file": str(log_file)
+                "log_file": str(log_file),
+                "query_report": str(query_report_file) if query_report_file else None
             })
             save_test_history(history)
         
@@ -339,6 +441,9 @@ def run_tests(test_path=None, coverage=False, html_report=False, parallel=False,
         print(f"Exit code: {e.returncode}")
         print(f"Log file: {log_file}")
         
+        if query_report_file:
+            print(summarize_query_report(query_report_file))
+        
         if cache_results:
             print(generate_summary(history))
         
@@ -362,6 +467,10 @@ if __name__ == "__main__":
     parser.add_argument("--report", action="store_true", help="Generate HTML test report")
     parser.add_argument("--config", help="Path to test configuration file")
     parser.add_argument("--skip-deps", action="store_true", help="Skip dependency checking")
+    parser.add_argument("--query-report", action="store_true",
+                      help="Report repeated (N+1) and slow SQL statements per request")
+    parser.add_argument("--benchmark", action="store_true",
+                      help="Run the micro-benchmarks and record their timings in the test history")
     
     args = parser.parse_args()
     
@@ -380,5 +489,7 @@ if __name__ == "__main__":
         slow_threshold=args.slow,
         generate_report=args.report,
         config_file=args.config,
-        skip_deps=args.skip_deps
+        skip_deps=args.skip_deps,
+        query_report=args.query_report,
+        benchmark=args.benchmark
     ) 
\ No newline at end of file
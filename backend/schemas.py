@@ -1,10 +1,11 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 from models.user import UserRole
 from models.cylinder import CylinderStatus, CylinderType
 from models.movement import MovementType, TransactionStatus
 from models.maintenance import MaintenanceType, MaintenanceStatus
+from models.alert import AlertStatus
 
 # User schemas
 class UserBase(BaseModel):
@@ -215,6 +216,51 @@ class MaintenanceRecord(MaintenanceRecordBase):
     class Config:
         from_attributes = True
 
+# Analytics schemas
+class DashboardMetrics(BaseModel):
+    total_cylinders: int
+    cylinders_by_status: Dict[CylinderStatus, int]
+    total_customers: int
+    recent_transactions: List[Transaction]
+    upcoming_maintenance: List[MaintenanceRecord]
+
+class AnalyticsAggregation(BaseModel):
+    table: str
+    metrics: List[str] = ["count"]  # count, count_distinct:<column>, sum|avg|min|max:<column>
+    group_by: List[str] = []
+    time_column: Optional[str] = None
+    bucket: Optional[str] = None  # day, week, month or year of time_column
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    limit: int = Field(1000, ge=1, le=10000)
+
+# Alert schemas
+class DwellThresholdCreate(BaseModel):
+    customer_id: Optional[int] = None
+    gas_type: Optional[CylinderType] = None
+    max_days: int = Field(..., gt=0)
+
+class DwellThreshold(DwellThresholdCreate):
+    id: int
+
+    class Config:
+        from_attributes = True
+
+class CylinderAlert(BaseModel):
+    id: int
+    cylinder_id: int
+    alert_type: str
+    status: AlertStatus
+    customer_id: Optional[int] = None
+    location_id: Optional[int] = None
+    last_moved_at: Optional[datetime] = None
+    threshold_days: int
+    detected_at: Optional[datetime] = None
+    resolved_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
 # Token schemas
 class Token(BaseModel):
     access_token: str
@@ -0,0 +1,126 @@
+import re
+from sqlalchemy import DDL, Index, event, func, literal_column, or_, select, text
+from sqlalchemy.dialects import postgresql  # noqa: F401  registers to_tsvector/to_tsquery
+from sqlalchemy.orm import Session
+from typing import List, Sequence
+
+from database import Base
+from models.customer import Customer, Location
+
+# Postgres: GIN indexes over a tsvector expression (ranked full-text search) and
+# pg_trgm on the display name (typeahead / fuzzy prefix).
+# SQLite (dev and tests): an external-content FTS5 table kept in sync by triggers.
+
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+def search_terms(query: str) -> List[str]:
+    """Split user input into plain word tokens; everything else is dropped."""
+    return _WORD.findall(query.lower())[:8]
+
+class SearchIndex:
+    def __init__(self, table, columns: Sequence[str], name_column: str):
+        self.table = table
+        self.columns = list(columns)
+        self.name_column = name_column
+        self.fts_table = f"{table.name}_fts"
+
+        # Expression-only indexes are not attached to the table automatically
+        table.append_constraint(Index(
+            f"ix_{table.name}_search_tsv",
+            self.tsvector(),
+            postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"))
+        Index(
+            f"ix_{table.name}_{name_column}_trgm",
+            table.c[name_column],
+            postgresql_using="gin",
+            postgresql_ops={name_column: "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql")
+
+        for statement in self._sqlite_ddl():
+            event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+        event.listen(
+            table,
+            "before_drop",
+            DDL(f"DROP TABLE IF EXISTS {self.fts_table}").execute_if(dialect="sqlite")
+        )
+
+    def tsvector(self):
+        # Must match the indexed expression exactly for Postgres to use the GIN index,
+        # and literals (not bind parameters) keep the expression immutable
+        empty, space = literal_column("''"), literal_column("' '")
+        document = func.coalesce(self.table.c[self.columns[0]], empty)
+        for column in self.columns[1:]:
+            document = document.op("||")(space).op("||")(func.coalesce(self.table.c[column], empty))
+        return func.to_tsvector(literal_column("'simple'"), document)
+
+    def _sqlite_ddl(self) -> List[str]:
+        columns = ", ".join(self.columns)
+        new_values = ", ".join(f"new.{column}" for column in self.columns)
+        old_values = ", ".join(f"old.{column}" for column in self.columns)
+        fts, table = self.fts_table, self.table.name
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            f"{columns}, content='{table}', content_rowid='id', prefix='2 3')",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+            f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); END",
+            # Pick up rows that existed before the index
+            f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+        ]
+
+    def search(self, db: Session, query: str, limit: int = 10) -> List[dict]:
+        """Ranked matches for ``query``; every term is matched as a prefix (typeahead)."""
+        terms = search_terms(query)
+        if not terms:
+            return []
+        if db.get_bind().dialect.name == "postgresql":
+            return self._search_postgres(db, query, terms, limit)
+        return self._search_sqlite(db, terms, limit)
+
+    def _search_postgres(self, db: Session, query: str, terms: List[str], limit: int) -> List[dict]:
+        tsquery = func.to_tsquery(literal_column("'simple'"), " & ".join(f"{term}:*" for term in terms))
+        name = self.table.c[self.name_column]
+        rank = func.ts_rank(self.tsvector(), tsquery) + func.similarity(name, query)
+        stmt = select(
+            self.table.c.id,
+            *[self.table.c[column] for column in self.columns],
+            rank.label("rank")
+        ).where(
+            or_(self.tsvector().op("@@")(tsquery), name.op("%")(query))
+        ).order_by(rank.desc()).limit(limit)
+        return [dict(row) for row in db.execute(stmt).mappings()]
+
+    def _search_sqlite(self, db: Session, terms: List[str], limit: int) -> List[dict]:
+        match = " ".join(f'"{term}"*' for term in terms)
+        columns = ", ".join(f"t.{column}" for column in self.columns)
+        # bm25() is lower-is-better; negate it so rank sorts like ts_rank
+        stmt = text(
+            f"SELECT t.id, {columns}, -bm25({self.fts_table}) AS rank "
+            f"FROM {self.fts_table} JOIN {self.table.name} t ON t.id = {self.fts_table}.rowid "
+            f"WHERE {self.fts_table} MATCH :match "
+            f"ORDER BY bm25({self.fts_table}) LIMIT :limit"
+        )
+        return [dict(row) for row in db.execute(stmt, {"match": match, "limit": limit}).mappings()]
+
+customer_search = SearchIndex(
+    Customer.__table__,
+    ["name", "email", "phone", "address", "city"],
+    name_column="name"
+)
+
+location_search = SearchIndex(
+    Location.__table__,
+    ["name", "address", "city", "zip_code"],
+    name_column="name"
+)
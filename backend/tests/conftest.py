@@ -1,19 +1,23 @@
 import os
 import pytest
+from contextlib import contextmanager
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, insert
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 from datetime import datetime, timedelta
 
+import query_inspector
 from main import app
-from database import Base, get_db
+from database import Base, get_db, get_read_db
 from auth import get_password_hash, create_access_token
 from models.user import User
-from models.cylinder import Cylinder
+from models.cylinder import Cylinder, CylinderType
 from models.customer import Customer, Location
 from models.movement import CylinderMovement, Transaction, TransactionItem
 from models.maintenance import MaintenanceRecord, MaintenanceSchedule
+# v1 models whose tables the others' foreign keys point at
+from app.models import customer as app_customer, cylinder as app_cylinder, location as app_location, user as app_user
 
 # Test database URL
 TEST_DATABASE_URL = "sqlite:///:memory:"
@@ -26,6 +30,10 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# run_tests.py --query-report: report repeated statements per request
+if query_inspector.MODE != "off":
+    query_inspector.instrument_engine(engine)
+
 # Override the get_db dependency
 def override_get_db():
     try:
@@ -35,6 +43,7 @@ def override_get_db():
         db.close()
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
 
 @pytest.fixture(scope="session")
 def test_db():
@@ -56,12 +65,65 @@ def db_session(test_db):
     transaction.rollback()
     connection.close()
 
+@pytest.fixture(scope="function")
+def file_db(tmp_path):
+    """Open sessions on private SQLite files, for services that need their own tables or a real file:
+
+        db = file_db(Base, tables=[Cylinder, ...], seed=[(Cylinder, rows), ...])
+
+    ``tables`` defaults to everything in ``base``. Sessions are closed and
+    engines disposed when the test ends.
+    """
+    sessions = []
+
+    def open_db(base, tables=None, seed=()):
+        engine = create_engine(f"sqlite:///{tmp_path / f'file_db_{len(sessions)}.db'}")
+        base.metadata.create_all(engine, tables=None if tables is None else [
+            getattr(table, "__table__", table) for table in tables
+        ])
+        with engine.begin() as connection:
+            for table, rows in seed:
+                connection.execute(insert(getattr(table, "__table__", table)), rows)
+        session = sessionmaker(bind=engine)()
+        sessions.append(session)
+        return session
+
+    yield open_db
+    for session in sessions:
+        engine = session.get_bind()
+        session.close()
+        engine.dispose()
+
 @pytest.fixture(scope="function")
 def client(db_session):
     app.dependency_overrides[get_db] = lambda: db_session
+    app.dependency_overrides[get_read_db] = lambda: db_session
     with TestClient(app) as test_client:
         yield test_client
 
+@pytest.fixture(scope="function")
+def count_queries():
+    """Collect the statements run inside a block, e.g. to check a response's query count stays constant:
+
+        with count_queries() as statements:
+            client.get(...)
+        assert len(statements) == expected
+    """
+    @contextmanager
+    def counter():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+    return counter
+
 @pytest.fixture(scope="function")
 def test_user(db_session):
     user = User(
@@ -85,7 +147,7 @@ def test_customer(db_session):
     customer = Customer(
         name="Test Customer",
         email="customer@example.com",
-        phone_number="1234567890",
+        phone="1234567890",
         business_type="commercial"
     )
     db_session.add(customer)
@@ -113,7 +175,9 @@ def test_location(db_session, test_customer):
 def test_cylinder(db_session):
     cylinder = Cylinder(
         serial_number="TEST123",
-        type="Oxygen",
+        barcode="CYL-TEST123",
+        qr_code="CYL-TEST123",
+        type=CylinderType.OXYGEN,
         capacity=50,
         pressure_rating=2000,
         tare_weight=30,
@@ -125,12 +189,13 @@ def test_cylinder(db_session):
     return cylinder
 
 @pytest.fixture(scope="function")
-def test_maintenance_record(db_session, test_cylinder):
+def test_maintenance_record(db_session, test_cylinder, test_user):
     record = MaintenanceRecord(
         cylinder_id=test_cylinder.id,
         maintenance_type="inspection",
         scheduled_date=datetime.now() + timedelta(days=30),
         status="scheduled",
+        performed_by=test_user.id,
         notes="Test maintenance"
     )
     db_session.add(record)
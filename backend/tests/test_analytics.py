@@ -129,4 +129,88 @@ def test_get_financial_metrics(client, test_token):
     assert "revenue" in data
     assert "expenses" in data
     assert "profit" in data
-    assert "average_transaction_value" in data 
\ No newline at end of file
+    assert "average_transaction_value" in data 
+
+def test_cylinder_status_chart_series(client, test_token, test_cylinder):
+    headers = {"Authorization": f"Bearer {test_token}"}
+    response = client.get(
+        "/api/analytics/cylinder-status",
+        headers=headers,
+        params={"format": "series"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert "plot" not in data
+    assert data["labels"] == ["available"]
+    assert data["series"] == [{"name": "count", "data": [1]}]
+
+def test_cylinder_status_chart_columnar_accept_header(client, test_token, test_cylinder):
+    headers = {
+        "Authorization": f"Bearer {test_token}",
+        "Accept": "application/vnd.gastracker.columnar+json"
+    }
+    response = client.get("/api/analytics/cylinder-status", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["columns"] == ["status", "count"]
+    assert data["data"] == [["available"], [1]]
+
+def test_movement_trends_invalid_chart_format(client, test_token):
+    headers = {"Authorization": f"Bearer {test_token}"}
+    response = client.get(
+        "/api/analytics/movement-trends",
+        headers=headers,
+        params={"format": "svg"}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_dashboard_includes_transaction_items(client, test_token, db_session, test_customer, test_cylinder, count_queries):
+    from models.movement import MovementType, Transaction, TransactionItem
+
+    transaction = Transaction(customer_id=test_customer.id, transaction_type=MovementType.DELIVERY, total_amount=10.00)
+    transaction.items = [
+        TransactionItem(cylinder_id=test_cylinder.id, quantity=1, unit_price=10.00, total_price=10.00)
+    ]
+    db_session.add(transaction)
+    db_session.commit()
+
+    headers = {"Authorization": f"Bearer {test_token}"}
+    with count_queries() as statements:
+        response = client.get("/api/analytics/dashboard", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["total_cylinders"] == 1
+    assert data["recent_transactions"][0]["id"] == transaction.id
+    assert len(data["recent_transactions"][0]["items"]) == 1
+    # User, three aggregates, transactions, their items and maintenance
+    assert len(statements) <= 7
+
+def test_warehouse_report_unknown(client, test_token):
+    headers = {"Authorization": f"Bearer {test_token}"}
+    response = client.get("/api/analytics/warehouse/reports/nope", headers=headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+def test_warehouse_aggregate_rejects_unknown_column(client, test_token, tmp_path):
+    from main import app
+    from analytics_store import AnalyticsStore, get_analytics_store
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    pq.write_table(pa.table({"id": [1], "cylinder_id": [7], "movement_type": ["DELIVERY"]}), tmp_path / "cylinder_movements.parquet")
+    app.dependency_overrides[get_analytics_store] = lambda: AnalyticsStore(str(tmp_path))
+    try:
+        headers = {"Authorization": f"Bearer {test_token}"}
+        body = {"table": "cylinder_movements", "metrics": ["count_distinct:cylinder_id"]}
+        response = client.post("/api/analytics/warehouse/aggregate", headers=headers, json=body)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["rows"] == [{"count_distinct:cylinder_id": 1}]
+
+        body["group_by"] = ["customer_id"]
+        response = client.post("/api/analytics/warehouse/aggregate", headers=headers, json=body)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        body = {"table": "cylinder_movements", "metrics": ["sum:movement_type"]}
+        response = client.post("/api/analytics/warehouse/aggregate", headers=headers, json=body)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    finally:
+        del app.dependency_overrides[get_analytics_store]
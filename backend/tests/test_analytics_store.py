@@ -0,0 +1,61 @@
+from datetime import datetime
+
+import pytest
+
+from analytics_store import AnalyticsStore, SnapshotMissing, snapshot
+from database import Base
+from models.maintenance import MaintenanceRecord
+from models.movement import CylinderMovement
+
+@pytest.fixture
+def store(tmp_path, file_db):
+    db = file_db(Base, seed=[
+        (CylinderMovement, [
+            {"cylinder_id": 1, "movement_type": "DELIVERY", "to_location_id": 10, "timestamp": datetime(2024, 1, 5)},
+            {"cylinder_id": 2, "movement_type": "DELIVERY", "to_location_id": 10, "timestamp": datetime(2024, 1, 20)},
+            {"cylinder_id": 1, "movement_type": "PICKUP", "to_location_id": 11, "timestamp": datetime(2024, 2, 1)},
+        ]),
+        (MaintenanceRecord, [{
+            "cylinder_id": 1, "maintenance_type": "INSPECTION", "status": "COMPLETED", "cost": 40.0,
+            "scheduled_date": datetime(2024, 1, 1), "completed_date": datetime(2024, 1, 3),
+        }]),
+    ])
+    manifest = snapshot(db.get_bind(), str(tmp_path / "parquet"))
+    # Tables missing from the database are skipped, not created
+    assert manifest["tables"]["cylinder_movements"]["rows"] == 3
+    assert "fill_records" not in manifest["tables"]
+    return AnalyticsStore(str(tmp_path / "parquet"))
+
+def test_reports_run_on_snapshot(store):
+    rows = store.report("movements-by-month")
+    assert [(row["month"].month, row["movement_type"], row["movements"]) for row in rows] == [
+        (1, "DELIVERY", 2), (2, "PICKUP", 1)
+    ]
+    turnaround = store.report("maintenance-turnaround")
+    assert turnaround[0]["avg_days_to_complete"] == 2.0
+
+    with pytest.raises(SnapshotMissing):
+        store.report("fills-by-month")
+
+def test_aggregate_validates_identifiers(store):
+    rows = store.aggregate(
+        "cylinder_movements", ["count", "count_distinct:cylinder_id"], group_by=["to_location_id"],
+        time_column="timestamp", start=datetime(2024, 1, 1), end=datetime(2024, 2, 1)
+    )
+    assert rows == [{"to_location_id": 10, "count": 2, "count_distinct:cylinder_id": 2}]
+
+    with pytest.raises(ValueError):
+        store.aggregate("cylinder_movements", ["sum:cylinder_id; DROP TABLE x"])
+    with pytest.raises(ValueError):
+        store.aggregate("cylinder_movements", ["count"], group_by=["no_such_column"])
+    with pytest.raises(SnapshotMissing):
+        store.aggregate("lease_records", ["count"])
+
+def test_aggregate_rejects_numeric_metrics_on_text(store):
+    assert store.aggregate("maintenance_records", ["sum:cost", "max:maintenance_type"]) == [
+        {"sum:cost": 40.0, "max:maintenance_type": "INSPECTION"}
+    ]
+    with pytest.raises(ValueError, match="numeric"):
+        store.aggregate("cylinder_movements", ["avg:movement_type"])
+    with pytest.raises(ValueError, match="Unknown column"):
+        store.aggregate("cylinder_movements", ["sum:no_such_column"])
@@ -0,0 +1,29 @@
+from main import app
+
+def mounted(prefix):
+    return {route.path for route in app.routes if route.path.startswith(prefix)}
+
+def test_location_endpoints_are_mounted():
+    assert {
+        "/api/v1/locations/nearest",
+        "/api/v1/locations/within",
+        "/api/v1/locations/cylinders-within",
+    } <= mounted("/api/v1/locations")
+
+def test_route_planning_endpoint_is_mounted():
+    assert "/api/v1/routes/plan" in mounted("/api/v1/routes")
+
+def test_sync_endpoint_is_mounted():
+    assert "/api/v1/sync/changes" in mounted("/api/v1/sync")
+
+def test_billing_endpoints_are_mounted():
+    assert {"/api/v1/billing/runs", "/api/v1/billing/runs/{run_id}/lines"} <= mounted("/api/v1/billing")
+
+def test_fill_endpoints_are_mounted():
+    assert "/api/v1/fills/ingest" in mounted("/api/v1/fills")
+
+def test_batch_recall_endpoints_are_mounted():
+    assert {"/api/v1/fills/batches/{batch_number}", "/api/v1/fills/batches/{batch_number}/recall"} <= mounted("/api/v1/fills")
+
+def test_movement_endpoint_is_mounted():
+    assert "/api/v1/movements" in mounted("/api/v1/movements")
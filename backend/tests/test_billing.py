@@ -0,0 +1,70 @@
+from datetime import date, datetime, timezone
+
+import numpy as np
+import pytest
+from sqlalchemy import func, insert, select
+
+from app.core.database import Base
+from app.models.lease import LeaseRecord
+from app.services.billing import line_table, month_period, rental_days, run_billing
+
+def test_rental_days_clip_to_period():
+    start, end = month_period(2024, 2)
+    assert end == date(2024, 3, 1)
+    starts = np.array(["2024-01-10", "2024-02-10", "2024-02-27", "2024-03-05", "2024-01-01"], dtype="datetime64[D]")
+    ends = np.array(["2024-02-05", "NaT", "2024-02-27", "NaT", "2024-01-31"], dtype="datetime64[D]")
+    # Return day billed; still-out leases run to the period end; leases outside the period bill nothing
+    assert rental_days(starts, ends, start, end).tolist() == [5, 20, 1, 0, 0]
+
+@pytest.fixture
+def db(file_db):
+    return file_db(Base, tables=[LeaseRecord, Base.metadata.tables["billing_runs"], Base.metadata.tables["invoice_lines"]])
+
+def lease(lease_id, start, status="ACTIVE", end=None, returned=None, rate=2.0, charges=0.0):
+    return {
+        "id": lease_id, "cylinder_id": lease_id, "customer_id": 1 + lease_id % 2, "location_id": 1,
+        "lease_start": start, "lease_end": end, "actual_return_date": returned, "status": status,
+        "lease_rate": rate, "additional_charges": charges,
+    }
+
+def test_billing_run_is_idempotent_and_resumable(db):
+    db.execute(insert(LeaseRecord.__table__), [
+        lease(1, datetime(2024, 1, 15, tzinfo=timezone.utc)),
+        lease(2, datetime(2024, 2, 10), status="TERMINATED", end=datetime(2024, 6, 1),
+              returned=datetime(2024, 2, 19, 17, 30), charges=25.0),
+        lease(3, datetime(2024, 1, 1), status="EXPIRED", end=datetime(2024, 2, 3)),
+        lease(4, datetime(2024, 2, 1), status="PENDING"),
+        lease(5, datetime(2023, 1, 1), status="TERMINATED", returned=datetime(2023, 6, 1)),
+    ])
+    db.commit()
+    start, end = month_period(2024, 2)
+
+    run = run_billing(db, start, end, chunk_size=2)
+    assert run["status"] == "completed"
+    lines = db.execute(select(line_table).order_by(line_table.c.lease_id)).mappings().all()
+    assert [(line["lease_id"], line["rental_days"], line["amount"]) for line in lines] == [
+        (1, 29, 58.0), (2, 10, 45.0), (3, 3, 6.0)
+    ]
+    assert run["line_count"] == 3 and run["total_amount"] == 109.0
+
+    # Same period again: nothing new is written
+    assert run_billing(db, start, end)["id"] == run["id"]
+    assert db.execute(select(func.count()).select_from(line_table)).scalar() == 3
+
+    # Rebilling picks up corrections
+    db.execute(LeaseRecord.__table__.update().where(LeaseRecord.__table__.c.id == 1).values(lease_rate=3.0))
+    db.commit()
+    assert run_billing(db, start, end, rebill=True)["total_amount"] == 138.0
+
+def test_ended_lease_without_end_date_is_not_billed(db):
+    db.execute(insert(LeaseRecord.__table__), [
+        lease(1, datetime(2023, 11, 1), status="EXPIRED"),
+        lease(2, datetime(2023, 11, 1), status="TERMINATED"),
+        lease(3, datetime(2023, 11, 1)),
+    ])
+    db.commit()
+    for month in (1, 2, 3):
+        run_billing(db, *month_period(2024, month))
+    lines = db.execute(select(line_table.c.lease_id, line_table.c.period_start).order_by(line_table.c.id)).all()
+    # Only the active lease keeps running
+    assert [lease_id for lease_id, _ in lines] == [3, 3, 3]
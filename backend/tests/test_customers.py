@@ -191,4 +191,68 @@ def test_delete_location_unauthorized(client, test_customer, test_location):
     response = client.delete(
         f"/api/customers/{test_customer.id}/locations/{test_location.id}"
     )
-    assert response.status_code == status.HTTP_401_UNAUTHORIZED 
\ No newline at end of file
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED 
+
+def test_get_customers_sparse_fields(client, test_token, test_customer):
+    headers = {"Authorization": f"Bearer {test_token}"}
+    response = client.get(
+        "/api/customers/",
+        headers=headers,
+        params={"fields": "name,email"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data[0] == {
+        "id": test_customer.id,
+        "name": test_customer.name,
+        "email": test_customer.email
+    }
+
+def test_sparse_fieldsets_share_one_model():
+    from listing import parse_fields, sparse_model
+    from models.customer import Customer
+    from schemas import Customer as CustomerSchema
+
+    names = parse_fields("email,name,email", Customer, CustomerSchema)
+    assert names == parse_fields("name, id ,email", Customer, CustomerSchema) == ("id", "email", "name")
+    assert sparse_model(CustomerSchema, names) is sparse_model(CustomerSchema, parse_fields("name,email", Customer, CustomerSchema))
+
+def test_get_customers_sparse_fields_rejects_relationships(client, test_token):
+    headers = {"Authorization": f"Bearer {test_token}"}
+    response = client.get("/api/customers/", headers=headers, params={"fields": "locations"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_get_customers_query_count_is_constant(client, test_token, db_session, count_queries):
+    from models.customer import Customer, Location
+
+    address = {"address": "1 Test St", "city": "Test City", "state": "TS", "zip_code": "12345", "country": "Test Country"}
+
+    def add_customer(number):
+        customer = Customer(
+            name=f"Customer {number}",
+            email=f"customer{number}@example.com",
+            phone="1234567890",
+            business_type="commercial",
+            tax_id=f"TAX{number}",
+            credit_limit=1000.0,
+            payment_terms="net30",
+            **address
+        )
+        customer.locations = [Location(name=f"Site {number}", **address)]
+        db_session.add(customer)
+        db_session.commit()
+
+    headers = {"Authorization": f"Bearer {test_token}"}
+    add_customer(0)
+    with count_queries() as one_customer:
+        response = client.get("/api/customers/", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+
+    for number in range(1, 5):
+        add_customer(number)
+    with count_queries() as five_customers:
+        response = client.get("/api/customers/", headers=headers)
+    data = response.json()
+    assert len(data) == 5
+    assert all(len(customer["locations"]) == 1 for customer in data)
+    assert len(five_customers) == len(one_customer)
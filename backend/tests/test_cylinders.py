@@ -1,5 +1,6 @@
 import pytest
 from fastapi import status
+from pydantic import ValidationError
 
 def test_create_cylinder(client, test_token, test_customer, test_location):
     headers = {"Authorization": f"Bearer {test_token}"}
@@ -124,4 +125,76 @@ def test_search_cylinder_by_barcode(client, test_token, test_cylinder):
 def test_search_nonexistent_cylinder(client, test_token):
     headers = {"Authorization": f"Bearer {test_token}"}
     response = client.get("/api/cylinders/search/NONEXISTENT", headers=headers)
-    assert response.status_code == status.HTTP_404_NOT_FOUND 
\ No newline at end of file
+    assert response.status_code == status.HTTP_404_NOT_FOUND 
+
+def test_get_cylinders_returns_schema_fields(client, test_token, test_cylinder):
+    headers = {"Authorization": f"Bearer {test_token}"}
+    response = client.get("/api/cylinders/", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert set(data[0]) == {
+        "id", "serial_number", "barcode", "qr_code", "type", "capacity",
+        "pressure_rating", "tare_weight", "status", "created_at", "updated_at"
+    }
+
+def test_get_cylinders_sparse_fields(client, test_token, test_cylinder):
+    headers = {"Authorization": f"Bearer {test_token}"}
+    response = client.get(
+        "/api/cylinders/",
+        headers=headers,
+        params={"fields": "serial_number,status"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert set(data[0]) == {"id", "serial_number", "status"}
+
+def test_get_cylinders_unknown_field(client, test_token):
+    headers = {"Authorization": f"Bearer {test_token}"}
+    response = client.get("/api/cylinders/", headers=headers, params={"fields": "secret"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_get_cylinders_filter_by_status(client, test_token, test_cylinder):
+    headers = {"Authorization": f"Bearer {test_token}"}
+    response = client.get("/api/cylinders/", headers=headers, params={"status": "available"})
+    assert response.status_code == status.HTTP_200_OK
+    assert [c["id"] for c in response.json()] == [test_cylinder.id]
+
+    response = client.get("/api/cylinders/", headers=headers, params={"status": "lost"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+
+def test_get_cylinders_invalid_sort_key(client, test_token):
+    headers = {"Authorization": f"Bearer {test_token}"}
+    response = client.get("/api/cylinders/", headers=headers, params={"sort": "-capacity"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_get_cylinders_conditional_get(client, test_token, test_cylinder):
+    headers = {"Authorization": f"Bearer {test_token}"}
+    response = client.get("/api/cylinders/", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    response = client.get("/api/cylinders/", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+
+    # A different fieldset is a different representation
+    response = client.get(
+        "/api/cylinders/",
+        headers={**headers, "If-None-Match": etag},
+        params={"fields": "status"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+def test_get_cylinders_validates_rows_unless_fast(client, test_token, test_cylinder, db_session):
+    headers = {"Authorization": f"Bearer {test_token}"}
+    # A row the schema rejects (CylinderSchema requires a barcode)
+    test_cylinder.barcode = None
+    db_session.commit()
+    with pytest.raises(ValidationError):
+        client.get("/api/cylinders/", headers=headers)
+
+    response = client.get("/api/cylinders/", headers=headers, params={"fast": "true"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()[0]["barcode"] is None
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from app.core.distance_matrix import DistanceMatrixStore
+from app.core.geo import distance_matrix
+
+POINTS = {10: (51.5, -0.12), 20: (48.85, 2.35), 30: (52.52, 13.4)}
+
+def test_upsert_and_read(tmp_path):
+    store = DistanceMatrixStore(str(tmp_path))
+    assert store.upsert(POINTS) == 3
+    ids = [30, 10, 20]
+    expected = distance_matrix(*zip(*[POINTS[point_id] for point_id in ids]))
+    assert np.allclose(store.submatrix(ids), expected, rtol=1e-5)
+    assert store.distance(10, 20) == pytest.approx(expected[1, 2], rel=1e-5)
+
+def test_only_changed_points_are_recomputed(tmp_path):
+    store = DistanceMatrixStore(str(tmp_path))
+    store.upsert(POINTS)
+    assert store.upsert(POINTS) == 0
+    assert store.upsert({20: (45.76, 4.83), 40: (50.85, 4.35)}) == 2
+    assert store.distance(10, 20) == pytest.approx(
+        distance_matrix([51.5], [-0.12], [45.76], [4.83])[0, 0], rel=1e-5
+    )
+
+def test_writes_are_visible_to_other_workers(tmp_path):
+    writer = DistanceMatrixStore(str(tmp_path), initial_capacity=2)
+    reader = DistanceMatrixStore(str(tmp_path))
+    writer.upsert({10: POINTS[10], 20: POINTS[20]})
+    row = reader.row(10)
+    assert isinstance(row, np.memmap)  # Zero-copy view of the shared file
+
+    # Growing past capacity moves the store to a new generation of files
+    writer.upsert({30: POINTS[30]})
+    assert 30 in reader
+    assert reader.distance(30, 10) == pytest.approx(writer.distance(10, 30))
+
+def test_remove_frees_slot(tmp_path):
+    store = DistanceMatrixStore(str(tmp_path))
+    store.upsert(POINTS)
+    assert store.remove([20]) == 1
+    assert 20 not in store
+    with pytest.raises(KeyError):
+        store.submatrix([10, 20])
+    store.upsert({50: (40.4, -3.7)})
+    assert len(store) == 3
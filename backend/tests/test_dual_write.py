@@ -0,0 +1,67 @@
+from sqlalchemy import create_engine, insert, select, text
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from dual_write import Backfill, check_consistency, enable_dual_write, repair
+from models.customer import Customer
+from models.user import User
+
+def make_engines(tmp_path):
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    secondary = create_engine(f"sqlite:///{tmp_path / 'secondary.db'}")
+    Base.metadata.create_all(primary)
+    Base.metadata.create_all(secondary)
+    return primary, secondary
+
+def test_committed_writes_are_mirrored(tmp_path):
+    primary, secondary = make_engines(tmp_path)
+    Session = sessionmaker(bind=primary, autoflush=False)
+    writer = enable_dual_write(Session, secondary)
+
+    with Session() as session:
+        customer = Customer(name="Acme", email="acme@example.com")
+        user = User(email="driver@example.com", full_name="Driver", role="driver")
+        session.add_all([customer, user])
+        session.commit()
+        customer.name = "Acme Gases"
+        session.commit()
+        session.delete(user)
+        session.commit()
+
+        session.add(Customer(name="Rolled back", email="gone@example.com"))
+        session.flush()
+        session.rollback()
+
+    with secondary.connect() as connection:
+        customers = connection.execute(text("SELECT name, created_at FROM customers")).all()
+        users = connection.execute(text("SELECT COUNT(*) FROM users")).scalar()
+    # Server defaults are copied as stored on the primary
+    assert [name for name, _ in customers] == ["Acme Gases"]
+    assert customers[0][1] is not None
+    assert users == 0
+    assert writer.failures == 0
+    assert check_consistency(primary, secondary, Base.metadata.sorted_tables) == {}
+
+def test_backfill_check_and_repair(tmp_path):
+    primary, secondary = make_engines(tmp_path)
+    customers = Base.metadata.tables["customers"]
+    with primary.begin() as connection:
+        connection.execute(insert(customers), [
+            {"id": customer_id, "name": f"Customer {customer_id}", "email": f"c{customer_id}@example.com"}
+            for customer_id in range(1, 51)
+        ])
+    # A newer dual-written version of one row must survive the backfill
+    with secondary.begin() as connection:
+        connection.execute(insert(customers), {"id": 7, "name": "Newer", "email": "c7@example.com"})
+
+    backfill = Backfill(primary, secondary, [customers], chunk_size=20, rows_per_second=0,
+                        checkpoint_file=str(tmp_path / "backfill.json"))
+    backfill.start().join(timeout=10)
+    assert backfill.progress["customers"] == {"last_id": 50, "copied": 50, "max_id": 50, "done": True}
+    with secondary.connect() as connection:
+        assert connection.execute(select(customers.c.name).where(customers.c.id == 7)).scalar() == "Newer"
+
+    differences = check_consistency(primary, secondary, [customers], chunk_size=20)
+    assert differences == {"customers": [(0, 20)]}
+    repair(primary, secondary, customers, differences["customers"])
+    assert check_consistency(primary, secondary, [customers], chunk_size=20) == {}
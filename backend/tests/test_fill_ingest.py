@@ -0,0 +1,100 @@
+from datetime import datetime, timezone
+
+import orjson
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select, update
+
+from app.core.database import Base, get_db
+from app.api.v1.endpoints import fills
+from app.core.auth import get_current_active_user
+from app.models.customer import Customer
+from app.models.cylinder import Cylinder, CylinderStatus
+from app.models.fill import FillRecord, FillStatus
+from app.models.location import Location
+from app.models.user import User
+from app.services.fill_ingest import ingest_fills, pack_fills, parse_binary, parse_ndjson
+from app.services.recall import batch_summary, recall_cylinders
+
+@pytest.fixture
+def db(file_db):
+    return file_db(Base, tables=[User, Customer, Location, Cylinder, FillRecord], seed=[
+        (User, [{"id": 1, "email": "rig@example.com", "hashed_password": ""}]),
+        (Customer, [{"id": 1, "name": "Plant", "customer_type": "BUSINESS"}]),
+        (Location, [{"id": 1, "name": "Fill plant", "location_type": "FILLING_STATION",
+                     "address_line1": "1 Plant Rd", "city": "Tulsa", "state": "OK",
+                     "postal_code": "74101", "country": "US"}]),
+        (Cylinder, [
+            {"id": n, "serial_number": f"SN{n}", "type": "standard", "gas_type": "OXYGEN", "capacity": 50.0,
+             "owner_id": 1, "status": "EMPTY", "last_fill_date": datetime(2024, 1, 1)}
+            for n in (1, 2, 3)
+        ]),
+    ])
+
+def fill(cylinder_id, day, **fields):
+    return {"cylinder_id": cylinder_id, "location_id": 1, "operator_id": 1,
+            "fill_date": datetime(2024, 3, day, 8, 30, tzinfo=timezone.utc), "fill_amount": 9.5, **fields}
+
+def cylinder_states(db):
+    rows = db.execute(select(Cylinder.__table__.c.id, Cylinder.__table__.c.status, Cylinder.__table__.c.last_fill_date))
+    return {cylinder_id: (state, last_fill.day) for cylinder_id, state, last_fill in rows}
+
+def test_ndjson_fills_update_cylinders_and_report_bad_lines(db):
+    lines = [
+        fill(1, 2), fill(1, 5, batch_number="B-7"),
+        fill(2, 3, leak_test_passed=False),
+        fill(3, 4, status="failed"),
+        fill(99, 4),                    # unknown cylinder
+        {"cylinder_id": 1, "location_id": 1, "operator_id": 1},  # no fill_date
+    ]
+    body = b"\n".join(orjson.dumps(line) for line in lines)
+
+    result = ingest_fills(db, parse_ndjson(body), created_by=1, batch_size=2)
+    assert (result["accepted"], result["rejected"]) == (4, 2)
+    assert [error["index"] for error in result["errors"]] == [4, 5]
+    assert cylinder_states(db) == {
+        1: (CylinderStatus.FULL, 5),
+        2: (CylinderStatus.MAINTENANCE, 3),
+        3: (CylinderStatus.EMPTY, 1),  # Failed fills leave the cylinder alone
+    }
+
+def test_binary_fills_round_trip(db):
+    records = [fill(n % 3 + 1, 1 + n % 28, pressure_test_passed=True, gas_purity=99.5, batch_number="B-1") for n in range(3000)]
+    frame = parse_binary(pack_fills(records))
+    assert frame.loc[0, "batch_number"] == "B-1" and frame.loc[0, "leak_test_passed"] is None
+
+    assert ingest_fills(db, frame, created_by=1)["accepted"] == 3000
+    stored = db.execute(select(FillRecord.__table__).order_by(FillRecord.__table__.c.id)).mappings().first()
+    assert stored["status"] == FillStatus.COMPLETED
+    assert stored["pressure_test_passed"] is True and stored["leak_test_passed"] is None
+    assert stored["gas_purity"] == pytest.approx(99.5)
+    assert cylinder_states(db)[1] == (CylinderStatus.FULL, 28)
+
+def test_batch_recall_pages_through_cylinders_with_current_holders(db):
+    ingest_fills(db, parse_ndjson(b"\n".join(orjson.dumps(line) for line in [
+        fill(1, 2, batch_number="B-7"), fill(1, 9, batch_number="B-7"),
+        fill(2, 3, batch_number="B-8"), fill(3, 4, batch_number="B-7"),
+    ])))
+    db.execute(update(Cylinder.__table__).where(Cylinder.__table__.c.id == 3).values(current_customer_id=1, current_location="Dock 4"))
+    db.commit()
+
+    summary = batch_summary(db, "B-7")
+    assert (summary["fills"], summary["cylinders"]) == (3, 2)
+    assert batch_summary(db, "B-0") is None
+
+    recalled = list(recall_cylinders(db, "B-7", page_size=1))
+    assert [(row["cylinder_id"], row["fills"], row["current_customer_name"], row["current_location"]) for row in recalled] == [
+        (1, 2, None, None),
+        (3, 1, "Plant", "Dock 4"),
+    ]
+
+    app = FastAPI()
+    app.include_router(fills.router)
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_active_user] = lambda: None
+    client = TestClient(app)
+    response = client.get("/fills/batches/B-7/recall")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [orjson.loads(line)["serial_number"] for line in response.content.splitlines()] == ["SN1", "SN3"]
+    assert client.get("/fills/batches/B-0/recall").status_code == 404
@@ -0,0 +1,64 @@
+from datetime import date, datetime
+
+import pytest
+
+from database import Base
+from fleet_analytics import DailyCache, dwell_times, idle_cylinders, turn_rate
+from models.customer import Customer, Location
+from models.cylinder import Cylinder
+from models.movement import CylinderMovement
+
+@pytest.fixture
+def db(file_db):
+    return file_db(Base, seed=[
+        (Customer, [
+            {"id": 1, "name": "Acme", "email": "acme@example.com"},
+            {"id": 2, "name": "Globex", "email": "globex@example.com"},
+        ]),
+        (Location, [
+            {"id": 1, "customer_id": None, "name": "Depot"},
+            {"id": 2, "customer_id": 1, "name": "Acme site"},
+            {"id": 3, "customer_id": 2, "name": "Globex site"},
+        ]),
+        (Cylinder, [
+            {"id": n, "serial_number": f"SN{n}", "type": "OXYGEN", "status": "AVAILABLE"} for n in (1, 2, 3)
+        ]),
+        (CylinderMovement, [
+            {"cylinder_id": 1, "movement_type": "DELIVERY", "to_location_id": 2, "timestamp": datetime(2024, 1, 1)},
+            {"cylinder_id": 1, "movement_type": "PICKUP", "to_location_id": 1, "timestamp": datetime(2024, 1, 11)},
+            {"cylinder_id": 1, "movement_type": "DELIVERY", "to_location_id": 3, "timestamp": datetime(2024, 1, 20)},
+            {"cylinder_id": 2, "movement_type": "DELIVERY", "to_location_id": 3, "timestamp": datetime(2024, 1, 5)},
+            {"cylinder_id": 2, "movement_type": "RETURN", "to_location_id": 1, "timestamp": datetime(2024, 2, 4)},
+        ]),
+    ])
+
+def test_dwell_times_sql_matches_pandas(db):
+    start, end = datetime(2024, 1, 1), datetime(2024, 2, 1)
+    by_sql = dwell_times(db, start, end, method="sql")
+    by_pandas = dwell_times(db, start, end, method="pandas")
+
+    assert by_sql["deliveries"] == 3
+    assert by_sql["still_at_customer"] == 1
+    assert by_sql["avg_days_at_customer"] == 20.0
+    assert by_sql["slowest_customers"] == [
+        {"customer_id": 2, "deliveries": 1, "avg_days_at_customer": 30.0},
+        {"customer_id": 1, "deliveries": 1, "avg_days_at_customer": 10.0},
+    ]
+    for key in ("deliveries", "still_at_customer", "avg_days_at_customer", "max_days_at_customer", "slowest_customers"):
+        assert by_pandas[key] == by_sql[key]
+
+def test_turn_rate_and_idle_cylinders(db):
+    rate = turn_rate(db, datetime(2024, 1, 1), datetime(2025, 1, 1))
+    assert rate["fleet_size"] == 3 and rate["deliveries"] == 3
+    assert rate["turns_per_cylinder_per_year"] == pytest.approx(0.997, abs=0.001)
+
+    idle = idle_cylinders(db, days=20, today=date(2024, 2, 10))
+    # Cylinder 3 never moved; cylinder 1 last moved on January 20th
+    assert [cylinder["id"] for cylinder in idle["cylinders"]] == [3, 1]
+    assert idle["total"] == 2
+
+def test_daily_cache_computes_once():
+    cache, calls = DailyCache(), []
+    for _ in range(3):
+        assert cache.get(("key",), lambda: calls.append(1) or {"value": 1}) == {"value": 1}
+    assert len(calls) == 1
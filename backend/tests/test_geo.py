@@ -0,0 +1,121 @@
+import random
+import numpy as np
+import pytest
+
+from app.core.geo import (
+    SpatialIndex,
+    decode_geohash,
+    encode_geohash,
+    geohash_neighbourhood,
+    geohash_precision_for_radius,
+    haversine_km,
+)
+
+def test_geohash_round_trip():
+    geohash = encode_geohash(57.64911, 10.40744, 11)
+    assert geohash == "u4pruydqqvj"
+    latitude, longitude = decode_geohash(geohash)
+    assert latitude == pytest.approx(57.64911, abs=1e-5)
+    assert longitude == pytest.approx(10.40744, abs=1e-5)
+
+def test_geohash_neighbourhood_covers_radius():
+    precision = geohash_precision_for_radius(5.0, 48.85)
+    cells = geohash_neighbourhood(48.85, 2.35, precision)
+    assert len(cells) == 9
+    # A point ~4 km away must fall in one of the prefilter cells
+    assert encode_geohash(48.88, 2.39, precision) in cells
+
+def test_haversine_km():
+    distances = haversine_km(51.5007, -0.1246, [40.6892, 51.5007], [-74.0445, -0.1246])
+    assert distances[0] == pytest.approx(5574.8, rel=1e-3)
+    assert distances[1] == 0.0
+
+def test_spatial_index_matches_brute_force():
+    rng = random.Random(7)
+    points = {i: (rng.uniform(45, 50), rng.uniform(0, 5)) for i in range(1, 2001)}
+    index = SpatialIndex()
+    for point_id, (latitude, longitude) in points.items():
+        index.upsert(point_id, latitude, longitude)
+
+    ids = np.array(list(points))
+    coordinates = np.array(list(points.values()))
+    distances = haversine_km(47.5, 2.5, coordinates[:, 0], coordinates[:, 1])
+
+    within = index.within(47.5, 2.5, 25.0)
+    assert sorted(point_id for point_id, _ in within) == sorted(ids[distances <= 25.0].tolist())
+
+    nearest = index.nearest(47.5, 2.5, k=5)
+    assert [point_id for point_id, _ in nearest] == ids[np.argsort(distances)[:5]].tolist()
+
+def test_spatial_index_incremental_updates():
+    index = SpatialIndex()
+    index.upsert(1, 10.0, 10.0, tag=1)
+    index.upsert(2, 10.01, 10.01, tag=2)
+    assert [point_id for point_id, _ in index.nearest(10.0, 10.0, k=2)] == [1, 2]
+    assert [point_id for point_id, _ in index.nearest(10.0, 10.0, k=2, tags=[2])] == [2]
+
+    # Moving a point re-buckets it; removal frees its slot
+    index.upsert(1, 20.0, 20.0, tag=1)
+    assert [point_id for point_id, _ in index.within(10.0, 10.0, 50.0)] == [2]
+    index.remove(2)
+    assert index.within(10.0, 10.0, 50.0) == []
+    assert len(index) == 1
+
+def test_spatial_index_wraps_antimeridian():
+    index = SpatialIndex()
+    index.upsert(1, 0.0, 179.99)
+    assert [point_id for point_id, _ in index.within(0.0, -179.99, 5.0)] == [1]
+
+def test_backfill_sets_missing_geohashes(file_db):
+    from sqlalchemy import select
+    from app.core.database import Base
+    from app.models.location import Location
+    from app.services.spatial import backfill_location_geohashes
+
+    address = {"location_type": "WAREHOUSE", "address_line1": "1 Depot Rd", "city": "Aalborg", "state": "NJ",
+               "postal_code": "9000", "country": "DK"}
+    db = file_db(Base, tables=[Location], seed=[(Location, [
+        {"id": 1, "name": "Old depot", "latitude": 57.64911, "longitude": 10.40744, "geohash": None, **address},
+        {"id": 2, "name": "No coordinates", "latitude": None, "longitude": None, "geohash": None, **address},
+        {"id": 3, "name": "Current", "latitude": 1.0, "longitude": 2.0, "geohash": "s01mtw", **address},
+    ])])
+
+    assert backfill_location_geohashes(db, batch_size=1) == 1
+    assert backfill_location_geohashes(db) == 0
+    geohashes = dict(db.execute(select(Location.__table__.c.id, Location.__table__.c.geohash)).all())
+    assert geohashes == {1: encode_geohash(57.64911, 10.40744), 2: None, 3: "s01mtw"}
+
+def test_index_refresh_and_cylinders_follow_the_database(file_db):
+    from sqlalchemy import insert, update
+    from app.core.database import Base
+    from app.models.customer import Customer
+    from app.models.cylinder import Cylinder
+    from app.models.location import Location
+    from app.models.user import User
+    from app.services.spatial import cylinders_at_locations, location_index, refresh_location_index
+
+    address = {"location_type": "WAREHOUSE", "address_line1": "1 Depot Rd", "city": "Aalborg", "state": "NJ",
+               "postal_code": "9000", "country": "DK"}
+    db = file_db(Base, tables=[User, Customer, Location, Cylinder], seed=[
+        (Location, [
+            {"id": 1, "name": "North", "latitude": 57.0, "longitude": 10.0, **address},
+            {"id": 2, "name": "South", "latitude": 55.0, "longitude": 10.0, **address},
+        ]),
+        (Cylinder, [
+            {"id": n, "serial_number": f"SN{n}", "type": "standard", "gas_type": "OXYGEN", "capacity": 50.0,
+             "owner_id": 1, "current_location_id": location_id}
+            for n, location_id in ((1, 1), (2, 2), (3, None))
+        ]),
+    ])
+
+    assert refresh_location_index(db) == 2
+    # Another worker retires a depot and adds one; this process only learns of it on refresh
+    db.execute(update(Location.__table__).where(Location.__table__.c.id == 2).values(is_active=False))
+    db.execute(insert(Location.__table__).values(id=3, name="East", latitude=56.0, longitude=12.0, **address))
+    db.commit()
+    assert refresh_location_index(db) == 2
+    assert [location_id for location_id, _ in location_index.within(56.0, 12.0, 10.0)] == [3]
+    assert location_index.within(55.0, 10.0, 10.0) == []
+
+    assert cylinders_at_locations(db, [1, 3]) == {1: 1}
+    assert cylinders_at_locations(db, [2]) == {2: 2}
@@ -0,0 +1,114 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert, select, update
+
+from app.core.database import Base
+from app.models.customer import Customer
+from app.models.cylinder import Cylinder, CylinderStatus, CylinderType
+from app.models.fill import FillRecord
+from app.models.inventory import LocationInventory
+from app.models.location import Location
+from app.models.movement import CylinderMovement, MovementStatus, MovementType
+from app.models.user import User
+from app.services.fill_ingest import ingest_fills, parse_ndjson
+from app.services.inventory import (
+    UnknownCylinder,
+    backfill_current_locations,
+    inventory_keys,
+    location_stock,
+    reconcile_inventory,
+    record_inventory_changes,
+    record_movement,
+)
+
+cylinders = Cylinder.__table__
+
+@pytest.fixture
+def db(file_db):
+    address = {"address_line1": "1 Depot Rd", "city": "Tulsa", "state": "OK", "postal_code": "74101", "country": "US"}
+    return file_db(Base, tables=[User, Customer, Location, Cylinder, FillRecord, LocationInventory, CylinderMovement], seed=[
+        (User, [{"id": 1, "email": "rig@example.com", "hashed_password": ""}]),
+        (Customer, [{"id": 1, "name": "Plant", "customer_type": "BUSINESS"}]),
+        (Location, [
+            {"id": 1, "name": "North depot", "location_type": "WAREHOUSE", **address},
+            {"id": 2, "name": "South depot", "location_type": "WAREHOUSE", **address},
+        ]),
+        (Cylinder, [
+            {"id": n, "serial_number": f"SN{n}", "type": "standard", "capacity": 50.0, "owner_id": 1,
+             "gas_type": "OXYGEN" if n <= 3 else "ARGON", "status": "EMPTY", "current_location_id": 1 if n <= 4 else None}
+            for n in range(1, 6)
+        ]),
+    ])
+
+def stock(db, location_id):
+    return {(row["gas_type"], row["status"]): row["count"] for row in location_stock(db, location_id)}
+
+def test_reconciliation_builds_and_repairs_counters(db):
+    result = reconcile_inventory(db)
+    assert (result["counters"], result["corrected"]) == (2, 2)
+    assert stock(db, 1) == {(CylinderType.OXYGEN, CylinderStatus.EMPTY): 3, (CylinderType.ARGON, CylinderStatus.EMPTY): 1}
+    assert reconcile_inventory(db)["corrected"] == 0
+
+    # A write behind the counters' back is found and fixed
+    db.execute(update(cylinders).where(cylinders.c.id == 4).values(current_location_id=None))
+    db.commit()
+    result = reconcile_inventory(db)
+    assert result["drift"] == [{
+        "location_id": 1, "gas_type": CylinderType.ARGON, "status": CylinderStatus.EMPTY, "expected": 0, "stored": 1
+    }]
+    assert stock(db, 1) == {(CylinderType.OXYGEN, CylinderStatus.EMPTY): 3}
+
+def test_movements_and_fills_update_counters(db):
+    reconcile_inventory(db)
+
+    # A movement: one cylinder leaves the north depot for the south one, another goes out on a truck
+    before = inventory_keys(db, [1, 2])
+    db.execute(update(cylinders).where(cylinders.c.id == 1).values(current_location_id=2))
+    db.execute(update(cylinders).where(cylinders.c.id == 2).values(current_location_id=None))
+    record_inventory_changes(db, before, inventory_keys(db, [1, 2]))
+    db.commit()
+    assert stock(db, 1) == {(CylinderType.OXYGEN, CylinderStatus.EMPTY): 1, (CylinderType.ARGON, CylinderStatus.EMPTY): 1}
+    assert stock(db, 2) == {(CylinderType.OXYGEN, CylinderStatus.EMPTY): 1}
+
+    ingest_fills(db, parse_ndjson(
+        b'{"cylinder_id": 1, "location_id": 2, "operator_id": 1, "fill_date": "2024-03-02T08:00:00Z"}\n'
+        b'{"cylinder_id": 3, "location_id": 1, "operator_id": 1, "fill_date": "2024-03-02T09:00:00Z", "leak_test_passed": false}'
+    ))
+    assert stock(db, 1) == {(CylinderType.ARGON, CylinderStatus.EMPTY): 1, (CylinderType.OXYGEN, CylinderStatus.MAINTENANCE): 1}
+    assert stock(db, 2) == {(CylinderType.OXYGEN, CylinderStatus.FULL): 1}
+    assert reconcile_inventory(db)["corrected"] == 0
+
+def test_recorded_movements_move_cylinders(db):
+    reconcile_inventory(db)
+
+    record_movement(db, {"cylinder_id": 5, "movement_type": MovementType.RETURN, "status": MovementStatus.COMPLETED,
+                         "to_location_id": 2})
+    # Scheduled, not yet done: the cylinder stays put
+    record_movement(db, {"cylinder_id": 1, "movement_type": MovementType.TRANSFER, "status": MovementStatus.PENDING,
+                         "to_location_id": 2})
+    assert stock(db, 2) == {(CylinderType.ARGON, CylinderStatus.EMPTY): 1}
+    assert stock(db, 1)[(CylinderType.OXYGEN, CylinderStatus.EMPTY)] == 3
+    assert reconcile_inventory(db)["corrected"] == 0
+
+    with pytest.raises(UnknownCylinder):
+        record_movement(db, {"cylinder_id": 99, "movement_type": MovementType.DELIVERY, "to_location_id": 1})
+
+def test_backfill_locates_cylinders_from_their_last_movement(db):
+    db.execute(update(cylinders).values(current_location_id=None))
+    db.execute(insert(CylinderMovement.__table__), [
+        {"cylinder_id": 1, "movement_type": "DELIVERY", "status": "COMPLETED", "to_location_id": 1, "actual_date": datetime(2024, 1, 1)},
+        {"cylinder_id": 1, "movement_type": "TRANSFER", "status": "COMPLETED", "to_location_id": 2, "actual_date": datetime(2024, 2, 1)},
+        {"cylinder_id": 2, "movement_type": "DELIVERY", "status": "COMPLETED", "to_location_id": 1, "actual_date": datetime(2024, 1, 1)},
+        {"cylinder_id": 2, "movement_type": "TRANSFER", "status": "PENDING", "to_location_id": 2, "actual_date": datetime(2024, 3, 1)},
+        {"cylinder_id": 3, "movement_type": "PICKUP", "status": "COMPLETED", "to_location_id": None, "actual_date": datetime(2024, 1, 1)},
+    ])
+    db.commit()
+    reconcile_inventory(db)
+
+    assert backfill_current_locations(db, batch_size=2) == 2
+    located = dict(db.execute(select(cylinders.c.id, cylinders.c.current_location_id)).all())
+    assert located == {1: 2, 2: 1, 3: None, 4: None, 5: None}
+    assert stock(db, 1) == {(CylinderType.OXYGEN, CylinderStatus.EMPTY): 1}
+    assert reconcile_inventory(db)["corrected"] == 0
+    assert backfill_current_locations(db) == 0
@@ -0,0 +1,107 @@
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select
+
+from auth import get_current_active_user
+from database import Base, get_db, get_read_db
+from jobs.lost_cylinders import detect_lost_cylinders
+from models.alert import AlertStatus, CylinderAlert, DwellThreshold
+from models.customer import Customer, Location
+from models.cylinder import Cylinder
+from models.movement import CylinderMovement
+from routers import alerts as alerts_router
+
+NOW = datetime(2024, 6, 1)
+
+@pytest.fixture
+def db(file_db):
+    return file_db(Base, seed=[
+        (Customer, [
+            {"id": 1, "name": "Acme", "email": "acme@example.com"},
+            {"id": 2, "name": "Globex", "email": "globex@example.com"},
+        ]),
+        (Location, [
+            {"id": 1, "customer_id": None, "name": "Depot"},
+            {"id": 2, "customer_id": 1, "name": "Acme site"},
+            {"id": 3, "customer_id": 2, "name": "Globex site"},
+        ]),
+        (Cylinder, [
+            {"id": 1, "serial_number": "SN1", "type": "OXYGEN", "status": "IN_USE", "current_location_id": 2},
+            {"id": 2, "serial_number": "SN2", "type": "ARGON", "status": "IN_USE", "current_location_id": 2},
+            {"id": 3, "serial_number": "SN3", "type": "OXYGEN", "status": "IN_USE", "current_location_id": 3},
+            {"id": 4, "serial_number": "SN4", "type": "OXYGEN", "status": "AVAILABLE", "current_location_id": 1},
+        ]),
+        # Every cylinder last moved 60 days before NOW
+        (CylinderMovement, [
+            {"cylinder_id": n, "movement_type": "DELIVERY", "to_location_id": 2 if n < 3 else 3 if n == 3 else 1,
+             "timestamp": datetime(2024, 4, 2)}
+            for n in (1, 2, 3, 4)
+        ]),
+        (DwellThreshold, [
+            {"customer_id": None, "gas_type": "OXYGEN", "max_days": 45},
+            {"customer_id": 1, "gas_type": None, "max_days": 90},
+            {"customer_id": 1, "gas_type": "ARGON", "max_days": 30},
+        ]),
+    ])
+
+def alerts(db):
+    return {
+        row.cylinder_id: row
+        for row in db.execute(select(CylinderAlert.__table__).order_by(CylinderAlert.id)).all()
+    }
+
+def test_most_specific_threshold_wins(db):
+    result = detect_lost_cylinders(db, default_days=120, now=NOW)
+    # 1: Acme rule (90) beats the oxygen rule; 2: Acme + argon (30); 3: oxygen (45); 4: at the depot
+    assert result["scanned"] == 3
+    assert {cylinder_id: row.threshold_days for cylinder_id, row in alerts(db).items()} == {2: 30, 3: 45}
+
+def test_rescan_is_incremental(db):
+    detect_lost_cylinders(db, default_days=120, now=NOW)
+    db.execute(CylinderAlert.__table__.update().where(CylinderAlert.cylinder_id == 3).values(status=AlertStatus.ACKNOWLEDGED))
+    db.commit()
+
+    again = detect_lost_cylinders(db, default_days=120, now=NOW)
+    assert (again["new"], again["resolved"], again["updated"]) == (0, 0, 0)
+    assert alerts(db)[3].status == AlertStatus.ACKNOWLEDGED
+
+    # Cylinder 2 is collected and the oxygen rule goes up to 50 days
+    db.execute(insert(CylinderMovement.__table__).values(
+        cylinder_id=2, movement_type="PICKUP", to_location_id=1, timestamp=datetime(2024, 5, 30)
+    ))
+    db.execute(Cylinder.__table__.update().where(Cylinder.id == 2).values(current_location_id=1))
+    db.execute(DwellThreshold.__table__.update().where(DwellThreshold.gas_type == "OXYGEN").values(max_days=50))
+    db.commit()
+
+    result = detect_lost_cylinders(db, default_days=120, now=NOW)
+    assert (result["new"], result["resolved"], result["updated"]) == (0, 1, 1)
+    current = alerts(db)
+    assert current[2].status == AlertStatus.RESOLVED and current[2].resolved_at == NOW
+    assert current[3].threshold_days == 50 and current[3].status == AlertStatus.ACKNOWLEDGED
+
+def test_alert_list_filters_and_sorts(db):
+    detect_lost_cylinders(db, default_days=120, now=NOW)
+    db.execute(CylinderAlert.__table__.update().where(CylinderAlert.cylinder_id == 3).values(
+        status=AlertStatus.ACKNOWLEDGED, last_moved_at=datetime(2024, 3, 1)
+    ))
+    db.commit()
+
+    app = FastAPI()
+    app.include_router(alerts_router.router, prefix="/api/alerts")
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_read_db] = lambda: db
+    app.dependency_overrides[get_current_active_user] = lambda: None
+    client = TestClient(app)
+
+    # Longest-lost first by default
+    response = client.get("/api/alerts/")
+    assert response.status_code == 200
+    assert [alert["cylinder_id"] for alert in response.json()] == [3, 2]
+
+    response = client.get("/api/alerts/", params={"status": "open"})
+    assert [alert["cylinder_id"] for alert in response.json()] == [2]
+    response = client.get("/api/alerts/", params={"cylinder_id": 3, "sort": "-detected_at"})
+    assert [alert["status"] for alert in response.json()] == ["acknowledged"]
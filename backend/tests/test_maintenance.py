@@ -162,4 +162,15 @@ def test_create_maintenance_schedule_invalid_cylinder(client, test_token):
         headers=headers,
         json=schedule_data
     )
-    assert response.status_code == status.HTTP_404_NOT_FOUND 
\ No newline at end of file
+    assert response.status_code == status.HTTP_404_NOT_FOUND 
+
+def test_get_maintenance_records_filtered(client, test_token, test_maintenance_record):
+    headers = {"Authorization": f"Bearer {test_token}"}
+    params = {
+        "status": "scheduled",
+        "cylinder_id": test_maintenance_record.cylinder_id,
+        "sort": "-scheduled_date"
+    }
+    response = client.get("/api/maintenance/", headers=headers, params=params)
+    assert response.status_code == status.HTTP_200_OK
+    assert [r["id"] for r in response.json()] == [test_maintenance_record.id]
@@ -0,0 +1,52 @@
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from metrics import MetricsMiddleware, MetricsRegistry, instrument_engine
+
+def make_client():
+    registry = MetricsRegistry()
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, registry=registry)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        with engine.connect() as connection:
+            for _ in range(3):
+                connection.execute(text("SELECT 1"))
+        return {"id": item_id}
+
+    return TestClient(app), registry
+
+def test_latency_and_queries_per_route():
+    client, registry = make_client()
+    assert client.get("/items/1").status_code == status.HTTP_200_OK
+    assert client.get("/items/2").status_code == status.HTTP_200_OK
+
+    output = registry.render()
+    # Path templates, not raw paths
+    assert 'http_request_duration_seconds_count{method="GET",route="/items/{item_id}",status="200"} 2' in output
+    assert 'db_queries_per_request_sum{method="GET",route="/items/{item_id}"} 6' in output
+    assert 'db_queries_per_request_bucket{method="GET",route="/items/{item_id}",le="2.0"} 0' in output
+    assert 'db_queries_per_request_bucket{method="GET",route="/items/{item_id}",le="5.0"} 2' in output
+    assert 'http_requests_in_progress{method="GET"} 0' in output
+
+def test_unmatched_routes_share_one_label():
+    client, registry = make_client()
+    assert client.get("/nope/1").status_code == status.HTTP_404_NOT_FOUND
+    assert client.get("/nope/2").status_code == status.HTTP_404_NOT_FOUND
+    assert 'route="<unmatched>",status="404"} 2' in registry.render()
+
+def test_failed_statements_leave_nothing_on_the_connection():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    with engine.connect() as connection:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                connection.execute(text("SELECT * FROM missing"))
+        connection.execute(text("SELECT 1"))
+        assert connection.info == {}
@@ -0,0 +1,59 @@
+from fastapi import FastAPI, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from middleware import CompressionMiddleware, ConditionalGetMiddleware, etag_matches
+
+def make_client():
+    app = FastAPI()
+    app.add_middleware(ConditionalGetMiddleware)
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/large")
+    def large():
+        return PlainTextResponse("x" * 5000, headers={"ETag": 'W/"v1"'})
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("tiny")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([b"a" * 1000, b"b" * 1000]), media_type="text/plain")
+
+    @app.get("/png")
+    def png():
+        return PlainTextResponse("x" * 5000, media_type="image/png")
+
+    return TestClient(app)
+
+def test_etag_matches():
+    assert etag_matches('W/"abc"', 'W/"abc"')
+    assert etag_matches('"xyz", "abc"', 'W/"abc"')
+    assert etag_matches("*", 'W/"abc"')
+    assert not etag_matches('W/"abd"', 'W/"abc"')
+
+def test_large_response_is_gzipped():
+    response = make_client().get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.text == "x" * 5000
+
+def test_small_and_binary_responses_are_not_compressed():
+    client = make_client()
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/png", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/large", headers={"Accept-Encoding": "gzip;q=0"}).headers
+
+def test_streaming_response_is_compressed_in_chunks():
+    response = make_client().get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == "a" * 1000 + "b" * 1000
+
+def test_matching_etag_returns_304():
+    client = make_client()
+    response = client.get("/large", headers={"If-None-Match": 'W/"v1"', "Accept-Encoding": "gzip"})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+    assert response.headers["etag"] == 'W/"v1"'
+    assert client.get("/large", headers={"If-None-Match": 'W/"v0"'}).status_code == status.HTTP_200_OK
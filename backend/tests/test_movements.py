@@ -192,4 +192,36 @@ def test_complete_nonexistent_transaction(client, test_token):
         "/api/movements/transaction/999/complete",
         headers=headers
     )
-    assert response.status_code == status.HTTP_404_NOT_FOUND 
\ No newline at end of file
+    assert response.status_code == status.HTTP_404_NOT_FOUND 
+
+def test_get_transactions_query_count_is_constant(client, test_token, db_session, test_customer, test_cylinder, count_queries):
+    from models.movement import MovementType, Transaction, TransactionItem
+
+    def add_transaction():
+        transaction = Transaction(
+            customer_id=test_customer.id,
+            transaction_type=MovementType.DELIVERY,
+            total_amount=20.00
+        )
+        transaction.items = [
+            TransactionItem(cylinder_id=test_cylinder.id, quantity=1, unit_price=10.00, total_price=10.00)
+            for _ in range(2)
+        ]
+        db_session.add(transaction)
+        db_session.commit()
+
+    headers = {"Authorization": f"Bearer {test_token}"}
+    add_transaction()
+    with count_queries() as one_transaction:
+        response = client.get("/api/movements/transaction", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+
+    for _ in range(4):
+        add_transaction()
+    with count_queries() as five_transactions:
+        response = client.get("/api/movements/transaction", headers=headers)
+    data = response.json()
+    assert len(data) == 5
+    assert all(len(transaction["items"]) == 2 for transaction in data)
+    # Items are loaded for the whole page at once, not per transaction
+    assert len(five_transactions) == len(one_transaction)
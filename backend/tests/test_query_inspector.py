@@ -0,0 +1,68 @@
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from query_inspector import (
+    NPlusOneError,
+    QueryInspectorMiddleware,
+    inspect_queries,
+    instrument_engine,
+    normalize_statement,
+)
+
+def make_engine():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    return engine
+
+def test_normalize_statement():
+    assert normalize_statement("SELECT * FROM t WHERE id = 42 AND name = 'it''s'") == \
+        "SELECT * FROM t WHERE id = ? AND name = ?"
+    # IN lists of any length share one shape
+    assert normalize_statement("SELECT * FROM t WHERE id IN (?, ?, ?)") == \
+        normalize_statement("SELECT * FROM t WHERE id IN (1, 2)")
+    assert normalize_statement("SELECT *\n  FROM t WHERE id = :id_1") == "SELECT * FROM t WHERE id = ?"
+
+def test_repeated_statements_raise_in_strict_mode():
+    engine = make_engine()
+    with pytest.raises(NPlusOneError) as exc_info:
+        with inspect_queries("loop", mode="strict"), engine.connect() as connection:
+            for item_id in range(6):
+                connection.execute(text("SELECT :id"), {"id": item_id})
+    assert "6x SELECT ?" in str(exc_info.value)
+
+def test_distinct_statements_pass():
+    engine = make_engine()
+    with inspect_queries("batch", mode="strict") as collector, engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        connection.execute(text("SELECT 1, 2"))
+    assert collector.total == 2
+    assert collector.repeated() == []
+
+def test_middleware_labels_route_template():
+    engine = make_engine()
+    app = FastAPI()
+    app.add_middleware(QueryInspectorMiddleware, mode="strict")
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        with engine.connect() as connection:
+            for _ in range(item_id):
+                connection.execute(text("SELECT 1"))
+        return {"id": item_id}
+
+    client = TestClient(app)
+    assert client.get("/items/2").status_code == status.HTTP_200_OK
+    with pytest.raises(NPlusOneError, match="GET /items/{item_id}"):
+        client.get("/items/10")
+
+def test_failed_statements_leave_nothing_on_the_connection():
+    engine = make_engine()
+    with inspect_queries("errors", mode="warn") as collector, engine.connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.execute(text("SELECT * FROM missing"))
+        connection.execute(text("SELECT 1"))
+        assert connection.info == {}
+    assert collector.total == 1
@@ -0,0 +1,89 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+
+import database
+from database import get_db, get_read_db
+from replicas import READ_PRIMARY_COOKIE, ReplicaSet, track_writes
+
+NoteBase = declarative_base()
+
+class Note(NoteBase):
+    __tablename__ = "notes"
+    id = Column(Integer, primary_key=True)
+    text = Column(String)
+
+@pytest.fixture
+def replicated(tmp_path, monkeypatch):
+    # Two SQLite files stand in for a primary and a replica that does not replicate at all
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}", connect_args={"check_same_thread": False})
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}", connect_args={"check_same_thread": False})
+    for engine, text in ((primary, "primary"), (replica, "replica")):
+        NoteBase.metadata.create_all(engine)
+        with engine.begin() as connection:
+            connection.execute(Note.__table__.insert(), {"text": text})
+
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=primary)
+    track_writes(SessionLocal, 5.0)
+    lag = {"seconds": 0.0}
+    replica_set = ReplicaSet([replica], max_lag_seconds=5.0, lag_probe=lambda engine: lag["seconds"])
+    replica_set.check()
+    monkeypatch.setattr(database, "SessionLocal", SessionLocal)
+    monkeypatch.setattr(database, "replica_set", replica_set)
+
+    app = FastAPI()
+
+    @app.post("/notes")
+    def create_note(text: str, db: Session = Depends(get_db)):
+        db.add(Note(text=text))
+        db.commit()
+        return {"ok": True}
+
+    @app.get("/notes")
+    def list_notes(db: Session = Depends(get_read_db)):
+        return [note.text for note in db.query(Note).order_by(Note.id)]
+
+    @app.post("/notes/from-replica")
+    def write_to_replica(db: Session = Depends(get_read_db)):
+        db.add(Note(text="lost"))
+        db.commit()
+
+    return TestClient(app), lag, replica_set
+
+def test_reads_go_to_replica_until_client_writes(replicated):
+    client, _, _ = replicated
+    assert client.get("/notes").json() == ["replica"]
+
+    response = client.post("/notes", params={"text": "mine"})
+    assert READ_PRIMARY_COOKIE in response.cookies
+    # The replica never receives the write, yet the writer reads it back
+    assert client.get("/notes").json() == ["primary", "mine"]
+
+    client.cookies.clear()
+    assert client.get("/notes").json() == ["replica"]
+
+def test_lagging_replica_is_skipped(replicated):
+    client, lag, replica_set = replicated
+    lag["seconds"] = 30.0
+    replica_set.check()
+    assert client.get("/notes").json() == ["primary"]
+    assert replica_set.lag[replica_set.engines[0]] == 30.0
+
+    lag["seconds"] = 1.0
+    replica_set.check()
+    assert client.get("/notes").json() == ["replica"]
+
+def test_requests_do_not_probe_replicas(replicated):
+    client, lag, replica_set = replicated
+    probes = []
+    replica_set.lag_probe = lambda engine: probes.append(engine) or lag["seconds"]
+    for _ in range(3):
+        assert client.get("/notes").json() == ["replica"]
+    assert probes == []
+
+def test_replica_sessions_are_read_only(replicated):
+    client, _, _ = replicated
+    with pytest.raises(RuntimeError, match="read-only"):
+        client.post("/notes/from-replica")
@@ -0,0 +1,51 @@
+import random
+import numpy as np
+import pytest
+
+from app.core.geo import distance_matrix, haversine_km
+from app.services.routing import plan_routes, route_length, solve_routes
+
+def test_distance_matrix_matches_haversine():
+    latitudes, longitudes = [51.5, 48.85, 40.7], [-0.12, 2.35, -74.0]
+    matrix = distance_matrix(latitudes, longitudes)
+    assert matrix.shape == (3, 3)
+    assert np.allclose(matrix, matrix.T)
+    assert np.allclose(matrix[0], haversine_km(51.5, -0.12, latitudes, longitudes))
+
+def test_plan_routes_visits_every_stop_once():
+    rng = random.Random(3)
+    latitudes = [rng.uniform(51.0, 52.0) for _ in range(200)]
+    longitudes = [rng.uniform(-1.0, 1.0) for _ in range(200)]
+    plan = plan_routes((51.5, 0.0), latitudes, longitudes, vehicles=4)
+
+    assert len(plan["routes"]) == 4
+    assert sorted(stop for route in plan["routes"] for stop in route) == list(range(200))
+    assert all(len(route) <= 50 for route in plan["routes"])
+    assert plan["total_km"] == pytest.approx(sum(plan["distances_km"]))
+
+def test_two_opt_improves_on_savings():
+    rng = random.Random(5)
+    latitudes = [rng.uniform(51.0, 52.0) for _ in range(300)]
+    longitudes = [rng.uniform(-1.0, 1.0) for _ in range(300)]
+    matrix = distance_matrix([51.5] + latitudes, [0.0] + longitudes)
+
+    savings_only = solve_routes(matrix, vehicles=3, time_budget=0.0)
+    improved = solve_routes(matrix, vehicles=3, time_budget=5.0)
+    assert not savings_only["converged"]
+    assert improved["converged"]
+    assert improved["total_km"] <= savings_only["total_km"]
+    for route, distance in zip(improved["routes"], improved["distances_km"]):
+        assert route_length([stop + 1 for stop in route], matrix) == pytest.approx(distance)
+
+def test_plan_routes_respects_fleet_size_over_capacity():
+    # Capacity too small for the fleet: routes are still joined down to one per vehicle
+    latitudes = [51.0 + i * 0.01 for i in range(20)]
+    longitudes = [0.0] * 20
+    plan = plan_routes((51.0, 0.0), latitudes, longitudes, vehicles=2, capacity=3)
+    assert len(plan["routes"]) == 2
+    assert sorted(stop for route in plan["routes"] for stop in route) == list(range(20))
+
+def test_plan_routes_without_stops():
+    plan = plan_routes((51.0, 0.0), [], [], vehicles=3)
+    assert plan["routes"] == []
+    assert plan["total_km"] == 0
@@ -0,0 +1,32 @@
+import pytest
+from fastapi import status
+
+from search_index import search_terms
+
+def test_search_terms_strips_operators():
+    assert search_terms('acme "gas" OR*') == ["acme", "gas", "or"]
+    assert search_terms('"*') == []
+
+def test_search_customers_prefix(client, test_token, test_customer):
+    headers = {"Authorization": f"Bearer {test_token}"}
+    response = client.get("/api/search/customers", headers=headers, params={"q": "test cust"})
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data[0]["id"] == test_customer.id
+    assert "rank" in data[0]
+
+def test_search_customers_no_match(client, test_token, test_customer):
+    headers = {"Authorization": f"Bearer {test_token}"}
+    response = client.get("/api/search/customers", headers=headers, params={"q": "zzzz"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+
+def test_search_locations(client, test_token, test_location):
+    headers = {"Authorization": f"Bearer {test_token}"}
+    response = client.get("/api/search/locations", headers=headers, params={"q": "test city"})
+    assert response.status_code == status.HTTP_200_OK
+    assert [loc["id"] for loc in response.json()] == [test_location.id]
+
+def test_search_unauthorized(client):
+    response = client.get("/api/search/customers", params={"q": "test"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
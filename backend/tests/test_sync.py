@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import Base
+from app.models.customer import Customer
+from app.models.sync import Tombstone
+from app.services.sync import (
+    InvalidCursor,
+    _record_tombstone,
+    changes_since,
+    decode_cursor,
+    encode_cursor,
+    prune_tombstones,
+)
+
+DAY = timedelta(days=1)
+
+@pytest.fixture
+def db(file_db):
+    # Naive UTC, the way SQLite stores it
+    now = datetime.utcnow()
+    return file_db(Base, tables=[Customer, Tombstone], seed=[
+        (Customer, [
+            {"id": 1, "name": "Acme", "customer_type": "BUSINESS", "created_at": now - 3 * DAY, "updated_at": None},
+            {"id": 2, "name": "Globex", "customer_type": "BUSINESS", "created_at": now - 3 * DAY, "updated_at": None},
+            {"id": 3, "name": "Initech", "customer_type": "BUSINESS", "created_at": now - 5 * DAY, "updated_at": now - 2 * DAY},
+            # Inside the settle window: held back until it cannot gain an earlier neighbour
+            {"id": 4, "name": "Hooli", "customer_type": "BUSINESS", "created_at": now, "updated_at": None},
+        ]),
+        (Tombstone, [
+            {"id": 1, "table_name": "customers", "row_id": 7, "deleted_at": now - 200 * DAY},
+            {"id": 2, "table_name": "customers", "row_id": 8, "deleted_at": now - 1 * DAY},
+            {"id": 3, "table_name": "locations", "row_id": 9, "deleted_at": now - 1 * DAY},
+        ]),
+    ])
+
+def test_cursor_round_trip_and_validation():
+    positions = {"customers": (datetime(2024, 3, 1, 12, 30), 17)}
+    assert decode_cursor(encode_cursor(positions)) == positions
+    assert decode_cursor(None) == {}
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not a cursor")
+
+def test_changes_are_paged_in_change_order(db):
+    first = changes_since(db, None, ["customers"], limit=2)
+    assert [row["id"] for row in first["changes"]["customers"]] == [1, 2]
+    assert first["has_more"] and not first["reset"]
+    # A fresh device starts its delete feed now: it never had the deleted rows
+    assert first["deleted"] == {"customers": []}
+
+    second = changes_since(db, first["cursor"], ["customers"], limit=2)
+    assert [row["id"] for row in second["changes"]["customers"]] == [3]
+    assert not second["has_more"]
+
+    third = changes_since(db, second["cursor"], ["customers"], limit=2)
+    assert third["changes"]["customers"] == []
+
+def test_tombstones_after_cursor_are_sent_once(db):
+    cursor = encode_cursor({"customers:deleted": (datetime.utcnow() - 2 * DAY, 0)})
+    batch = changes_since(db, cursor, ["customers"])
+    assert batch["deleted"] == {"customers": [8]}
+    assert changes_since(db, batch["cursor"], ["customers"])["deleted"] == {"customers": []}
+
+def test_cursor_past_retention_forces_reset(db):
+    stale = datetime.utcnow() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS + 1)
+    batch = changes_since(db, encode_cursor({"customers:deleted": (stale, 0)}), ["customers"])
+    assert batch["reset"] and batch["cursor"] is None
+
+def test_prune_removes_tombstones_past_retention(db):
+    assert prune_tombstones(db) == 1
+    assert prune_tombstones(db) == 0
+    assert changes_since(db, encode_cursor({"customers:deleted": (datetime.utcnow() - 2 * DAY, 0)}), ["customers"])["deleted"] == {"customers": [8]}
+
+def test_delete_listener_writes_tombstone_in_the_same_transaction(db):
+    # What the after_delete mapper event receives for a deleted customer
+    _record_tombstone(SimpleNamespace(local_table=Customer.__table__), db.connection(), SimpleNamespace(id=2))
+    db.rollback()
+    assert db.execute(select(Tombstone.__table__.c.row_id).where(Tombstone.__table__.c.row_id == 2)).all() == []
+
+    _record_tombstone(SimpleNamespace(local_table=Customer.__table__), db.connection(), SimpleNamespace(id=2))
+    db.commit()
+    assert db.execute(
+        select(Tombstone.__table__.c.table_name).where(Tombstone.__table__.c.row_id == 2)
+    ).scalars().all() == ["customers"]